@@ -1,4 +1,5 @@
 """Configuration constants for Facebook Account Manager"""
+import os
 import sys
 
 # Chrome paths per OS
@@ -10,4 +11,104 @@ else:
 PROFILES_DIR = "profiles"
 GRID_COLS = 3
 GRID_ROWS = 2
+DEFAULT_SCREEN_SIZE = (1920, 1080)   # Grid fallback when no screen can be queried (headless runs)
 ACCOUNT_FORMAT = "UID|PASSWORD|TOKEN"
+
+# Login entry point (override with a local fake server for offline testing)
+FB_LOGIN_URL = os.environ.get("FB_LOGIN_URL", "https://www.facebook.com/")
+
+# Request blocking while the login flow drives the page (CDP resource types / URL wildcards)
+BLOCK_RESOURCES_DURING_LOGIN = True
+BLOCKED_RESOURCE_TYPES = ["Image", "Media", "Font"]
+BLOCKED_URL_PATTERNS = [
+    "*/tr/?*", "*facebook.com/tr*", "*connect.facebook.net/*",
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+]
+
+# Shared local caching proxy for immutable static assets (all profiles share one store).
+# Only plain-HTTP origins benefit: HTTPS, including all of Facebook, bypasses it
+CACHE_PROXY_ENABLED = os.environ.get("FBM_CACHE_PROXY", "0") == "1"
+CACHE_PROXY_DIR = "cache/static"
+CACHE_PROXY_MAX_MB = 1024
+
+# RAM-backed profiles: Chrome runs on a tmpfs copy that is synced back in the background and on close
+PROFILE_STAGE_ENABLED = os.environ.get("FBM_PROFILE_STAGE", "0") == "1"
+PROFILE_STAGE_DIR = os.environ.get("FBM_PROFILE_STAGE_DIR", "/dev/shm/fbm-profiles")
+PROFILE_SYNC_INTERVAL = 60          # Seconds between background syncs to PROFILES_DIR
+PROFILE_STAGE_MIN_FREE_MB = 512     # Launch from disk instead when the tmpfs has less free
+
+# Cold profiles: packed into PROFILE_ARCHIVE_DIR after this many idle days, restored on launch
+PROFILE_ARCHIVE_ENABLED = os.environ.get("FBM_PROFILE_ARCHIVE", "0") == "1"   # Background sweeps in the GUI
+PROFILE_ARCHIVE_DIR = "profiles_archive"
+PROFILE_ARCHIVE_IDLE_DAYS = 14
+PROFILE_ARCHIVE_SWEEP_HOURS = 6
+PROFILE_ARCHIVE_ZSTD_LEVEL = 3      # .tar.zst needs the zstandard package; .tar.gz otherwise
+
+# Session vault: cookies + localStorage saved after each successful login, restored into fresh profiles
+SESSION_VAULT_ENABLED = True
+SESSION_VAULT_DIR = "sessions"
+SESSION_DOMAINS = ["facebook.com", "messenger.com"]
+
+# Adaptive concurrency: launch/login limits grow by one while the host is healthy, halve under pressure
+ADAPTIVE_CONCURRENCY_ENABLED = os.environ.get("FBM_ADAPTIVE_CONCURRENCY", "1") == "1"
+CONCURRENCY_MIN = 1
+CONCURRENCY_MAX = 16                # GUI ceiling; the engine's is its --concurrency
+CONCURRENCY_INITIAL = 4
+CONCURRENCY_INTERVAL = 2.0          # Seconds between adjustments
+CONCURRENCY_MIN_FREE_MB = 1024      # Back off below this much MemAvailable...
+CONCURRENCY_MAX_PSI = 20.0          # ...above this PSI "some" avg10 (% of time stalled)...
+CONCURRENCY_MAX_LOAD = 1.5          # ...above this 1-minute load average per CPU...
+CONCURRENCY_MAX_SLOWDOWN = 2.0      # ...or when launches/login steps take this many times their baseline
+
+# Broadcast: one JS snippet or navigation sent to many running browsers at once
+BROADCAST_CONCURRENCY = 64          # Browsers called at the same time
+BROADCAST_TIMEOUT = 15.0            # Seconds before a browser is reported as timed out
+
+# Thumbnail wall: low-rate screencast of the browsers in view ("offscreen" parks real windows off screen)
+BROWSER_WINDOW_MODE = os.environ.get("FBM_WINDOW_MODE", "grid")     # "grid" or "offscreen"
+OFFSCREEN_WINDOW_SIZE = (1280, 800)
+THUMBNAIL_FPS = 2.0                 # Frames per second per browser, at most
+THUMBNAIL_SIZE = (320, 200)         # Largest frame Chrome sends (aspect ratio kept)
+THUMBNAIL_QUALITY = 40              # JPEG quality of the frames
+
+# Proxy pool (import a list from the "Proxies" dialog; assignments are sticky per UID)
+PROXY_POOL_FILE = "proxies.json"
+PROXY_PROBE_TARGET = "www.facebook.com:443"
+PROXY_PROBE_TIMEOUT = 8.0
+PROXY_PROBE_CONCURRENCY = 50
+PROXY_PROBE_INTERVAL = 300          # Seconds between background probe rounds
+PROXY_MAX_LATENCY_MS = 3000         # Rotate out proxies slower than this (EWMA)
+PROXY_MAX_ERROR_RATE = 0.5          # Rotate out proxies failing more often than this (EWMA)
+
+# Upper bound for cancelled workers to wind down on exit (shared by all workers)
+CLEANUP_GRACE_MS = 500
+
+# Table refresh rate for worker status updates (coalesced per account, ~30 Hz)
+STATUS_FLUSH_INTERVAL_MS = 33
+
+# Background account import: rows are streamed to the table in batches
+LOAD_BATCH_SIZE = 500
+LOAD_BATCH_INTERVAL_MS = 100
+
+# Localhost control API (main.py --control-api / python -m core serve)
+CONTROL_API_HOST = "127.0.0.1"
+CONTROL_API_PORT = 8790
+CONTROL_API_TOKEN = os.environ.get("FBM_CONTROL_TOKEN", "")   # Require "Authorization: Bearer <token>" when set
+CONTROL_API_EVENT_BACKLOG = 10000   # Events kept for SSE resume (and per-client queue bound)
+CONTROL_API_MAX_BODY_MB = 64
+CONTROL_API_CALL_TIMEOUT = 30       # Seconds an HTTP call waits for the GUI thread
+
+# Logging: queued to one writer thread; per-account files when the directory is set
+LOG_FILE = "facebook_login_debug.log"
+LOG_MAX_MB = 10                     # Rotate the main log at this size...
+LOG_BACKUP_COUNT = 5                # ...keeping this many old files
+LOG_RING_LINES = 200                # Lines per account kept in memory for the log viewer
+LOG_PER_ACCOUNT_DIR = os.environ.get("FBM_ACCOUNT_LOG_DIR", "")
+LOG_PER_ACCOUNT_MAX_KB = 512
+
+# Crash-safe job journal: unfinished opens/logins are offered for resume on restart
+JOURNAL_FILE = "jobs.journal.jsonl"
+
+# Multi-process farm (main.py --farm [N]): accounts sharded over N worker processes
+FARM_EVENT_BATCH_MS = 20            # Workers coalesce events this long before one IPC write
+FARM_MAX_RESTARTS_PER_MINUTE = 5    # A worker crashing more often than this is given up on
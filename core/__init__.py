@@ -1,5 +1,28 @@
-"""Core Package"""
-from .account_loader import Account, AccountLoader
-from .browser_launcher import BrowserManager
-from .facebook_login import FacebookLoginManager
-from .enums import BrowserStatus, LoginStatus
+"""Core Package
+
+Exports resolve lazily so the Qt-free parts (engine, chrome, login_flow, the
+``python -m core`` CLI) never import PyQt6; only BrowserManager and
+FacebookLoginManager pull in the Qt adapters.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "Account": ".account_loader",
+    "AccountLoader": ".account_loader",
+    "BrowserManager": ".browser_launcher",
+    "FacebookLoginManager": ".facebook_login",
+    "BrowserStatus": ".enums",
+    "LoginStatus": ".enums",
+    "Engine": ".engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
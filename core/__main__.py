@@ -0,0 +1,236 @@
+"""Headless batch CLI over the core engine (no PyQt6 needed)
+
+Runs one action over every account in a UID|PASSWORD|TOKEN[|PROXY] file and
+prints one JSON object per line on stdout: every engine event, then a summary.
+Logs go to stderr.
+
+Usage:
+    python -m core open accounts.txt --concurrency 4
+    python -m core login accounts.txt            # attaches to browsers opened earlier
+    python -m core open+login accounts.txt --headless --close-after
+    python -m core open+login accounts.txt -c 8 --fixed-concurrency   # no backing off under host load
+    python -m core close accounts.txt
+    python -m core serve accounts.txt --port 8790   # control API (see core.control_api)
+    python -m core open+login accounts.txt --trace trace.json   # phase timeline for Perfetto
+    python -m core open+login accounts.txt --journal batch.jsonl --resume   # only what a crash left unfinished
+    python -m core archive --idle-days 30       # pack profiles not launched for 30 days
+    python -m core restore accounts.txt         # saved sessions into the browsers, no login UI
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import wait
+from typing import Dict, List
+
+from config import PROFILE_STAGE_ENABLED, PROFILE_ARCHIVE_IDLE_DAYS, ADAPTIVE_CONCURRENCY_ENABLED
+from .account_loader import Account, AccountLoader
+from .engine import Engine
+from .journal import JobJournal
+from .tracing import tracer
+
+ACTIONS = ("open", "login", "open+login", "restore", "close", "serve", "archive")
+NO_ACCOUNTS_ACTIONS = ("serve", "archive")
+JOURNAL_OPS = {"open": ("open",), "login": ("login",), "open+login": ("open", "login")}
+
+
+class JsonLinesWriter:
+    """Serializes events from the engine's worker threads, one line each"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m core", description="Headless batch runner (JSONL output)")
+    parser.add_argument("action", choices=ACTIONS)
+    parser.add_argument("accounts", nargs="?",
+                        help="Account file, one UID|PASSWORD|TOKEN[|PROXY] per line "
+                             "('-' for stdin; optional for serve, archive)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4,
+                        help="Browsers launched/logged in at once (the ceiling while it adapts to host load)")
+    parser.add_argument("--fixed-concurrency", action="store_true",
+                        help="Keep --concurrency fixed instead of backing off under host load")
+    parser.add_argument("--uids", help="Comma-separated UIDs to act on (default: all in the file)")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome with --headless=new")
+    parser.add_argument("--chrome-arg", action="append", default=[], metavar="ARG",
+                        help="Extra Chrome switch (repeatable)")
+    parser.add_argument("--close-after", action="store_true",
+                        help="Close the browsers when done (default: leave them running)")
+    parser.add_argument("-o", "--output", help="Write JSONL here instead of stdout")
+    parser.add_argument("-p", "--port", type=int, help="serve: control API port (default CONTROL_API_PORT)")
+    parser.add_argument("--trace", metavar="PATH", help="Write launch/login phase spans as Chrome Trace JSON")
+    parser.add_argument("--journal", metavar="PATH", help="Record requests and state changes in a crash-safe journal")
+    parser.add_argument("--resume", action="store_true",
+                        help="Only act on accounts with unfinished operations in --journal")
+    parser.add_argument("--idle-days", type=float, default=PROFILE_ARCHIVE_IDLE_DAYS,
+                        help="archive: pack profiles not launched for this many days")
+    parser.add_argument("--limit", type=int, help="archive: at most this many profiles")
+    parser.add_argument("--dry-run", action="store_true", help="archive: list idle profiles, change nothing")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging on stderr")
+    args = parser.parse_args(argv)
+    if args.accounts is None and args.action not in NO_ACCOUNTS_ACTIONS:
+        parser.error(f"{args.action} needs an account file")
+    if args.resume and not args.journal:
+        parser.error("--resume needs --journal")
+    return args
+
+
+def read_accounts(path: str, uids: str = None) -> List[Account]:
+    text = sys.stdin.read() if path == "-" else open(path, encoding="utf-8").read()
+    accounts = AccountLoader().load_accounts(text)
+    if uids:
+        wanted = {u.strip() for u in uids.split(",") if u.strip()}
+        accounts = [a for a in accounts if a.uid in wanted]
+    return accounts
+
+
+def serve(args: argparse.Namespace, writer: JsonLinesWriter) -> bool:
+    """Run the control API over a headless engine until Ctrl+C"""
+    from config import CONTROL_API_PORT
+    from .control_api import ControlServer, EngineBackend, EventHub
+
+    engine = Engine(concurrency=args.concurrency, headless=args.headless, extra_arguments=args.chrome_arg,
+                    adaptive_concurrency=ADAPTIVE_CONCURRENCY_ENABLED and not args.fixed_concurrency)
+    engine.subscribe(writer)
+    hub = EventHub()
+    backend = EngineBackend(engine, hub)
+    if args.accounts:
+        backend.add_accounts(read_accounts(args.accounts, args.uids))
+    server = ControlServer(backend, hub, args.port or CONTROL_API_PORT).start()
+    writer({"ts": round(time.time(), 3), "event": "listening", "address": server.address,
+            "accounts": len(backend.accounts)})
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        engine.shutdown(close_browsers=args.close_after)
+    return True
+
+
+def archive(args: argparse.Namespace, writer: JsonLinesWriter) -> bool:
+    """Pack idle profiles (all of them, or only the file's accounts) into compressed archives"""
+    from .profile_archive import ProfileArchive
+
+    started = time.perf_counter()
+    profiles = ProfileArchive()
+    uids = [a.uid for a in read_accounts(args.accounts, args.uids)] if args.accounts else None
+    if args.dry_run:
+        idle = profiles.idle_profiles(args.idle_days, uids)[:args.limit]
+        for uid, last_used in idle:
+            writer({"ts": round(time.time(), 3), "uid": uid, "event": "profile_idle",
+                    "idle_days": round((time.time() - last_used) / 86400, 1)})
+        writer({"ts": round(time.time(), 3), "event": "summary", "action": "archive", "dry_run": True,
+                "idle": len(idle)})
+        return True
+
+    def archived(uid: str, stats) -> None:
+        writer({"ts": round(time.time(), 3), "uid": uid, "event": "profile_archived",
+                "bytes_before": stats.bytes_before, "bytes_after": stats.bytes_after})
+
+    total = profiles.sweep(args.idle_days, uids, args.limit, on_archived=archived)
+    writer({"ts": round(time.time(), 3), "event": "summary", "action": "archive",
+            "archived": total.archived, "bytes_before": total.bytes_before, "bytes_after": total.bytes_after,
+            "reclaimed_bytes": total.reclaimed, "elapsed_s": round(time.perf_counter() - started, 3)})
+    return True
+
+
+def run(args: argparse.Namespace, writer: JsonLinesWriter) -> bool:
+    if args.action == "serve":
+        return serve(args, writer)
+    if args.action == "archive":
+        return archive(args, writer)
+    accounts = read_accounts(args.accounts, args.uids)
+    journal = JobJournal(args.journal).open() if args.journal else None
+    ops = JOURNAL_OPS.get(args.action, ())
+    if args.resume:
+        pending = journal.pending()
+        accounts = [a for a in accounts if pending.get(a.uid, set()) & set(ops)]
+    # The cache proxy and profile sync live in this process, so browsers left running cannot depend on them
+    engine = Engine(concurrency=args.concurrency, headless=args.headless,
+                    extra_arguments=args.chrome_arg, use_cache_proxy=False,
+                    use_profile_stage=PROFILE_STAGE_ENABLED and (args.close_after or args.action == "close"),
+                    adaptive_concurrency=ADAPTIVE_CONCURRENCY_ENABLED and not args.fixed_concurrency
+                    and args.action != "close")
+    engine.subscribe(writer)
+    if journal:
+        engine.subscribe(journal.record_event)
+        for op in ops:
+            journal.requested(op, (a.uid for a in accounts))
+    started = time.perf_counter()
+    results: Dict[str, bool] = {}
+    interrupted = False
+
+    try:
+        if args.action == "close":
+            for account in accounts:
+                engine.close(account)
+                results[account.uid] = True
+        else:
+            submit = {"open": engine.open, "login": engine.login, "open+login": engine.open_and_login,
+                      "restore": engine.restore_session}[args.action]
+            futures = {submit(account): account.uid for account in accounts}
+            try:
+                pending = set(futures)
+                while pending:
+                    # Short timeouts keep the main thread responsive to Ctrl+C
+                    _done, pending = wait(pending, timeout=0.5)
+            except KeyboardInterrupt:
+                interrupted = True
+                if journal:
+                    # Interrupted work stays unfinished in the journal, so --resume picks it up
+                    engine.unsubscribe(journal.record_event)
+                engine.cancel_all()
+                wait(futures)
+            for future, uid in futures.items():
+                results[uid] = not future.cancelled() and future.exception() is None and future.result()
+            if args.close_after:
+                for account in accounts:
+                    if engine.is_browser_running(account.uid):
+                        engine.close(account)
+    finally:
+        engine.shutdown()
+        if journal:
+            journal.close()
+
+    ok = sum(results.values())
+    writer({
+        "ts": round(time.time(), 3), "event": "summary", "action": args.action,
+        "accounts": len(accounts), "ok": ok, "failed": len(results) - ok,
+        "interrupted": interrupted, "elapsed_s": round(time.perf_counter() - started, 3),
+    })
+    return ok == len(results) and not interrupted
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s',
+        stream=sys.stderr,
+    )
+    if args.trace:
+        tracer.enable()
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as stream:
+                return 0 if run(args, JsonLinesWriter(stream)) else 1
+        return 0 if run(args, JsonLinesWriter(sys.stdout)) else 1
+    finally:
+        if args.trace:
+            tracer.export(args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
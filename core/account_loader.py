@@ -1,7 +1,7 @@
 """Account Loader Module - Parsing and validation of Facebook account data"""
 import os
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from config import PROFILES_DIR
 
@@ -13,6 +13,7 @@ class Account:
     password: str
     token: str
     profile_path: str
+    proxy: Optional[str] = None
 
 
 class AccountLoader:
@@ -34,6 +35,13 @@ class AccountLoader:
         uid, password, token = parts[0].strip(), parts[1].strip(), parts[2].strip()
         return (uid, password, token) if uid and password and token else None
     
+    def parse_proxy(self, line: str) -> Optional[str]:
+        """Optional 4th field: UID|PASSWORD|TOKEN|PROXY"""
+        parts = line.strip().split("|")
+        if len(parts) < 4:
+            return None
+        return parts[3].strip() or None
+    
     def create_profile_directory(self, uid: str) -> str:
         """Create profile directory for UID, return absolute path"""
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -41,18 +49,28 @@ class AccountLoader:
         os.makedirs(profile_path, exist_ok=True)
         return profile_path
     
+    def build_account(self, line: str) -> Optional[Account]:
+        """Parse one line and prepare its profile directory"""
+        parsed = self.parse_line(line)
+        if not parsed:
+            return None
+        uid, password, token = parsed
+        return Account(
+            uid=uid, password=password, token=token,
+            profile_path=self.create_profile_directory(uid),
+            proxy=self.parse_proxy(line)
+        )
+    
+    def iter_accounts(self, text_data: str) -> Iterator[Account]:
+        """Parse lines lazily, creating each profile directory as it goes"""
+        for line in text_data.strip().split("\n"):
+            account = self.build_account(line)
+            if account:
+                yield account
+    
     def load_accounts(self, text_data: str) -> List[Account]:
         """Load accounts from multi-line text"""
-        accounts = []
-        for line in text_data.strip().split("\n"):
-            parsed = self.parse_line(line)
-            if parsed:
-                uid, password, token = parsed
-                accounts.append(Account(
-                    uid=uid, password=password, token=token,
-                    profile_path=self.create_profile_directory(uid)
-                ))
-        return accounts
+        return list(self.iter_accounts(text_data))
     
     def validate_accounts(self, text_data: str) -> Tuple[int, int, List[str]]:
         """Validate account data, return (valid_count, invalid_count, errors)"""
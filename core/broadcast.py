@@ -0,0 +1,142 @@
+"""Broadcast Module - Run one JS snippet or navigation on many running browsers at once
+
+Each browser gets its own call, up to BROADCAST_CONCURRENCY at a time, so a
+fan-out takes about as long as its slowest browser, not the sum of all of
+them. A browser that has not answered BROADCAST_TIMEOUT
+seconds after its call started is reported as timed out right away. Its
+thread is left to finish in the background and its late answer is dropped.
+Results are reported one by one, in completion order.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from config import BROADCAST_CONCURRENCY, BROADCAST_TIMEOUT
+from .cancellation import CancellationToken
+
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+
+logger = logging.getLogger(__name__)
+
+JS, NAVIGATE = "js", "navigate"
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class BroadcastAction:
+    kind: str           # JS or NAVIGATE
+    payload: str        # Script body (``return`` sends a value back) or URL
+
+
+@dataclass
+class BroadcastResult:
+    uid: str
+    ok: bool
+    value: Any = None           # Script return value, or the URL after navigating
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class BroadcastSummary:
+    ok: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    cancelled: int = 0
+    slowest_ms: float = 0.0
+    elapsed_s: float = 0.0
+
+    def add(self, result: BroadcastResult, outcome: str = "done") -> None:
+        if outcome == "timeout":
+            self.timed_out += 1
+        elif outcome == "cancelled":
+            self.cancelled += 1
+        elif result.ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.slowest_ms = max(self.slowest_ms, result.elapsed_ms)
+
+    def summary(self) -> str:
+        parts = [f"{self.ok} ok", f"{self.failed} failed"]
+        if self.timed_out:
+            parts.append(f"{self.timed_out} timed out")
+        if self.cancelled:
+            parts.append(f"{self.cancelled} cancelled")
+        return ", ".join(parts) + f" in {self.elapsed_s:.2f} s (slowest browser {self.slowest_ms:.0f} ms)"
+
+
+class Broadcaster:
+    """Fans one action out over a set of drivers"""
+
+    def __init__(self, concurrency: int = BROADCAST_CONCURRENCY, timeout: float = BROADCAST_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+
+    def _execute(self, driver: "ChromiumPage", action: BroadcastAction) -> BroadcastResult:
+        if action.kind == JS:
+            return BroadcastResult("", True, driver.run_js(action.payload, timeout=self.timeout))
+        if action.kind == NAVIGATE:
+            if driver.get(action.payload, timeout=self.timeout) is False:
+                return BroadcastResult("", False, driver.url, error="Navigation failed")
+            return BroadcastResult("", True, driver.url)
+        raise ValueError(f"Unknown broadcast action: {action.kind}")
+
+    def _task(self, uid: str, driver: "ChromiumPage", action: BroadcastAction,
+              results: "queue.SimpleQueue[BroadcastResult]") -> None:
+        started = time.perf_counter()
+        try:
+            result = self._execute(driver, action)
+        except Exception as e:
+            result = BroadcastResult("", False, error=str(e).strip() or type(e).__name__)
+        result.uid = uid
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        results.put(result)
+
+    def run(self, drivers: Dict[str, "ChromiumPage"], action: BroadcastAction,
+            on_result: Optional[Callable[[BroadcastResult], None]] = None,
+            cancel_token: Optional[CancellationToken] = None) -> BroadcastSummary:
+        """Run ``action`` on every driver; blocks until all answered, timed out or were cancelled"""
+        summary = BroadcastSummary()
+        began = time.perf_counter()
+        waiting = deque(drivers.items())
+        in_flight: Dict[str, float] = {}        # uid -> call start
+        results: "queue.SimpleQueue[BroadcastResult]" = queue.SimpleQueue()
+
+        def report(result: BroadcastResult, outcome: str = "done") -> None:
+            summary.add(result, outcome)
+            if on_result:
+                on_result(result)
+
+        while waiting or in_flight:
+            if cancel_token is not None and cancel_token.is_cancelled:
+                for uid in list(in_flight) + [uid for uid, _driver in waiting]:
+                    report(BroadcastResult(uid, False, error="Cancelled"), "cancelled")
+                break
+            # A call that timed out no longer holds a slot, so one hung browser cannot stall the rest
+            while waiting and len(in_flight) < self.concurrency:
+                uid, driver = waiting.popleft()
+                in_flight[uid] = time.perf_counter()
+                threading.Thread(target=self._task, args=(uid, driver, action, results),
+                                 name=f"broadcast-{uid}", daemon=True).start()
+            try:
+                result = results.get(timeout=POLL_INTERVAL)
+                if in_flight.pop(result.uid, None) is not None:
+                    report(result)
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            for uid, started in list(in_flight.items()):
+                if now - started > self.timeout:
+                    del in_flight[uid]      # Its late answer is dropped above
+                    report(BroadcastResult(uid, False, error=f"Timed out after {self.timeout:g} s",
+                                           elapsed_ms=round((now - started) * 1000, 1)), "timeout")
+        summary.elapsed_s = time.perf_counter() - began
+        if drivers:
+            logger.info(f"Broadcast {action.kind} to {len(drivers)} browsers: {summary.summary()}")
+        return summary
@@ -1,199 +1,236 @@
-"""Browser Launcher Module - Chrome browser management with DrissionPage"""
+"""Browser Launcher Module - Qt adapter over the Chrome launcher (core.chrome)"""
 import logging
-import socket
-import subprocess
-from typing import Optional, Tuple, Dict
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, List, Deque
 
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
-from PyQt6.QtWidgets import QApplication
-from DrissionPage import ChromiumPage, ChromiumOptions
 
-from config import CHROME_PATH, GRID_COLS, GRID_ROWS
+from config import CACHE_PROXY_ENABLED, CLEANUP_GRACE_MS, PROFILE_STAGE_ENABLED, \
+    PROFILE_ARCHIVE_ENABLED, PROFILE_ARCHIVE_SWEEP_HOURS, SESSION_VAULT_ENABLED, BROWSER_WINDOW_MODE
+from .cancellation import OperationCancelled
+from .qt_workers import keep_until_finished
+from .chrome import OFFSCREEN, OFFSCREEN_ARGUMENTS, ChromeLauncher, get_screen_size, grid_geometry, \
+    offscreen_geometry, place_window, quit_driver
 
-logger = logging.getLogger(__name__)
-
-
-def find_free_port() -> int:
-    """Get an available port number"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        return s.getsockname()[1]
-
-
-def get_screen_size() -> Tuple[int, int]:
-    """Get primary screen size"""
-    try:
-        app = QApplication.instance()
-        if app:
-            screen = app.primaryScreen()
-            if screen:
-                size = screen.availableGeometry()
-                return size.width(), size.height()
-    except Exception as e:
-        logger.warning(f"Failed to get screen size: {e}")
-    return 1920, 1080
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+    from .cache_proxy import CachingProxy
+    from .concurrency import ConcurrencyController
+    from .profile_archive import ProfileArchive
+    from .profile_stage import ProfileStager
+    from .session_vault import SessionVault
 
-
-def kill_existing_chrome_processes(profile_path: str) -> None:
-    """Kill any existing Chrome processes using the same profile"""
-    try:
-        result = subprocess.run(
-            ['pgrep', '-f', f'--user-data-dir={profile_path}'],
-            capture_output=True, text=True
-        )
-        if result.stdout.strip():
-            for pid in result.stdout.strip().split('\n'):
-                try:
-                    subprocess.run(['kill', '-9', pid], capture_output=True)
-                except Exception as e:
-                    logger.warning(f"Failed to kill process {pid}: {e}")
-    except Exception as e:
-        logger.warning(f"Failed to kill Chrome processes: {e}")
+logger = logging.getLogger(__name__)
 
 
 class BrowserLaunchWorker(QThread):
-    """Worker thread for launching Chrome browser"""
+    """Worker thread running a ChromeLauncher and reporting through signals"""
     
     started_signal = pyqtSignal(str)
     success_signal = pyqtSignal(str, object)
     error_signal = pyqtSignal(str, str)
     finished_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal(str)
     
     def __init__(self, uid: str, profile_path: str, proxy: Optional[str] = None,
                  window_position: Optional[Tuple[int, int]] = None,
-                 window_size: Optional[Tuple[int, int]] = None, parent=None):
+                 window_size: Optional[Tuple[int, int]] = None, headless: bool = False,
+                 extra_arguments: Optional[List[str]] = None,
+                 stager: Optional["ProfileStager"] = None,
+                 archive: Optional["ProfileArchive"] = None,
+                 session_vault: Optional["SessionVault"] = None, parent=None):
         super().__init__(parent)
         self.uid = uid
-        self.profile_path = profile_path
-        self.proxy = proxy
-        self.window_position = window_position
-        self.window_size = window_size
-        self.driver: Optional[ChromiumPage] = None
+        self.launcher = ChromeLauncher(uid, profile_path, proxy, window_position, window_size,
+                                       headless, extra_arguments, stager=stager, archive=archive,
+                                       session_vault=session_vault)
+        self.cancel_token = self.launcher.cancel_token
+        self.elapsed_s: Optional[float] = None
+    
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
     
     def run(self) -> None:
         try:
             self.started_signal.emit(self.uid)
-            kill_existing_chrome_processes(self.profile_path)
-            
-            self.driver = self._create_chrome_driver()
-            if self.driver:
-                self._set_window_geometry()
-                self.success_signal.emit(self.uid, self.driver)
-            else:
-                self.error_signal.emit(self.uid, "Failed to create driver")
+            started = time.perf_counter()
+            driver = self.launcher.launch()
+            self.elapsed_s = time.perf_counter() - started
+            if self.cancel_token.is_cancelled:
+                # Cancelled after the launcher's last check, maybe by cleanup(): the
+                # manager may never handle success_signal, so nobody would close this browser
+                quit_driver(self.uid, driver)
+                if self.launcher.stager:
+                    self.launcher.stager.release(self.uid)
+                self.cancelled_signal.emit(self.uid)
+                return
+            self.success_signal.emit(self.uid, driver)
+        except OperationCancelled:
+            self.cancelled_signal.emit(self.uid)
         except Exception as e:
             logger.exception(f"Browser launch failed for {self.uid}")
             self.error_signal.emit(self.uid, str(e))
         finally:
             self.finished_signal.emit(self.uid)
-    
-    def _set_window_geometry(self) -> None:
-        """Set window position and size"""
-        if not (self.window_position and self.window_size):
-            return
-        try:
-            import time
-            time.sleep(0.5)
-            w, h = self.window_size
-            x, y = self.window_position
-            
-            try:
-                self.driver.set.window.size(w, h)
-                self.driver.set.window.location(x, y)
-            except Exception:
-                self.driver.run_js(f'window.resizeTo({w}, {h}); window.moveTo({x}, {y});')
-            
-            logger.info(f"[{self.uid}] Window set to: pos=({x},{y}), size=({w}x{h})")
-        except Exception as e:
-            logger.warning(f"Failed to set window geometry: {e}")
-    
-    def _create_chrome_driver(self) -> Optional[ChromiumPage]:
-        """Create Chrome driver with DrissionPage"""
-        try:
-            port = find_free_port()
-            options = ChromiumOptions()
-            options.set_paths(local_port=port, user_data_path=self.profile_path)
-            options.set_paths(CHROME_PATH)
-            
-            arguments = [
-                f'--user-data-dir={self.profile_path}',
-                '--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
-                '--disable-features=IsolateOrigins,site-per-process,TranslateUI,Translate',
-                '-no-first-run', '-force-color-profile=srgb', '-metrics-recording-only',
-                '-password-store=basic', '-use-mock-keychain', '-no-default-browser-check',
-                '-disable-background-mode', '-deny-permission-prompts',
-            ]
-            
-            if self.window_size:
-                arguments.append(f'--window-size={self.window_size[0]},{self.window_size[1]}')
-            if self.window_position:
-                arguments.append(f'--window-position={self.window_position[0]},{self.window_position[1]}')
-            
-            if self.proxy:
-                arguments.append(f'--proxy-server={self.proxy}')
-            else:
-                arguments.extend(['--no-proxy-server', '--proxy-server="direct://"', '--proxy-bypass-list=*'])
-            
-            for arg in arguments:
-                options.set_argument(arg)
-            
-            return ChromiumPage(options)
-        except Exception as e:
-            logger.exception(f"Chrome driver creation failed: {e}")
-            raise
 
 
 class BrowserManager(QObject):
-    """Manages multiple browser instances"""
+    """Manages multiple browser instances.
+
+    With a ConcurrencyController, launches beyond its launch limit wait in a
+    queue and start as slots free up or the limit grows. In the "offscreen"
+    window mode windows are parked off screen (watched on the thumbnail wall)
+    and ``show_browser`` brings one on screen at a time.
+    """
     
     browser_starting = pyqtSignal(str)
     browser_started = pyqtSignal(str)
     browser_error = pyqtSignal(str, str)
     browser_closed = pyqtSignal(str)
+    browser_cancelled = pyqtSignal(str)
+    _limits_changed = pyqtSignal()          # From the controller thread, queued to the GUI thread
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, headless: bool = False, extra_arguments: Optional[List[str]] = None,
+                 use_cache_proxy: bool = CACHE_PROXY_ENABLED,
+                 use_profile_stage: bool = PROFILE_STAGE_ENABLED,
+                 archive_idle_profiles: bool = PROFILE_ARCHIVE_ENABLED,
+                 use_session_vault: bool = SESSION_VAULT_ENABLED,
+                 concurrency: Optional["ConcurrencyController"] = None,
+                 window_mode: str = BROWSER_WINDOW_MODE):
         super().__init__(parent)
         self.workers: Dict[str, BrowserLaunchWorker] = {}
-        self.drivers: Dict[str, ChromiumPage] = {}
+        self.queued: Deque[str] = deque()
+        self.concurrency = concurrency
+        if concurrency:
+            self._limits_changed.connect(self._start_queued)
+            concurrency.subscribe(self._notify_limits_changed)
+        self.drivers: Dict[str, "ChromiumPage"] = {}
         self.browser_count = 0
-        self._calculate_grid()
-    
-    def _calculate_grid(self) -> None:
-        screen_w, screen_h = get_screen_size()
-        self.browser_width = max(screen_w // GRID_COLS, 400)
-        self.browser_height = max(screen_h // GRID_ROWS, 300)
-        logger.info(f"Grid: {screen_w}x{screen_h} -> {self.browser_width}x{self.browser_height}")
+        self.headless = headless
+        self.extra_arguments = list(extra_arguments or [])
+        self.use_cache_proxy = use_cache_proxy
+        self.cache_proxy: Optional["CachingProxy"] = None
+        self.profile_stager: Optional["ProfileStager"] = None
+        if use_profile_stage:
+            # Started now so profiles left in RAM by a crash are written back right away
+            from .profile_stage import start_stager
+            self.profile_stager = start_stager()
+        # Archived profiles are restored on launch whether or not this process sweeps
+        self.profile_archive: Optional["ProfileArchive"] = None
+        self.archive_idle_profiles = archive_idle_profiles
+        if archive_idle_profiles:
+            self._get_profile_archive().start_sweeper(PROFILE_ARCHIVE_SWEEP_HOURS)
+        self.use_session_vault = use_session_vault
+        self.session_vault: Optional["SessionVault"] = None
+        self.window_mode = window_mode
+        self.shown_uid: Optional[str] = None    # Browser brought on screen in the offscreen mode
+        # Screen geometry is read on the first launch, not while the app starts
+        self.browser_width = self.browser_height = 0
     
     def _get_next_position(self) -> Tuple[int, int]:
-        self._calculate_grid()
-        idx = self.browser_count % (GRID_COLS * GRID_ROWS)
-        col, row = idx % GRID_COLS, idx // GRID_COLS
-        x, y = col * self.browser_width, row * self.browser_height
+        if self.window_mode == OFFSCREEN:
+            (x, y), (self.browser_width, self.browser_height) = offscreen_geometry()
+        else:
+            (x, y), (self.browser_width, self.browser_height) = grid_geometry(self.browser_count, get_screen_size())
         self.browser_count += 1
         logger.debug(f"Browser #{self.browser_count}: pos=({x},{y})")
         return (x, y)
     
     def launch_browser(self, uid: str, profile_path: str, proxy: Optional[str] = None) -> None:
-        if uid in self.drivers or (uid in self.workers and self.workers[uid].isRunning()):
+        if uid in self.drivers or uid in self.queued or (uid in self.workers and self.workers[uid].isRunning()):
             logger.info(f"Browser already running/launching for {uid}")
             return
         
         position = self._get_next_position()
         size = (self.browser_width, self.browser_height)
         
-        worker = BrowserLaunchWorker(uid, profile_path, proxy, position, size, self)
+        extra_arguments = list(self.extra_arguments)
+        if not proxy and self.use_cache_proxy:
+            proxy = self._get_cache_proxy().proxy_rules
+            # Chrome bypasses proxies for loopback hosts unless told otherwise
+            extra_arguments.append('--proxy-bypass-list=<-loopback>')
+        if self.window_mode == OFFSCREEN:
+            extra_arguments.extend(OFFSCREEN_ARGUMENTS)
+        
+        worker = BrowserLaunchWorker(uid, profile_path, proxy, position, size,
+                                     self.headless, extra_arguments, self.profile_stager,
+                                     self._launch_archive(uid), self._get_session_vault(), self)
         worker.started_signal.connect(lambda u: self.browser_starting.emit(u))
         worker.success_signal.connect(self._on_browser_started)
         worker.error_signal.connect(lambda u, e: self.browser_error.emit(u, e))
         worker.finished_signal.connect(self._on_worker_finished)
         
         self.workers[uid] = worker
+        if self.concurrency and not self.concurrency.gates["launch"].try_acquire():
+            self.queued.append(uid)
+            return
         worker.start()
     
-    def _on_browser_started(self, uid: str, driver: ChromiumPage) -> None:
+    def _notify_limits_changed(self, _snapshot) -> None:
+        self._limits_changed.emit()
+    
+    def _start_queued(self) -> None:
+        gate = self.concurrency.gates["launch"]
+        while self.queued and gate.try_acquire():
+            self.workers[self.queued.popleft()].start()
+    
+    def _get_cache_proxy(self) -> "CachingProxy":
+        if self.cache_proxy is None:
+            from .cache_proxy import CachingProxy
+            self.cache_proxy = CachingProxy().start()
+        return self.cache_proxy
+    
+    def _get_profile_archive(self) -> "ProfileArchive":
+        if self.profile_archive is None:
+            from .profile_archive import ProfileArchive
+            self.profile_archive = ProfileArchive()
+        return self.profile_archive
+    
+    def _launch_archive(self, uid: str) -> Optional["ProfileArchive"]:
+        """The archive when this launch needs it: sweeps record launches, archived profiles are restored"""
+        if self.archive_idle_profiles:
+            return self._get_profile_archive()
+        from .profile_archive import has_archive
+        return self._get_profile_archive() if has_archive(uid) else None
+    
+    def _get_session_vault(self) -> Optional["SessionVault"]:
+        if self.use_session_vault and self.session_vault is None:
+            from .session_vault import SessionVault
+            self.session_vault = SessionVault()
+        return self.session_vault
+    
+    def _on_browser_started(self, uid: str, driver: "ChromiumPage") -> None:
+        worker = self.workers.get(uid)
+        if worker and worker.cancel_token.is_cancelled:
+            # Cancelled after the worker's last check: drop the browser it just opened
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            if self.profile_stager:
+                self.profile_stager.release(uid)
+            return
         self.drivers[uid] = driver
+        if self.concurrency and worker and worker.elapsed_s is not None:
+            self.concurrency.record("launch", "launch", worker.elapsed_s)
         self.browser_started.emit(uid)
     
+    def cancel_launch(self, uid: str) -> bool:
+        """Cancel a pending launch; the UI is notified immediately"""
+        if uid in self.queued:
+            self.queued.remove(uid)
+            self.workers.pop(uid).deleteLater()
+            self.browser_cancelled.emit(uid)
+            return True
+        worker = self.workers.get(uid)
+        if not worker or not worker.isRunning() or worker.cancel_token.is_cancelled:
+            return False
+        worker.cancel()
+        self.browser_cancelled.emit(uid)
+        return True
+    
     def _on_worker_finished(self, uid: str) -> None:
         if uid in self.workers:
             worker = self.workers[uid]
@@ -201,14 +238,40 @@ class BrowserManager(QObject):
                 worker.wait(1000)
             worker.deleteLater()
             del self.workers[uid]
+        if self.concurrency:
+            self.concurrency.gates["launch"].release()
+            self._start_queued()
+    
+    def show_browser(self, uid: str) -> bool:
+        """Bring a running browser's window to the front; parked windows swap with the one on screen"""
+        driver = self.drivers.get(uid)
+        if driver is None:
+            return False
+        placements = []
+        if self.window_mode == OFFSCREEN:
+            previous = self.drivers.get(self.shown_uid) if self.shown_uid != uid else None
+            if previous is not None:
+                placements.append((self.shown_uid, previous, offscreen_geometry()[0], False))
+            placements.append((uid, driver, (0, 0), True))
+            self.shown_uid = uid
+        else:
+            placements.append((uid, driver, None, True))
+        
+        def place() -> None:
+            for placement in placements:
+                place_window(*placement)
+        
+        # Window calls wait on the browser: keep them off the GUI thread
+        threading.Thread(target=place, name=f"show-{uid}", daemon=True).start()
+        return True
     
     def close_browser(self, uid: str) -> None:
+        if uid == self.shown_uid:
+            self.shown_uid = None
         if uid in self.drivers:
-            try:
-                self.drivers[uid].quit()
-            except Exception as e:
-                logger.warning(f"Failed to close browser {uid}: {e}")
-            del self.drivers[uid]
+            quit_driver(uid, self.drivers.pop(uid))
+            if self.profile_stager:
+                self.profile_stager.release(uid)
             self.browser_closed.emit(uid)
     
     def close_all_browsers(self) -> None:
@@ -219,13 +282,39 @@ class BrowserManager(QObject):
         return uid in self.drivers
     
     def is_browser_launching(self, uid: str) -> bool:
-        return uid in self.workers and self.workers[uid].isRunning()
+        if uid in self.queued:
+            return True
+        worker = self.workers.get(uid)
+        return bool(worker and worker.isRunning() and not worker.cancel_token.is_cancelled)
     
-    def get_driver(self, uid: str) -> Optional[ChromiumPage]:
+    def get_driver(self, uid: str) -> Optional["ChromiumPage"]:
         return self.drivers.get(uid)
     
     def cleanup(self) -> None:
-        for worker in list(self.workers.values()):
+        if self.concurrency:
+            self.concurrency.unsubscribe(self._notify_limits_changed)
+        while self.queued:
+            self.workers.pop(self.queued.popleft()).deleteLater()
+        running = [w for w in self.workers.values() if w.isRunning()]
+        for worker in running:
+            worker.cancel()
+        deadline = time.monotonic() + CLEANUP_GRACE_MS / 1000
+        for worker in running:
+            worker.wait(max(0, int((deadline - time.monotonic()) * 1000)))
+        # Restores, staging and the DevTools connect cannot be interrupted; such a
+        # worker closes its browser itself when it finishes
+        for worker in self.workers.values():
             if worker.isRunning():
-                worker.wait(2000)
+                keep_until_finished(worker)
+        self.workers.clear()
         self.close_all_browsers()
+        if self.cache_proxy:
+            self.cache_proxy.stop()
+            self.cache_proxy = None
+        if self.profile_stager:
+            self.profile_stager.stop()
+            self.profile_stager = None
+        if self.profile_archive:
+            self.profile_archive.stop()
+            if self.profile_archive.stats.archived or self.profile_archive.stats.restored:
+                logger.info(f"Profile archive: {self.profile_archive.stats.summary()}")
@@ -0,0 +1,449 @@
+"""Cache Proxy Module - Shared local forward proxy caching immutable static assets
+
+All browser profiles share one content-addressed store, so a static bundle is
+downloaded and kept once instead of once per profile. Only plain-HTTP
+responses can be cached without intercepting TLS, so browsers are pointed
+here for http:// URLs only (``proxy_rules``) and HTTPS, which is all of
+Facebook, goes direct. CONNECT still tunnels for other clients.
+"""
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import select
+import shutil
+import socket
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import CACHE_PROXY_DIR, CACHE_PROXY_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+HOP_BY_HOP = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'proxy-connection', 'te', 'trailers', 'transfer-encoding', 'upgrade',
+}
+STATIC_TYPES = ('image/', 'font/', 'text/css', 'javascript', 'application/font', 'application/wasm')
+STATIC_EXTENSIONS = re.compile(r'\.(js|mjs|css|png|jpe?g|gif|webp|avif|svg|ico|woff2?|ttf|otf|wasm)$', re.I)
+MIN_MAX_AGE = 24 * 3600
+CHUNK_SIZE = 65536
+NO_BODY_STATUSES = (204, 304)
+
+
+@dataclass
+class CacheEntry:
+    digest: str
+    size: int
+    content_type: str
+    content_encoding: str = ''
+    vary: str = ''
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_served_local: int = 0
+    bytes_fetched: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (f"hit ratio {self.hit_ratio:.0%} ({self.hits}/{self.hits + self.misses}), "
+                f"{self.bytes_served_local // 1024} KB served locally, "
+                f"{self.bytes_fetched // 1024} KB fetched")
+
+
+def cache_key(url: str, content_encoding: str = '') -> str:
+    """Index key of one encoded variant of a URL (a space never occurs in a request URL)"""
+    return f"{url} {content_encoding}" if content_encoding else url
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Content codings named in an Accept-Encoding header, minus q=0 and identity"""
+    accepted = []
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if name and name not in ('*', 'identity') and not re.search(r'q\s*=\s*0(?:\.0*)?\s*$', params):
+            accepted.append(name)
+    return accepted
+
+
+def is_cacheable(method: str, status: int, headers: Dict[str, str], url: str) -> bool:
+    """Only long-lived, public, static GET responses are shared across profiles"""
+    if method != 'GET' or status != 200 or 'set-cookie' in headers:
+        return False
+    # Variants are keyed by content coding only; any other Vary axis is not shareable
+    vary = {v.strip().lower() for v in headers.get('vary', '').split(',') if v.strip()}
+    if vary - {'accept-encoding'}:
+        return False
+    cache_control = headers.get('cache-control', '').lower()
+    if any(d in cache_control for d in ('no-store', 'no-cache', 'private')):
+        return False
+    max_age = re.search(r'max-age=(\d+)', cache_control)
+    if 'immutable' not in cache_control and not (max_age and int(max_age.group(1)) >= MIN_MAX_AGE):
+        return False
+    content_type = headers.get('content-type', '').lower()
+    return any(t in content_type for t in STATIC_TYPES) or bool(STATIC_EXTENSIONS.search(urlsplit(url).path))
+
+
+class ContentStore:
+    """Content-addressed blob store with a size cap and LRU eviction by URL"""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = CacheStats()
+        self._index: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._load_index()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def get(self, url: str, encodings: Iterable[str] = ()) -> Optional[Tuple[CacheEntry, BinaryIO]]:
+        """Open the stored variant of url in the first acceptable coding, identity last"""
+        with self._lock:
+            for encoding in [*encodings, '']:
+                key = cache_key(url, encoding)
+                entry = self._index.get(key)
+                if entry is not None:
+                    break
+            else:
+                self.stats.misses += 1
+                return None
+            self._index.move_to_end(key)
+            # Open under the lock so eviction cannot delete the blob in between
+            try:
+                blob = open(self._blob_path(entry.digest), 'rb')
+            except OSError:
+                self._drop(key)
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self.stats.bytes_served_local += entry.size
+        return entry, blob
+
+    def open_writer(self) -> "BlobWriter":
+        return BlobWriter(self, self.max_bytes // 4)
+
+    def _commit(self, key: str, tmp: str, entry: CacheEntry) -> None:
+        path = self._blob_path(entry.digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(tmp)
+            else:
+                os.replace(tmp, path)
+            if key in self._index:
+                self._drop(key)
+            self._index[key] = entry
+            if self._refs.get(entry.digest, 0) == 0:
+                self.total_bytes += entry.size
+            self._refs[entry.digest] = self._refs.get(entry.digest, 0) + 1
+            self.stats.stored += 1
+            while self.total_bytes > self.max_bytes and self._index:
+                self._drop(next(iter(self._index)))
+                self.stats.evicted += 1
+
+    def record_fetch(self, size: int) -> None:
+        with self._lock:
+            self.stats.bytes_fetched += size
+
+    def _drop(self, url: str) -> None:
+        """Remove a URL from the index, deleting its blob when unreferenced (lock held)"""
+        entry = self._index.pop(url)
+        refs = self._refs.get(entry.digest, 1) - 1
+        if refs > 0:
+            self._refs[entry.digest] = refs
+            return
+        self._refs.pop(entry.digest, None)
+        self.total_bytes -= entry.size
+        try:
+            os.remove(self._blob_path(entry.digest))
+        except OSError:
+            pass
+
+    def _load_index(self) -> None:
+        try:
+            with open(os.path.join(self.root, 'index.json'), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for url, raw in data.items():
+            entry = CacheEntry(**raw)
+            if not os.path.exists(self._blob_path(entry.digest)):
+                continue
+            self._index[url] = entry
+            if self._refs.get(entry.digest, 0) == 0:
+                self.total_bytes += entry.size
+            self._refs[entry.digest] = self._refs.get(entry.digest, 0) + 1
+
+    def save_index(self) -> None:
+        with self._lock:
+            data = {url: asdict(entry) for url, entry in self._index.items()}
+        tmp = os.path.join(self.root, 'index.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, os.path.join(self.root, 'index.json'))
+
+
+class BlobWriter:
+    """Spools one streamed response body to a temp file while hashing it.
+
+    Gives up once the body outgrows ``limit``, so large downloads are relayed
+    without ever being held in memory or kept on disk.
+    """
+
+    def __init__(self, store: ContentStore, limit: int):
+        self.store = store
+        self.limit = limit
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self._tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.join(store.root, 'objects'))
+        self._file: Optional[BinaryIO] = os.fdopen(fd, 'wb')
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def write(self, data: bytes) -> None:
+        if self._file is None:
+            return
+        self.size += len(data)
+        if self.size > self.limit:
+            self.discard()
+            return
+        self._hash.update(data)
+        self._file.write(data)
+
+    def commit(self, key: str, content_type: str, content_encoding: str = '', vary: str = '') -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        entry = CacheEntry(self._hash.hexdigest(), self.size, content_type, content_encoding, vary)
+        self.store._commit(key, self._tmp, entry)
+
+    def discard(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+
+class CachingProxy:
+    """Threaded HTTP forward proxy in front of a ContentStore"""
+
+    def __init__(self, store: Optional[ContentStore] = None, host: str = '127.0.0.1', port: int = 0):
+        if store is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            store = ContentStore(os.path.join(base_dir, CACHE_PROXY_DIR), CACHE_PROXY_MAX_MB * 1024 * 1024)
+        self.store = store
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(store))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def proxy_rules(self) -> str:
+        """Chrome --proxy-server rules sending only http:// URLs through this proxy"""
+        host, port = self._httpd.server_address[:2]
+        return f"http={host}:{port}"
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.store.stats
+
+    def start(self) -> "CachingProxy":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="cache-proxy", daemon=True)
+        self._thread.start()
+        logger.info(f"Static cache proxy listening on {self.address}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self.store.save_index()
+        logger.info(f"Static cache proxy stopped: {self.stats.summary()}")
+
+
+def _make_handler(store: ContentStore):
+    class Handler(_ProxyHandler):
+        pass
+    Handler.store = store
+    return Handler
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    store: ContentStore
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_CONNECT(self) -> None:
+        host, _, port = self.path.rpartition(':')
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError as e:
+            self.send_error(502, f"Upstream connect failed: {e}")
+            return
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        self._tunnel(self.connection, upstream)
+        self.close_connection = True
+
+    def _tunnel(self, client: socket.socket, upstream: socket.socket) -> None:
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 60)
+                if errored or not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is client else client).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def do_GET(self) -> None:
+        self._proxy()
+
+    def do_HEAD(self) -> None:
+        self._proxy()
+
+    def do_POST(self) -> None:
+        self._proxy()
+
+    def do_PUT(self) -> None:
+        self._proxy()
+
+    def do_DELETE(self) -> None:
+        self._proxy()
+
+    def _proxy(self) -> None:
+        url = self.path
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            self.send_error(400, "Absolute http:// URL required")
+            return
+
+        if self.command == 'GET':
+            cached = self.store.get(url, accepted_encodings(self.headers.get('Accept-Encoding', '')))
+            if cached:
+                entry, blob = cached
+                headers = {'Content-Type': entry.content_type,
+                           'Content-Length': str(entry.size),
+                           'Cache-Control': 'public, max-age=31536000, immutable',
+                           'X-Cache': 'HIT'}
+                if entry.content_encoding:
+                    headers['Content-Encoding'] = entry.content_encoding
+                if entry.vary:
+                    headers['Vary'] = entry.vary
+                with blob:
+                    self._send_head(200, headers)
+                    shutil.copyfileobj(blob, self.wfile, CHUNK_SIZE)
+                return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        try:
+            conn.request(self.command, path, body=payload, headers=headers)
+            response = conn.getresponse()
+        except OSError as e:
+            conn.close()
+            self.send_error(502, f"Upstream request failed: {e}")
+            return
+        try:
+            self._relay(url, response)
+        finally:
+            conn.close()
+
+    def _relay(self, url: str, response: http.client.HTTPResponse) -> None:
+        """Stream an upstream response to the client, spooling cacheable bodies to the store"""
+        resp_headers = {k.lower(): v for k, v in response.getheaders()}
+        has_body = self.command != 'HEAD' and response.status >= 200 and response.status not in NO_BODY_STATUSES
+        length = resp_headers.get('content-length')
+        chunked = has_body and length is None and self.request_version != 'HTTP/1.0'
+        out_headers = [(k, v) for k, v in response.getheaders() if k.lower() not in HOP_BY_HOP]
+        if chunked:
+            out_headers.append(('Transfer-Encoding', 'chunked'))
+        elif has_body and length is None:
+            self.close_connection = True
+        out_headers.append(('X-Cache', 'MISS'))
+
+        writer = self.store.open_writer() if is_cacheable(self.command, response.status, resp_headers, url) else None
+        fetched = 0
+        complete = False
+        try:
+            self._send_head(response.status, out_headers, response.reason)
+            while has_body:
+                data = response.read1(CHUNK_SIZE)
+                if not data:
+                    break
+                fetched += len(data)
+                if writer:
+                    writer.write(data)
+                if chunked:
+                    self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+                else:
+                    self.wfile.write(data)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+            complete = length is None or fetched == int(length)
+        except (OSError, http.client.HTTPException) as e:
+            # Headers are already out, so the only way to signal failure is to drop the connection
+            logger.debug(f"Relay of {url} aborted: {e}")
+            self.close_connection = True
+        finally:
+            self.store.record_fetch(fetched)
+            if writer:
+                if complete and writer.active:
+                    encoding = resp_headers.get('content-encoding', '').strip().lower()
+                    writer.commit(cache_key(url, encoding), resp_headers.get('content-type', 'application/octet-stream'),
+                                  encoding, resp_headers.get('vary', ''))
+                else:
+                    writer.discard()
+
+    def _send_head(self, status: int, headers, reason: Optional[str] = None) -> None:
+        self.send_response(status, reason)
+        items = headers.items() if isinstance(headers, dict) else headers
+        for key, value in items:
+            self.send_header(key, value)
+        self.end_headers()
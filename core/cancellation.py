@@ -0,0 +1,56 @@
+"""Cancellation Module - Tokens that interrupt waits in worker threads immediately"""
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class OperationCancelled(BaseException):
+    """Raised inside a worker when its token is cancelled.
+
+    Derives from BaseException (like asyncio.CancelledError) so the generic
+    ``except Exception`` blocks around each step do not swallow it.
+    """
+
+
+class CancellationToken:
+    """Thread-safe cancel flag whose waits wake up as soon as it is set"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Run callback on cancel (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep that raises OperationCancelled the moment the token is cancelled"""
+        if self._event.wait(seconds):
+            raise OperationCancelled()
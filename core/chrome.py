@@ -0,0 +1,308 @@
+"""Chrome Module - Qt-free Chrome launch, placement and teardown with DrissionPage"""
+import logging
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple, List
+
+from config import CHROME_PATH, GRID_COLS, GRID_ROWS, DEFAULT_SCREEN_SIZE, OFFSCREEN_WINDOW_SIZE
+from .cancellation import CancellationToken, OperationCancelled
+from .proxy_pool import chrome_proxy_argument
+from .session_vault import has_cookie_store
+from .tracing import span
+
+if TYPE_CHECKING:
+    # DrissionPage (and requests under it) is imported on first launch, not at startup
+    from DrissionPage import ChromiumPage
+    from .profile_archive import ProfileArchive
+    from .profile_stage import ProfileStager
+    from .session_vault import SessionVault
+
+logger = logging.getLogger(__name__)
+
+OFFSCREEN = "offscreen"          # BROWSER_WINDOW_MODE that parks windows off screen
+# Parked windows count as occluded; keep them painting so their thumbnails stay live
+OFFSCREEN_ARGUMENTS = ['--disable-backgrounding-occluded-windows', '--disable-renderer-backgrounding']
+
+
+def find_free_port() -> int:
+    """Get an available port number"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('', 0))
+        return s.getsockname()[1]
+
+
+def get_screen_size() -> Tuple[int, int]:
+    """Available primary screen size.
+
+    Uses the running QApplication when there is one (without importing Qt),
+    then FBM_SCREEN_SIZE=WxH, then xrandr, then DEFAULT_SCREEN_SIZE.
+    """
+    widgets = sys.modules.get("PyQt6.QtWidgets")
+    if widgets is not None:
+        try:
+            app = widgets.QApplication.instance()
+            screen = app.primaryScreen() if app else None
+            if screen:
+                size = screen.availableGeometry()
+                return size.width(), size.height()
+        except Exception as e:
+            logger.warning(f"Failed to get screen size: {e}")
+
+    override = re.fullmatch(r'(\d+)x(\d+)', os.environ.get("FBM_SCREEN_SIZE", ""))
+    if override:
+        return int(override.group(1)), int(override.group(2))
+
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            result = subprocess.run(['xrandr', '--current'], capture_output=True, text=True, timeout=2)
+            match = re.search(r' primary (\d+)x(\d+)', result.stdout) or re.search(r'current (\d+) x (\d+)', result.stdout)
+            if match:
+                return int(match.group(1)), int(match.group(2))
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return DEFAULT_SCREEN_SIZE
+
+
+def grid_geometry(index: int, screen_size: Tuple[int, int]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Window (position, size) for the index-th browser on a GRID_COLS x GRID_ROWS grid"""
+    screen_w, screen_h = screen_size
+    width = max(screen_w // GRID_COLS, 400)
+    height = max(screen_h // GRID_ROWS, 300)
+    idx = index % (GRID_COLS * GRID_ROWS)
+    col, row = idx % GRID_COLS, idx // GRID_COLS
+    return (col * width, row * height), (width, height)
+
+
+def offscreen_geometry(size: Tuple[int, int] = OFFSCREEN_WINDOW_SIZE) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Window (position, size) just left of the primary screen, for browsers watched as thumbnails"""
+    return (-(size[0] + 100), 0), size
+
+
+def place_window(uid: str, driver: "ChromiumPage", position: Optional[Tuple[int, int]] = None,
+                 bring_to_front: bool = True) -> None:
+    """Un-minimize a browser window, move it to ``position`` and raise it, logging rather than raising"""
+    try:
+        driver.set.window.normal()
+        if position:
+            driver.set.window.location(*position)
+        if bring_to_front:
+            driver.run_cdp('Page.bringToFront')
+    except Exception as e:
+        logger.warning(f"[{uid}] Failed to place browser window: {e}")
+
+
+def chrome_processes(profile_path: str) -> List[str]:
+    """PIDs of Chrome processes using this profile"""
+    try:
+        result = subprocess.run(
+            ['pgrep', '-f', f'--user-data-dir={profile_path}'],
+            capture_output=True, text=True
+        )
+    except Exception as e:
+        logger.warning(f"Failed to list Chrome processes: {e}")
+        return []
+    return result.stdout.split()
+
+
+def kill_existing_chrome_processes(profile_path: str) -> None:
+    """Kill any existing Chrome processes using the same profile"""
+    for pid in chrome_processes(profile_path):
+        try:
+            subprocess.run(['kill', '-9', pid], capture_output=True)
+        except Exception as e:
+            logger.warning(f"Failed to kill process {pid}: {e}")
+
+
+def chrome_arguments(profile_path: str, proxy: Optional[str] = None,
+                     window_position: Optional[Tuple[int, int]] = None,
+                     window_size: Optional[Tuple[int, int]] = None, headless: bool = False,
+                     extra_arguments: Optional[List[str]] = None) -> List[str]:
+    """Command line switches for one profile"""
+    arguments = [
+        f'--user-data-dir={profile_path}',
+        '--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
+        '--disable-features=IsolateOrigins,site-per-process,TranslateUI,Translate',
+        '-no-first-run', '-force-color-profile=srgb', '-metrics-recording-only',
+        '-password-store=basic', '-use-mock-keychain', '-no-default-browser-check',
+        '-disable-background-mode', '-deny-permission-prompts',
+    ]
+
+    if window_size:
+        arguments.append(f'--window-size={window_size[0]},{window_size[1]}')
+    if window_position:
+        arguments.append(f'--window-position={window_position[0]},{window_position[1]}')
+
+    if proxy:
+        arguments.append(f'--proxy-server={chrome_proxy_argument(proxy)}')
+    else:
+        arguments.extend(['--no-proxy-server', '--proxy-server="direct://"', '--proxy-bypass-list=*'])
+
+    if headless:
+        arguments.append('--headless=new')
+    arguments.extend(extra_arguments or [])
+    return arguments
+
+
+class ChromeLauncher:
+    """Launches one Chrome profile; cancellable from any thread.
+
+    Pure Python: the Qt adapter (BrowserLaunchWorker) and the headless
+    engine both drive this and report the outcome their own way.
+    """
+
+    def __init__(self, uid: str, profile_path: str, proxy: Optional[str] = None,
+                 window_position: Optional[Tuple[int, int]] = None,
+                 window_size: Optional[Tuple[int, int]] = None, headless: bool = False,
+                 extra_arguments: Optional[List[str]] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 stager: Optional["ProfileStager"] = None,
+                 archive: Optional["ProfileArchive"] = None,
+                 session_vault: Optional["SessionVault"] = None):
+        self.uid = uid
+        self.profile_path = profile_path
+        self.stager = stager
+        self.archive = archive
+        self.session_vault = session_vault
+        self.proxy = proxy
+        self.window_position = window_position
+        self.window_size = window_size
+        self.headless = headless
+        self.extra_arguments = list(extra_arguments or [])
+        self.driver: Optional["ChromiumPage"] = None
+        self.cancel_token = cancel_token or CancellationToken()
+        self.cancel_token.on_cancel(self._abort_launch)
+
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
+
+    def _abort_launch(self) -> None:
+        # Killing the half-started Chrome makes a pending ChromiumPage() connect fail fast
+        threading.Thread(target=kill_existing_chrome_processes, args=(self.profile_path,),
+                         name=f"abort-{self.uid}", daemon=True).start()
+
+    def launch(self) -> "ChromiumPage":
+        """Start Chrome and place its window; raises OperationCancelled or the launch error"""
+        with span("launch", self.uid):
+            try:
+                self.cancel_token.check()
+                if self.archive:
+                    with span("launch.restore_profile", self.uid):
+                        self.archive.restore(self.uid, self.profile_path)
+                    self.cancel_token.check()
+                if self.stager:
+                    with span("launch.stage_profile", self.uid):
+                        kill_existing_chrome_processes(self.profile_path)
+                        self.profile_path = self.stager.stage(self.uid, self.profile_path)
+                    self.cancel_token.check()
+                with span("launch.kill_existing", self.uid):
+                    kill_existing_chrome_processes(self.profile_path)
+                fresh = self.session_vault is not None and not has_cookie_store(self.profile_path)
+
+                with span("launch.spawn", self.uid):
+                    self.driver = self._create_chrome_driver()
+                self.cancel_token.check()
+                if not self.driver:
+                    raise RuntimeError("Failed to create driver")
+                with span("launch.window_geometry", self.uid):
+                    self._set_window_geometry()
+                if fresh:
+                    self._restore_session()
+                self.cancel_token.check()
+                return self.driver
+            except OperationCancelled:
+                self._discard_driver()
+                raise
+            except Exception:
+                if self.stager:
+                    self.stager.release(self.uid)
+                if self.cancel_token.is_cancelled:
+                    self._discard_driver()
+                    raise OperationCancelled()
+                raise
+
+    def _discard_driver(self) -> None:
+        """Leave nothing behind after a cancelled launch"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        if self.stager:
+            self.stager.release(self.uid)
+        logger.info(f"[{self.uid}] Launch cancelled")
+
+    def _restore_session(self) -> None:
+        """A profile without cookies gets the account's saved session, if there is one"""
+        try:
+            with span("launch.restore_session", self.uid):
+                self.session_vault.restore(self.driver, self.uid)
+        except Exception as e:
+            logger.warning(f"[{self.uid}] Saved session not restored: {e}")
+
+    def _set_window_geometry(self) -> None:
+        """Set window position and size"""
+        if self.headless or not (self.window_position and self.window_size):
+            return
+        try:
+            self.cancel_token.sleep(0.5)
+            w, h = self.window_size
+            x, y = self.window_position
+
+            try:
+                self.driver.set.window.size(w, h)
+                self.driver.set.window.location(x, y)
+            except Exception:
+                self.driver.run_js(f'window.resizeTo({w}, {h}); window.moveTo({x}, {y});')
+
+            logger.info(f"[{self.uid}] Window set to: pos=({x},{y}), size=({w}x{h})")
+        except Exception as e:
+            logger.warning(f"Failed to set window geometry: {e}")
+
+    def _create_chrome_driver(self) -> Optional["ChromiumPage"]:
+        """Create Chrome driver with DrissionPage"""
+        from DrissionPage import ChromiumPage, ChromiumOptions
+        try:
+            port = find_free_port()
+            options = ChromiumOptions()
+            options.set_paths(local_port=port, user_data_path=self.profile_path)
+            options.set_paths(CHROME_PATH)
+
+            for arg in chrome_arguments(self.profile_path, self.proxy, self.window_position,
+                                        self.window_size, self.headless, self.extra_arguments):
+                options.set_argument(arg)
+
+            return ChromiumPage(options)
+        except Exception as e:
+            logger.exception(f"Chrome driver creation failed: {e}")
+            raise
+
+
+def attach_chrome(profile_path: str) -> Optional["ChromiumPage"]:
+    """Connect to a Chrome already running on this profile (e.g. opened by another process)"""
+    try:
+        with open(os.path.join(profile_path, 'DevToolsActivePort'), encoding='utf-8') as f:
+            port = int(f.readline().strip())
+        # A stale file outlives a crashed Chrome: check something is listening first
+        with socket.create_connection(('127.0.0.1', port), timeout=1):
+            pass
+    except (OSError, ValueError):
+        return None
+    from DrissionPage import ChromiumPage
+    try:
+        return ChromiumPage(f'127.0.0.1:{port}')
+    except Exception as e:
+        logger.warning(f"Failed to attach to Chrome on port {port}: {e}")
+        return None
+
+
+def quit_driver(uid: str, driver: "ChromiumPage") -> None:
+    """Close a browser, logging rather than raising"""
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Failed to close browser {uid}: {e}")
@@ -0,0 +1,321 @@
+"""Concurrency Module - Launch/login limits that follow live host load (AIMD)
+
+Launches and logins each pass through a ``Gate`` whose limit the controller
+retunes every CONCURRENCY_INTERVAL seconds from:
+
+* MemAvailable (``/proc/meminfo``),
+* PSI "some" avg10 of cpu/memory/io (``/proc/pressure``, Linux 4.20+),
+* 1-minute load average per CPU,
+* how much slower launches and login steps run than their own baseline
+  (work time only; the flow's fixed settle sleeps are left out).
+
+Like TCP congestion control: while nothing is under pressure and the gate is
+in demand, its limit grows by one per interval (additive increase). On
+pressure it is halved (multiplicative decrease), then held for a few intervals
+so one pressure spike, which PSI and the load average keep reporting for a
+while, counts only once. Several engines (farm workers) on one host tune
+their limits independently and still converge to a fair share.
+Signals the host cannot provide (no PSI, no /proc on macOS) are skipped.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import CONCURRENCY_MIN, CONCURRENCY_MAX, CONCURRENCY_INITIAL, CONCURRENCY_INTERVAL, \
+    CONCURRENCY_MIN_FREE_MB, CONCURRENCY_MAX_PSI, CONCURRENCY_MAX_LOAD, CONCURRENCY_MAX_SLOWDOWN
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("launch", "login")
+BACKOFF = 0.5               # Multiplicative decrease
+HOLD_INTERVALS = 5          # Intervals without another decrease after one (PSI avg10 spans 10 s)
+FAST_ALPHA = 0.3            # EWMA weight of a new latency sample
+BASELINE_DRIFT = 0.02       # How fast a baseline follows latencies above it
+MIN_SAMPLES = 3             # Samples of a step before its slowdown counts
+
+
+@dataclass
+class HostLoad:
+    mem_available_mb: Optional[float] = None
+    mem_total_mb: Optional[float] = None
+    load_per_cpu: Optional[float] = None
+    pressure: Optional[Dict[str, float]] = None     # cpu/memory/io -> PSI "some" avg10 (%)
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def _read_psi(resource: str) -> Optional[float]:
+    try:
+        with open(f"/proc/pressure/{resource}") as f:
+            for line in f:
+                if line.startswith("some "):
+                    return float(line.split("avg10=", 1)[1].split()[0])
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def read_host_load() -> HostLoad:
+    load = HostLoad()
+    try:
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("MemTotal", "MemAvailable"):
+                    meminfo[key] = int(rest.split()[0]) / 1024
+        load.mem_total_mb = meminfo.get("MemTotal")
+        load.mem_available_mb = meminfo.get("MemAvailable")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        load.load_per_cpu = os.getloadavg()[0] / _cpu_count()
+    except (AttributeError, OSError):
+        pass
+    pressure = {r: v for r in ("cpu", "memory", "io") if (v := _read_psi(r)) is not None}
+    load.pressure = pressure or None
+    return load
+
+
+class Gate:
+    """Counting semaphore whose limit can change while it is in use"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiting = 0
+        self._saturated = False     # Someone had to wait (or the gate was full) since the last tick
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free (callers that queue work themselves)"""
+        with self._cond:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            self._saturated = True
+            return False
+
+    def acquire(self, token: Optional[CancellationToken] = None) -> None:
+        """Block until a slot is free; raises OperationCancelled if the token is cancelled first"""
+        if token is not None:
+            token.on_cancel(self._wake)
+        with self._cond:
+            self.waiting += 1
+            try:
+                while self.active >= self.limit:
+                    self._saturated = True
+                    if token is not None:
+                        token.check()
+                    self._cond.wait()
+                if token is not None:
+                    token.check()
+                self.active += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.active = max(0, self.active - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, token: Optional[CancellationToken] = None):
+        self.acquire(token)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self.limit = limit
+            self._cond.notify_all()
+
+    def take_demand(self) -> bool:
+        """Whether the limit held work back since the last call"""
+        with self._cond:
+            demand = self._saturated or self.waiting > 0 or self.active >= self.limit
+            self._saturated = False
+            return demand
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+
+class _Latency:
+    """Fast EWMA of one step against the lowest level it has settled at"""
+
+    __slots__ = ("fast", "baseline", "samples")
+
+    def __init__(self):
+        self.fast = self.baseline = 0.0
+        self.samples = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples += 1
+        if self.samples == 1:
+            self.fast = self.baseline = seconds
+            return
+        self.fast += FAST_ALPHA * (seconds - self.fast)
+        if self.fast < self.baseline:
+            self.baseline = self.fast
+        else:
+            self.baseline += BASELINE_DRIFT * (self.fast - self.baseline)
+
+    @property
+    def slowdown(self) -> float:
+        if self.samples < MIN_SAMPLES or self.baseline <= 0:
+            return 1.0
+        return self.fast / self.baseline
+
+
+class ConcurrencyController:
+    """Retunes the launch and login gates from host load and step latency"""
+
+    def __init__(self, minimum: int = CONCURRENCY_MIN, maximum: int = CONCURRENCY_MAX,
+                 initial: int = CONCURRENCY_INITIAL, interval: float = CONCURRENCY_INTERVAL):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.interval = interval
+        start = min(max(initial, self.minimum), self.maximum)
+        self.gates: Dict[str, Gate] = {kind: Gate(kind, start) for kind in KINDS}
+        self.reasons: Dict[str, str] = dict.fromkeys(KINDS, "starting")
+        self.load = HostLoad()
+        self._latency: Dict[Tuple[str, str], _Latency] = {}
+        self._samples: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self._samples_at_backoff: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self._hold_until: Dict[str, float] = dict.fromkeys(KINDS, 0.0)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----- Lifecycle -----
+
+    def start(self) -> "ConcurrencyController":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="concurrency", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Concurrency controller tick failed")
+
+    # ----- Inputs -----
+
+    def record(self, kind: str, step: str, seconds: float) -> None:
+        """Report how long a launch or login step took (any thread)"""
+        with self._lock:
+            self._latency.setdefault((kind, step), _Latency()).add(seconds)
+            self._samples[kind] += 1
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call back with ``snapshot()`` whenever a limit or its reason changes (controller thread)"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # ----- Control loop -----
+
+    def _slowest(self, kind: str) -> Tuple[float, Optional[str]]:
+        with self._lock:
+            steps = [(lat.slowdown, step) for (k, step), lat in self._latency.items() if k == kind]
+        return max(steps, default=(1.0, None))
+
+    def _host_pressure(self, load: HostLoad) -> Optional[str]:
+        if load.mem_available_mb is not None and load.mem_available_mb < CONCURRENCY_MIN_FREE_MB:
+            return f"low memory ({load.mem_available_mb:.0f} MB available)"
+        for resource, value in sorted((load.pressure or {}).items(), key=lambda item: -item[1]):
+            if value > CONCURRENCY_MAX_PSI:
+                return f"{resource} pressure {value:.0f}%"
+        if load.load_per_cpu is not None and load.load_per_cpu > CONCURRENCY_MAX_LOAD:
+            return f"load {load.load_per_cpu:.1f} per CPU"
+        return None
+
+    def tick(self) -> None:
+        """Read the host and adjust both limits once"""
+        self.load = load = read_host_load()
+        host = self._host_pressure(load)
+        now = time.monotonic()
+        changed = False
+        for kind, gate in self.gates.items():
+            slowdown, step = self._slowest(kind)
+            pressure = host
+            # Latency only counts again once work has run at the lowered limit
+            if pressure is None and slowdown > CONCURRENCY_MAX_SLOWDOWN \
+                    and self._samples[kind] > self._samples_at_backoff[kind]:
+                pressure = f"{kind if step == kind else f'{kind} {step}'} {slowdown:.1f}x slower"
+            demand = gate.take_demand()
+            limit = gate.limit
+            if pressure:
+                if now >= self._hold_until[kind]:
+                    limit = max(self.minimum, int(limit * BACKOFF))
+                    self._hold_until[kind] = now + HOLD_INTERVALS * self.interval
+                    self._samples_at_backoff[kind] = self._samples[kind]
+                reason = pressure
+            elif now < self._hold_until[kind]:
+                held = self.reasons[kind]
+                reason = held if held.startswith("holding") else f"holding after {held}"
+            elif not demand:
+                reason = "idle"
+            elif limit >= self.maximum:
+                reason = "at maximum"
+            else:
+                limit += 1
+                reason = "healthy"
+            if limit != gate.limit:
+                if limit < gate.limit:
+                    logger.info(f"Concurrency: {kind} limit {gate.limit} -> {limit} ({reason})")
+                else:
+                    logger.debug(f"Concurrency: {kind} limit {gate.limit} -> {limit}")
+                gate.set_limit(limit)
+                changed = True
+            if reason != self.reasons[kind]:
+                self.reasons[kind] = reason
+                changed = True
+        if changed:
+            snapshot = self.snapshot()
+            for callback in list(self._listeners):
+                try:
+                    callback(snapshot)
+                except Exception:
+                    logger.exception("Concurrency listener failed")
+
+    # ----- Queries -----
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limit, usage and reason per kind, plus the host readings behind them"""
+        snapshot: Dict[str, Any] = {kind: {"limit": gate.limit, "active": gate.active,
+                                           "waiting": gate.waiting, "reason": self.reasons[kind]}
+                                    for kind, gate in self.gates.items()}
+        snapshot["host"] = {"mem_available_mb": self.load.mem_available_mb,
+                            "load_per_cpu": self.load.load_per_cpu, "pressure": self.load.pressure}
+        return snapshot
+
+    def summary(self) -> str:
+        return ", ".join(f"{kind} {gate.limit} ({self.reasons[kind]})" for kind, gate in self.gates.items())
@@ -0,0 +1,401 @@
+"""Control API Module - Localhost HTTP/JSON control of the manager with an SSE event stream
+
+Endpoints (JSON in and out; bulk calls take thousands of uids at once)::
+
+    GET  /health                      {"ok": true}
+    GET  /status[?uids=a,b]           per-account state and counts
+    POST /status  {"uids": [...]}     same, for long uid lists
+    POST /load    {"text": "..."} or {"lines": [...], "append": false}
+    POST /launch  {"uids": [...]} or {"all": true}
+    POST /login   {"uids": [...]} or {"all": true}
+    POST /close   {"uids": [...]} or {"all": true}
+    POST /cancel  {"uids": [...]} or {"all": true}
+    GET  /events                      Server-Sent Events; resumes from Last-Event-ID
+
+Stdlib only and Qt-free: the GUI plugs in through a ControlBackend that runs
+calls on its own thread (ui.control_bridge), the headless engine through
+EngineBackend. Binds to 127.0.0.1; set FBM_CONTROL_TOKEN to require
+``Authorization: Bearer <token>``.
+
+Web pages must not reach it, token or not: requests with an ``Origin``
+header or a non-loopback ``Host`` (DNS rebinding) are refused, and POST
+bodies must be ``Content-Type: application/json``, which browsers only send
+cross-origin after a CORS preflight that is never granted.
+"""
+import hmac
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from config import (
+    CONTROL_API_HOST, CONTROL_API_PORT, CONTROL_API_TOKEN,
+    CONTROL_API_EVENT_BACKLOG, CONTROL_API_MAX_BODY_MB,
+)
+from .account_loader import Account, AccountLoader
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+SSE_BATCH = 500
+
+
+class ControlError(Exception):
+    """Rejected request; ``status`` becomes the HTTP status code"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# ----- Events -----
+
+class Subscription:
+    """One /events client; dropped (and told to reconnect) if it falls too far behind"""
+
+    def __init__(self, maxsize: int):
+        self.queue: "queue.Queue[Optional[Tuple[int, Dict]]]" = queue.Queue(maxsize)
+        self.closed = False
+
+
+class EventHub:
+    """Fan-out of state-change events to SSE clients, with a replay backlog"""
+
+    def __init__(self, backlog: int = CONTROL_API_EVENT_BACKLOG):
+        self._backlog: Deque[Tuple[int, Dict]] = deque(maxlen=backlog)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event: Dict) -> None:
+        """Thread-safe; never blocks on slow clients"""
+        if "ts" not in event:
+            event = {"ts": round(time.time(), 3), **event}
+        with self._lock:
+            self._seq += 1
+            item = (self._seq, event)
+            self._backlog.append(item)
+            for sub in list(self._subscribers):
+                try:
+                    sub.queue.put_nowait(item)
+                except queue.Full:
+                    # The client resumes from the backlog with Last-Event-ID
+                    sub.closed = True
+                    self._subscribers.remove(sub)
+                    self.dropped_subscribers += 1
+
+    def subscribe(self, last_id: Optional[int] = None) -> Subscription:
+        sub = Subscription(self._backlog.maxlen or 0)
+        with self._lock:
+            if last_id is not None:
+                for item in self._backlog:
+                    if item[0] > last_id:
+                        sub.queue.put_nowait(item)
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def close(self) -> None:
+        """Wake every stream so it can end"""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            sub.closed = True
+            try:
+                sub.queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+
+# ----- Backends -----
+
+class ControlBackend:
+    """What the API drives. Methods are called on HTTP server threads.
+
+    ``uids`` is None for "all loaded accounts". Bulk methods return a dict
+    such as ``{"requested": 1000, "started": 990, "unknown": [...]}``.
+    """
+
+    def load(self, text: str, append: bool = False) -> Dict:
+        raise NotImplementedError
+
+    def launch(self, uids: Optional[List[str]]) -> Dict:
+        raise NotImplementedError
+
+    def login(self, uids: Optional[List[str]]) -> Dict:
+        raise NotImplementedError
+
+    def close(self, uids: Optional[List[str]]) -> Dict:
+        raise NotImplementedError
+
+    def cancel(self, uids: Optional[List[str]]) -> Dict:
+        raise NotImplementedError
+
+    def status(self, uids: Optional[List[str]]) -> Dict:
+        raise NotImplementedError
+
+
+class EngineBackend(ControlBackend):
+    """Headless backend over core.engine.Engine; engine events go to the hub as-is"""
+
+    def __init__(self, engine, hub: EventHub, loader: Optional[AccountLoader] = None):
+        self.engine = engine
+        self.loader = loader or AccountLoader()
+        self.accounts: Dict[str, Account] = {}
+        self._lock = threading.Lock()
+        engine.subscribe(hub.publish)
+        self.publish = hub.publish
+
+    def add_accounts(self, accounts: List[Account]) -> None:
+        with self._lock:
+            for account in accounts:
+                self.accounts[account.uid] = account
+
+    def load(self, text: str, append: bool = False) -> Dict:
+        accounts = self.loader.load_accounts(text)
+        with self._lock:
+            if not append:
+                self.accounts.clear()
+        self.add_accounts(accounts)
+        self.publish({"event": "loaded", "count": len(accounts), "cancelled": False})
+        return {"loaded": len(accounts), "total": len(self.accounts)}
+
+    def _resolve(self, uids: Optional[List[str]]) -> Tuple[List[Account], List[str]]:
+        with self._lock:
+            if uids is None:
+                return list(self.accounts.values()), []
+            known = [self.accounts[u] for u in uids if u in self.accounts]
+            unknown = [u for u in uids if u not in self.accounts]
+        return known, unknown
+
+    def _each(self, uids: Optional[List[str]], action) -> Dict:
+        accounts, unknown = self._resolve(uids)
+        started = sum(1 for account in accounts if action(account))
+        return {"requested": len(accounts) + len(unknown), "started": started, "unknown": unknown}
+
+    def launch(self, uids: Optional[List[str]]) -> Dict:
+        return self._each(uids, lambda a: not self.engine.is_browser_running(a.uid) and self.engine.open(a))
+
+    def login(self, uids: Optional[List[str]]) -> Dict:
+        return self._each(uids, lambda a: self.engine.is_browser_running(a.uid) and self.engine.login(a))
+
+    def close(self, uids: Optional[List[str]]) -> Dict:
+        def close(account: Account) -> bool:
+            if not self.engine.is_browser_running(account.uid):
+                return False
+            self.engine.close(account)
+            return True
+        return self._each(uids, close)
+
+    def cancel(self, uids: Optional[List[str]]) -> Dict:
+        return self._each(uids, lambda a: self.engine.cancel(a.uid))
+
+    def status(self, uids: Optional[List[str]]) -> Dict:
+        accounts, unknown = self._resolve(uids)
+        states = {a.uid: self.engine.status(a.uid) for a in accounts}
+        counts: Dict[str, int] = {}
+        for state in states.values():
+            counts[state["browser"]] = counts.get(state["browser"], 0) + 1
+        return {"accounts": states, "counts": counts, "unknown": unknown}
+
+
+# ----- HTTP -----
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FBManagerControl/1.0"
+
+    @property
+    def control(self) -> "ControlServer":
+        return self.server.control
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.client_address[0]} {format % args}")
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if self.headers.get('Origin') is not None:
+            self._send_json(403, {"error": "Cross-origin requests are not allowed"})
+            return False
+        host = self.headers.get('Host')
+        if host and urlsplit(f"//{host}").hostname not in LOOPBACK_HOSTS:
+            self._send_json(403, {"error": f"Host {host!r} is not allowed"})
+            return False
+        token = self.control.token
+        if not token:
+            return True
+        supplied = self.headers.get('Authorization', '')
+        if hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return True
+        self._send_json(401, {"error": "Unauthorized"})
+        return False
+
+    def _read_json(self) -> Dict:
+        if self.headers.get_content_type() != 'application/json':
+            raise ControlError("Content-Type must be application/json", 415)
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > CONTROL_API_MAX_BODY_MB * 1024 * 1024:
+            raise ControlError("Request body too large", 413)
+        if not length:
+            return {}
+        try:
+            data = json.loads(self.rfile.read(length))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ControlError(f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise ControlError("Expected a JSON object")
+        return data
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send_json(200, {"ok": True})
+        elif url.path == '/events':
+            self._stream_events()
+        elif url.path == '/status':
+            query = parse_qs(url.query)
+            uids = [u for part in query.get('uids', []) for u in part.split(',') if u] or None
+            self._dispatch(lambda: self.control.backend.status(uids))
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        route = urlsplit(self.path).path.strip('/')
+        backend = self.control.backend
+        try:
+            body = self._read_json()
+        except ControlError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+
+        if route == 'load':
+            text = body.get('text')
+            if text is None and isinstance(body.get('lines'), list):
+                text = "\n".join(str(line) for line in body['lines'])
+            if not isinstance(text, str):
+                self._send_json(400, {"error": "Expected 'text' or 'lines'"})
+                return
+            self._dispatch(lambda: backend.load(text, bool(body.get('append'))))
+        elif route in ('launch', 'login', 'close', 'cancel', 'status'):
+            try:
+                uids = _uids_from(body, required=route != 'status')
+            except ControlError as e:
+                self._send_json(e.status, {"error": str(e)})
+                return
+            self._dispatch(lambda: getattr(backend, route)(uids))
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _dispatch(self, call) -> None:
+        try:
+            self._send_json(200, call())
+        except ControlError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            logger.exception(f"Control API call failed: {self.path}")
+            self._send_json(500, {"error": str(e)})
+
+    def _stream_events(self) -> None:
+        last_id = self.headers.get('Last-Event-ID')
+        sub = self.control.hub.subscribe(int(last_id) if last_id and last_id.isdigit() else None)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        try:
+            self.wfile.write(b"retry: 1000\n\n")
+            self.wfile.flush()
+            while not sub.closed:
+                try:
+                    item = sub.queue.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                # Drain what is already queued and send it in one write
+                chunks = []
+                while item is not None:
+                    seq, event = item
+                    data = json.dumps(event, ensure_ascii=False, default=str)
+                    chunks.append(f"id: {seq}\nevent: {event.get('event', 'message')}\ndata: {data}\n\n")
+                    if len(chunks) >= SSE_BATCH:
+                        break
+                    try:
+                        item = sub.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if chunks:
+                    self.wfile.write("".join(chunks).encode('utf-8'))
+                    self.wfile.flush()
+                if item is None:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.control.hub.unsubscribe(sub)
+
+
+def _uids_from(body: Dict, required: bool = True) -> Optional[List[str]]:
+    """``{"uids": [...]}`` -> list, ``{"all": true}`` (or nothing, when optional) -> None"""
+    if body.get('all') is True:
+        return None
+    uids = body.get('uids')
+    if uids is None and not required:
+        return None
+    if not isinstance(uids, list) or not all(isinstance(u, (str, int)) for u in uids):
+        raise ControlError("Expected 'uids' (list) or 'all': true")
+    return [str(u) for u in uids]
+
+
+class ControlServer:
+    """Threaded localhost HTTP server for a ControlBackend"""
+
+    def __init__(self, backend: ControlBackend, hub: EventHub, port: int = CONTROL_API_PORT,
+                 host: str = CONTROL_API_HOST, token: str = CONTROL_API_TOKEN):
+        self.backend = backend
+        self.hub = hub
+        self.token = token
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.control = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ControlServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="control-api", daemon=True)
+        self._thread.start()
+        logger.info(f"Control API listening on {self.address}")
+        return self
+
+    def stop(self) -> None:
+        self.hub.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=2)
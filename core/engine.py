@@ -0,0 +1,410 @@
+"""Engine Module - Qt-free fleet engine: launch, login and close browsers on a thread pool
+
+Every state change is published as an event dict::
+
+    {"ts": 1700000000.123, "uid": "1000...", "event": "browser_started", ...}
+
+to the callbacks registered with ``subscribe`` (called on worker threads) or
+to a queue from ``event_queue()``. The Qt UI keeps using its own adapters
+(BrowserManager / FacebookLoginManager); this engine drives the same pure
+launch and login code for the CLI (``python -m core``) and other front ends.
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from config import CACHE_PROXY_ENABLED, BLOCK_RESOURCES_DURING_LOGIN, PROFILE_STAGE_ENABLED, \
+    PROFILE_ARCHIVE_ENABLED, SESSION_VAULT_ENABLED, ADAPTIVE_CONCURRENCY_ENABLED
+from .account_loader import Account
+from .cancellation import CancellationToken, OperationCancelled
+from .chrome import ChromeLauncher, attach_chrome, get_screen_size, grid_geometry, \
+    kill_existing_chrome_processes, quit_driver
+from .enums import BrowserStatus, LoginStatus
+from .login_flow import LoginFlow
+from .resource_blocker import BlockingPolicy
+from .tracing import span, tracer
+
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+    from .cache_proxy import CachingProxy
+    from .concurrency import ConcurrencyController
+    from .profile_archive import ProfileArchive
+    from .profile_stage import ProfileStager
+    from .session_vault import SessionVault
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+
+def _initial_state() -> Dict[str, str]:
+    return {"browser": BrowserStatus.READY.name, "login": LoginStatus.IDLE.name}
+
+
+class Engine:
+    """Runs launch/login jobs with bounded concurrency and reports them as events.
+
+    With ``adaptive_concurrency`` launches and logins each get a limit that
+    follows host load (core.concurrency), up to ``concurrency`` apiece.
+    """
+
+    def __init__(self, concurrency: int = 4, headless: bool = False,
+                 extra_arguments: Optional[List[str]] = None,
+                 blocking_policy: Optional[BlockingPolicy] = None,
+                 use_cache_proxy: bool = CACHE_PROXY_ENABLED,
+                 screen_size: Optional[Tuple[int, int]] = None,
+                 use_profile_stage: bool = PROFILE_STAGE_ENABLED,
+                 use_session_vault: bool = SESSION_VAULT_ENABLED,
+                 adaptive_concurrency: bool = ADAPTIVE_CONCURRENCY_ENABLED):
+        concurrency = max(1, concurrency)
+        self.concurrency: Optional["ConcurrencyController"] = None
+        if adaptive_concurrency:
+            from .concurrency import ConcurrencyController
+            self.concurrency = ConcurrencyController(maximum=concurrency, initial=concurrency)
+            self.concurrency.subscribe(self._on_limits_changed)
+            self.concurrency.start()
+        # Room for a full launch gate and a full login gate at once
+        workers = concurrency * 2 if self.concurrency else concurrency
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="engine")
+        self.headless = headless
+        self.extra_arguments = list(extra_arguments or [])
+        if blocking_policy is None and BLOCK_RESOURCES_DURING_LOGIN:
+            blocking_policy = BlockingPolicy()
+        self.blocking_policy = blocking_policy
+        self.use_cache_proxy = use_cache_proxy
+        self.cache_proxy: Optional["CachingProxy"] = None
+        self.profile_stager: Optional["ProfileStager"] = None
+        if use_profile_stage:
+            from .profile_stage import start_stager
+            self.profile_stager = start_stager()
+        self.profile_archive: Optional["ProfileArchive"] = None
+        self.session_vault: Optional["SessionVault"] = None
+        if use_session_vault:
+            from .session_vault import SessionVault
+            self.session_vault = SessionVault()
+        self.screen_size = screen_size
+        self.drivers: Dict[str, "ChromiumPage"] = {}
+        self.tokens: Dict[str, CancellationToken] = {}
+        self.states: Dict[str, Dict[str, str]] = {}
+        self.browser_count = 0
+        self._listeners: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+
+    # ----- Events -----
+
+    def subscribe(self, callback: Callable[[Event], None]) -> None:
+        """Call back with every event, on the thread that produced it"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Event], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def event_queue(self) -> "queue.Queue[Event]":
+        """A queue receiving every event from now on"""
+        events: "queue.Queue[Event]" = queue.Queue()
+        self.subscribe(events.put)
+        return events
+
+    def _emit(self, uid: Optional[str], event: str, **fields) -> None:
+        payload = {"ts": round(time.time(), 3), "uid": uid, "event": event, **fields}
+        for callback in list(self._listeners):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception(f"Event listener failed on {event}")
+
+    def _set_state(self, uid: str, **states) -> None:
+        with self._lock:
+            self.states.setdefault(uid, _initial_state()).update(states)
+
+    def status(self, uid: Optional[str] = None) -> Dict:
+        """Browser/login state of one account, or of all accounts seen so far"""
+        with self._lock:
+            if uid is not None:
+                return dict(self.states.get(uid) or _initial_state())
+            return {u: dict(s) for u, s in self.states.items()}
+
+    # ----- Jobs -----
+
+    def open(self, account: Account, slot: Optional[int] = None) -> "Future[bool]":
+        """Launch the account's browser; resolves to True when it is running.
+
+        ``slot`` picks the grid cell when several engines share one screen.
+        """
+        return self._submit(account.uid, lambda a: self._open(a, slot), account)
+
+    def attach(self, account: Account) -> "Future[bool]":
+        """Adopt a browser already running on the account's profile (e.g. after a worker restart)"""
+        return self._submit(account.uid, self._attach, account)
+
+    def login(self, account: Account) -> "Future[bool]":
+        """Log in on the account's running browser (attaching to it if another process opened it)"""
+        return self._submit(account.uid, self._login, account)
+
+    def open_and_login(self, account: Account) -> "Future[bool]":
+        return self._submit(account.uid, lambda a: self._open(a) and self._login(a), account)
+
+    def restore_session(self, account: Account) -> "Future[bool]":
+        """Put the account's saved session into its browser (opening it if needed), skipping the login UI"""
+        return self._submit(account.uid, self._restore_session, account)
+
+    def _submit(self, uid: str, job: Callable[[Account], bool], account: Account) -> "Future[bool]":
+        with self._lock:
+            busy = uid in self.tokens
+            if not busy:
+                self.tokens[uid] = CancellationToken()
+        if busy:
+            # One job per account at a time, like the UI's per-row buttons
+            self._emit(uid, "busy")
+            future: "Future[bool]" = Future()
+            future.set_result(False)
+            return future
+        return self.executor.submit(self._run_job, uid, job, account, time.perf_counter_ns())
+
+    def _run_job(self, uid: str, job: Callable[[Account], bool], account: Account, submitted_ns: int) -> bool:
+        # Time spent waiting for a free pool thread
+        tracer.record("engine.queued", submitted_ns, time.perf_counter_ns(), uid)
+        try:
+            return job(account)
+        finally:
+            with self._lock:
+                self.tokens.pop(uid, None)
+
+    def _open(self, account: Account, slot: Optional[int] = None) -> bool:
+        uid = account.uid
+        if uid in self.drivers:
+            return True
+        token = self.tokens[uid]
+        position, size = self._next_geometry(slot)
+
+        proxy = account.proxy
+        extra_arguments = list(self.extra_arguments)
+        if not proxy and self.use_cache_proxy:
+            proxy = self._get_cache_proxy().proxy_rules
+            # Chrome bypasses proxies for loopback hosts unless told otherwise
+            extra_arguments.append('--proxy-bypass-list=<-loopback>')
+
+        launcher = ChromeLauncher(uid, account.profile_path, proxy, position, size,
+                                  self.headless, extra_arguments, cancel_token=token,
+                                  stager=self.profile_stager, archive=self._launch_archive(account.uid),
+                                  session_vault=self.session_vault)
+        self._set_state(uid, browser=BrowserStatus.LAUNCHING.name)
+        self._emit(uid, "browser_starting")
+        started = time.perf_counter()
+        try:
+            with self._slot("launch", uid, token):
+                launch_started = time.perf_counter()
+                driver = launcher.launch()
+                if self.concurrency:
+                    self.concurrency.record("launch", "launch", time.perf_counter() - launch_started)
+        except OperationCancelled:
+            self._set_state(uid, browser=BrowserStatus.CANCELLED.name)
+            self._emit(uid, "browser_cancelled")
+            return False
+        except Exception as e:
+            # The traceback is already logged by the launcher; the event carries the message
+            logger.warning(f"[{uid}] Browser launch failed: {e}")
+            self._set_state(uid, browser=BrowserStatus.ERROR.name)
+            self._emit(uid, "browser_error", error=str(e).strip())
+            return False
+        self.drivers[uid] = driver
+        self._set_state(uid, browser=BrowserStatus.RUNNING.name)
+        self._emit(uid, "browser_started", elapsed_s=round(time.perf_counter() - started, 3))
+        return True
+
+    def _attach(self, account: Account) -> bool:
+        uid = account.uid
+        if uid not in self.drivers:
+            driver = attach_chrome(self._profile_dir(account))
+            if driver is None:
+                self._set_state(uid, browser=BrowserStatus.CLOSED.name, login=LoginStatus.IDLE.name)
+                self._emit(uid, "browser_closed")
+                return False
+            self.drivers[uid] = driver
+        self._set_state(uid, browser=BrowserStatus.RUNNING.name)
+        self._emit(uid, "browser_started", adopted=True)
+        return True
+
+    def _login(self, account: Account) -> bool:
+        uid = account.uid
+        driver = self.drivers.get(uid)
+        if driver is None:
+            driver = attach_chrome(self._profile_dir(account))
+            if driver is None:
+                self._set_state(uid, login=LoginStatus.FAILED.name)
+                self._emit(uid, "login_error", error="Browser not running")
+                return False
+            self.drivers[uid] = driver
+            self._set_state(uid, browser=BrowserStatus.RUNNING.name)
+
+        flow = LoginFlow(driver, uid, account.password, account.token, self.blocking_policy,
+                         on_status=lambda u, text: self._emit(u, "login_status", text=text),
+                         on_progress=lambda u, value: self._emit(u, "login_progress", value=value),
+                         cancel_token=self.tokens[uid], session_vault=self.session_vault,
+                         on_step_time=self._record_login_step if self.concurrency else None)
+        self._set_state(uid, login=LoginStatus.LOGGING_IN.name)
+        started = time.perf_counter()
+        try:
+            with self._slot("login", uid, self.tokens[uid]):
+                ok = flow.run()
+        except OperationCancelled:
+            self._set_state(uid, login=LoginStatus.CANCELLED.name)
+            self._emit(uid, "login_cancelled")
+            return False
+        except Exception as e:
+            logger.exception(f"[{uid}] Login failed")
+            ok, flow.error = False, str(e)
+
+        elapsed = round(time.perf_counter() - started, 3)
+        blocking = flow.blocking_stats.summary() if flow.blocking_stats else None
+        if ok:
+            self._set_state(uid, login=LoginStatus.SUCCESS.name)
+            self._emit(uid, "login_success", elapsed_s=elapsed, blocking=blocking)
+        else:
+            self._set_state(uid, login=LoginStatus.FAILED.name)
+            self._emit(uid, "login_error", error=flow.error, elapsed_s=elapsed)
+        return ok
+
+    def _restore_session(self, account: Account) -> bool:
+        uid = account.uid
+        if self.session_vault is None or not self.session_vault.has(uid):
+            self._emit(uid, "session_error", error="No saved session")
+            return False
+        driver = self.drivers.get(uid) or attach_chrome(self._profile_dir(account))
+        if driver is not None:
+            self.drivers[uid] = driver
+        elif not self._open(account):
+            return False
+        try:
+            # A fresh profile already got the session while it was opened; injecting twice is harmless
+            restored = self.session_vault.restore(self.drivers[uid], uid)
+        except Exception as e:
+            logger.warning(f"[{uid}] Session restore failed: {e}")
+            self._emit(uid, "session_error", error=str(e))
+            return False
+        self._set_state(uid, browser=BrowserStatus.RUNNING.name)
+        if restored is None:
+            # The file is there but unreadable or from another format version
+            self._emit(uid, "session_error", error="No saved session")
+            return False
+        self._emit(uid, "session_restored", cookies=restored.cookies, elapsed_ms=restored.elapsed_ms)
+        return True
+
+    @contextmanager
+    def _slot(self, kind: str, uid: str, token: CancellationToken):
+        """Hold a launch/login slot of the adaptive limit (no-op without one)"""
+        if self.concurrency is None:
+            yield
+            return
+        gate = self.concurrency.gates[kind]
+        with span(f"engine.wait_{kind}_slot", uid):
+            gate.acquire(token)
+        try:
+            yield
+        finally:
+            gate.release()
+
+    def _record_login_step(self, uid: str, step: str, seconds: float) -> None:
+        self.concurrency.record("login", step, seconds)
+
+    def _on_limits_changed(self, snapshot: Dict[str, Any]) -> None:
+        self._emit(None, "concurrency", launch=snapshot["launch"], login=snapshot["login"])
+
+    def _next_geometry(self, slot: Optional[int] = None) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        with self._lock:
+            if self.screen_size is None:
+                self.screen_size = get_screen_size()
+            index = self.browser_count if slot is None else slot
+            self.browser_count += 1
+        return grid_geometry(index, self.screen_size)
+
+    def _profile_dir(self, account: Account) -> str:
+        """The directory the account's Chrome runs on (its RAM copy when staged)"""
+        if self.profile_stager:
+            return self.profile_stager.active_path(account.uid, account.profile_path)
+        return account.profile_path
+
+    def _get_profile_archive(self) -> "ProfileArchive":
+        with self._lock:
+            if self.profile_archive is None:
+                from .profile_archive import ProfileArchive
+                self.profile_archive = ProfileArchive()
+            return self.profile_archive
+
+    def _launch_archive(self, uid: str) -> Optional["ProfileArchive"]:
+        """The archive when this launch needs it: sweeps record launches, archived profiles are restored"""
+        if PROFILE_ARCHIVE_ENABLED:
+            return self._get_profile_archive()
+        from .profile_archive import has_archive
+        return self._get_profile_archive() if has_archive(uid) else None
+
+    def _get_cache_proxy(self) -> "CachingProxy":
+        with self._lock:
+            if self.cache_proxy is None:
+                from .cache_proxy import CachingProxy
+                self.cache_proxy = CachingProxy().start()
+            return self.cache_proxy
+
+    # ----- Control -----
+
+    def cancel(self, uid: str) -> bool:
+        """Cancel the account's pending launch or login"""
+        with self._lock:
+            token = self.tokens.get(uid)
+        if token is None or token.is_cancelled:
+            return False
+        token.cancel()
+        return True
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            tokens = list(self.tokens.values())
+        for token in tokens:
+            token.cancel()
+
+    def close(self, account: Account) -> None:
+        """Close the account's browser, including one opened by another process"""
+        uid = account.uid
+        self.cancel(uid)
+        driver = self.drivers.pop(uid, None)
+        if driver is not None:
+            quit_driver(uid, driver)
+        else:
+            kill_existing_chrome_processes(self._profile_dir(account))
+        if self.profile_stager:
+            self.profile_stager.release(uid)
+        self._set_state(uid, browser=BrowserStatus.CLOSED.name, login=LoginStatus.IDLE.name)
+        self._emit(uid, "browser_closed")
+
+    def is_browser_running(self, uid: str) -> bool:
+        return uid in self.drivers
+
+    def get_driver(self, uid: str) -> Optional["ChromiumPage"]:
+        return self.drivers.get(uid)
+
+    def shutdown(self, close_browsers: bool = False) -> None:
+        """Cancel pending jobs and wait for the pool; browsers stay open unless asked"""
+        self.cancel_all()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if close_browsers:
+            for uid in list(self.drivers):
+                quit_driver(uid, self.drivers.pop(uid))
+                if self.profile_stager:
+                    self.profile_stager.release(uid)
+                self._set_state(uid, browser=BrowserStatus.CLOSED.name, login=LoginStatus.IDLE.name)
+                self._emit(uid, "browser_closed")
+        if self.cache_proxy:
+            self.cache_proxy.stop()
+            self.cache_proxy = None
+        if self.concurrency:
+            self.concurrency.stop()
+        if self.profile_stager:
+            self.profile_stager.stop()
+            self.profile_stager = None
+        if self.profile_archive and self.profile_archive.stats.restored:
+            logger.info(f"Profile archive: {self.profile_archive.stats.summary()}")
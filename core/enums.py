@@ -4,14 +4,18 @@ from enum import Enum
 
 class BrowserStatus(Enum):
     READY = "Ready"
+    QUEUED = "⏳ Queued"
     LAUNCHING = "⏳ Launching..."
     RUNNING = "✅ Running"
     CLOSED = "Browser closed"
     ERROR = "❌ Error"
+    CANCELLED = "⛔ Cancelled"
 
 
 class LoginStatus(Enum):
     IDLE = "Ready"
+    QUEUED = "⏳ Queued"
     LOGGING_IN = "Logging in..."
     SUCCESS = "✅ Logged in"
     FAILED = "❌ Failed"
+    CANCELLED = "⛔ Cancelled"
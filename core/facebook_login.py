@@ -1,323 +1,194 @@
-"""Facebook Login Module - Automated login with 2FA support"""
+"""Facebook Login Module - Qt adapter over the login flow (core.login_flow)"""
 import time
 import logging
-from typing import Optional, Dict, Callable, Any
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Dict, Callable, Deque, Set
 
-import pyotp
-from PyQt6.QtCore import QThread, pyqtSignal
-from DrissionPage import ChromiumPage
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+
+from config import BLOCK_RESOURCES_DURING_LOGIN, CLEANUP_GRACE_MS, SESSION_VAULT_ENABLED
+from .resource_blocker import BlockingPolicy, BlockingStats
+from .cancellation import OperationCancelled
+from .login_flow import SYSTEM_CLOCK, Clock, LoginFlow
+from .qt_workers import keep_until_finished
+
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+    from .concurrency import ConcurrencyController
+    from .session_vault import SessionVault
 
-logging.getLogger('urllib3').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
 class FacebookLoginWorker(QThread):
-    """Worker thread for Facebook login process"""
+    """Worker thread running a LoginFlow and reporting through signals"""
     
     status_signal = pyqtSignal(str, str)
     progress_signal = pyqtSignal(str, int)
     success_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str, str)
     finished_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal(str)
     
-    FB_LOGIN_URL = "https://www.facebook.com/"
-    
-    def __init__(self, driver: ChromiumPage, uid: str, password: str, token_2fa: str, parent=None):
+    def __init__(self, driver: "ChromiumPage", uid: str, password: str, token_2fa: str,
+                 blocking_policy: Optional[BlockingPolicy] = None,
+                 session_vault: Optional["SessionVault"] = None,
+                 on_step_time: Optional[Callable[[str, str, float], None]] = None,
+                 clock: Clock = SYSTEM_CLOCK, parent=None):
         super().__init__(parent)
-        self.driver = driver
         self.uid = uid
-        self.password = password
-        self.token_2fa = token_2fa
-        self._is_cancelled = False
+        self.flow = LoginFlow(driver, uid, password, token_2fa, blocking_policy,
+                              on_status=self.status_signal.emit, on_progress=self.progress_signal.emit,
+                              session_vault=session_vault, on_step_time=on_step_time, clock=clock)
+        self.cancel_token = self.flow.cancel_token
+    
+    @property
+    def blocking_stats(self) -> Optional[BlockingStats]:
+        return self.flow.blocking_stats
     
     def cancel(self) -> None:
-        self._is_cancelled = True
+        """Interrupt every wait immediately and stop any in-flight navigation"""
+        self.flow.cancel()
     
     def run(self) -> None:
         try:
-            self.status_signal.emit(self.uid, "Starting login...")
-            self.progress_signal.emit(self.uid, 10)
-            
-            if not self._navigate_to_facebook():
-                return
-            if not self._enter_credentials():
-                return
-            if not self._handle_2fa():
-                return
-            if not self._verify_login():
-                return
-            
-            self.progress_signal.emit(self.uid, 100)
-            self.status_signal.emit(self.uid, "Login successful!")
-            self.success_signal.emit(self.uid)
+            if self.flow.run():
+                self.success_signal.emit(self.uid)
+            else:
+                self.error_signal.emit(self.uid, self.flow.error)
+        except OperationCancelled:
+            self.cancelled_signal.emit(self.uid)
         except Exception as e:
             logger.exception(f"[{self.uid}] Login failed")
             self.error_signal.emit(self.uid, str(e))
         finally:
             self.finished_signal.emit(self.uid)
-    
-    def _navigate_to_facebook(self) -> bool:
-        if self._is_cancelled:
-            return False
-        try:
-            self.status_signal.emit(self.uid, "Navigating to Facebook...")
-            self.progress_signal.emit(self.uid, 20)
-            self.driver.get(self.FB_LOGIN_URL)
-            time.sleep(2)
-            return True
-        except Exception as e:
-            self.error_signal.emit(self.uid, f"Navigation failed: {e}")
-            return False
-    
-    def _enter_credentials(self) -> bool:
-        if self._is_cancelled:
-            return False
-        try:
-            self.status_signal.emit(self.uid, "Entering credentials...")
-            self.progress_signal.emit(self.uid, 40)
-            
-            email_field = self._find_element(['#email', 'input[name="email"]'])
-            if not email_field:
-                self.error_signal.emit(self.uid, "Email field not found")
-                return False
-            email_field.clear()
-            email_field.input(self.uid)
-            time.sleep(0.5)
-            
-            password_field = self._find_element(['#pass', 'input[name="pass"]', 'input[type="password"]'])
-            if not password_field:
-                self.error_signal.emit(self.uid, "Password field not found")
-                return False
-            password_field.clear()
-            password_field.input(self.password)
-            time.sleep(0.5)
-            
-            self.progress_signal.emit(self.uid, 50)
-            
-            login_btn = self._find_element(['button[name="login"]', 'button[type="submit"]', '#loginbutton'])
-            if login_btn:
-                login_btn.click()
-            else:
-                password_field.input('\n')
-            
-            time.sleep(3)
-            return True
-        except Exception as e:
-            self.error_signal.emit(self.uid, f"Credentials failed: {e}")
-            return False
-    
-    def _handle_2fa(self) -> bool:
-        if self._is_cancelled:
-            return False
-        try:
-            current_url = self.driver.url
-            logger.debug(f"[{self.uid}] URL after login: {current_url}")
-            
-            is_2fa = 'checkpoint' in current_url or 'two_step' in current_url
-            if not is_2fa:
-                tfa_elem = self._find_element(['input[name="approvals_code"]', '#approvals_code'])
-                is_2fa = tfa_elem is not None
-            
-            if not is_2fa:
-                self.status_signal.emit(self.uid, "No 2FA required")
-                return True
-            
-            self.status_signal.emit(self.uid, "2FA detected, generating code...")
-            self.progress_signal.emit(self.uid, 70)
-            
-            code = self._generate_2fa_code()
-            if not code:
-                self.error_signal.emit(self.uid, "Failed to generate 2FA code")
-                return False
-            
-            logger.info(f"[{self.uid}] Generated 2FA code: {code}")
-            self.status_signal.emit(self.uid, f"Entering 2FA code: {code}")
-            time.sleep(3)
-            
-            code_field = self._find_2fa_input()
-            if not code_field:
-                self.error_signal.emit(self.uid, "2FA input field not found")
-                return False
-            
-            try:
-                code_field.clear()
-            except Exception:
-                pass
-            code_field.input(code)
-            time.sleep(1)
-            
-            self.progress_signal.emit(self.uid, 80)
-            
-            submit_btn = self._find_element([
-                'button[type="submit"]', '#checkpointSubmitButton',
-                'button[name="submit[Continue]"]', 'input[type="submit"]'
-            ])
-            if submit_btn:
-                submit_btn.click()
-            else:
-                code_field.input('\n')
-            
-            time.sleep(3)
-            self._handle_trust_device()
-            return True
-        except Exception as e:
-            logger.exception(f"[{self.uid}] 2FA failed")
-            self.error_signal.emit(self.uid, f"2FA failed: {e}")
-            return False
-    
-    def _generate_2fa_code(self) -> Optional[str]:
-        try:
-            clean_token = self.token_2fa.replace(" ", "").upper()
-            return pyotp.TOTP(clean_token).now()
-        except Exception as e:
-            logger.exception(f"[{self.uid}] 2FA code generation failed")
-            return None
-    
-    def _find_2fa_input(self) -> Optional[Any]:
-        """Find 2FA input field using multiple methods"""
-        # CSS selectors
-        selectors = [
-            'input[name="approvals_code"]', '#approvals_code',
-            'input[autocomplete="one-time-code"]',
-            'input[type="text"]', 'input[type="tel"]', 'input[type="number"]'
-        ]
-        for sel in selectors:
-            try:
-                elem = self.driver.ele(sel, timeout=1)
-                if elem and elem.attr('name') not in ['email', 'pass']:
-                    return elem
-            except Exception:
-                continue
-        
-        # JavaScript fallback
-        try:
-            js = """
-            var inputs = document.querySelectorAll('input[type="text"], input[type="tel"], input[type="number"]');
-            for (var i = 0; i < inputs.length; i++) {
-                if (inputs[i].offsetParent !== null && inputs[i].name !== 'email' && inputs[i].name !== 'pass') {
-                    inputs[i].focus();
-                    return true;
-                }
-            }
-            return false;
-            """
-            if self.driver.run_js(js):
-                return self.driver.ele('@focused', timeout=1)
-        except Exception:
-            pass
-        return None
-    
-    def _handle_trust_device(self) -> None:
-        """Handle 'Trust this device' prompt"""
-        try:
-            time.sleep(2)
-            if 'checkpoint' not in self.driver.url:
-                return
-            
-            logger.info(f"[{self.uid}] Trust device page detected")
-            
-            # Try JavaScript click
-            js = """
-            var buttons = document.querySelectorAll('div[role="button"], span[role="button"], button');
-            for (var i = 0; i < buttons.length; i++) {
-                var text = buttons[i].innerText.toLowerCase();
-                if (text.includes('trust') || text.includes('tin tưởng')) {
-                    buttons[i].click();
-                    return true;
-                }
-            }
-            return false;
-            """
-            if self.driver.run_js(js):
-                logger.info(f"[{self.uid}] Clicked Trust button")
-                time.sleep(3)
-        except Exception as e:
-            logger.warning(f"[{self.uid}] Trust device handling failed: {e}")
-    
-    def _verify_login(self) -> bool:
-        if self._is_cancelled:
-            return False
-        try:
-            self.status_signal.emit(self.uid, "Verifying login...")
-            self.progress_signal.emit(self.uid, 90)
-            time.sleep(2)
-            
-            url = self.driver.url
-            success_indicators = ['facebook.com/home', 'facebook.com/?sk=', 'facebook.com/feed']
-            failure_indicators = ['login', 'checkpoint', 'recover', 'disabled']
-            
-            is_success = any(ind in url for ind in success_indicators)
-            is_failure = any(ind in url for ind in failure_indicators)
-            
-            if is_success and not is_failure:
-                return True
-            
-            user_elem = self._find_element(['[aria-label="Your profile"]', '[aria-label="Account"]'])
-            if user_elem:
-                return True
-            
-            if 'checkpoint' in url:
-                self.error_signal.emit(self.uid, "Additional verification required")
-                return False
-            
-            return True
-        except Exception as e:
-            self.error_signal.emit(self.uid, f"Verification failed: {e}")
-            return False
-    
-    def _find_element(self, selectors: list) -> Optional[Any]:
-        for sel in selectors:
-            try:
-                elem = self.driver.ele(sel, timeout=2)
-                if elem:
-                    return elem
-            except Exception:
-                continue
-        return None
 
 
-class FacebookLoginManager:
-    """Manages Facebook login operations"""
+class FacebookLoginManager(QObject):
+    """Manages Facebook login operations.
+
+    With a ConcurrencyController, logins beyond its login limit wait in a
+    queue (already wired to their callbacks) and start as slots free up.
+    """
     
-    def __init__(self):
-        self.workers: Dict[str, FacebookLoginWorker] = {}
+    _limits_changed = pyqtSignal()          # From the controller thread, queued to the GUI thread
     
-    def start_login(self, driver: ChromiumPage, uid: str, password: str, token_2fa: str,
+    def __init__(self, blocking_policy: Optional[BlockingPolicy] = None,
+                 use_session_vault: bool = SESSION_VAULT_ENABLED,
+                 concurrency: Optional["ConcurrencyController"] = None, parent=None):
+        super().__init__(parent)
+        self.workers: Dict[str, FacebookLoginWorker] = {}
+        self.queued: Deque[str] = deque()
+        self.holding: Set[str] = set()      # Logins holding a slot of the login limit
+        self.concurrency = concurrency
+        if concurrency:
+            self._limits_changed.connect(self._start_queued)
+            concurrency.subscribe(self._notify_limits_changed)
+        if blocking_policy is None and BLOCK_RESOURCES_DURING_LOGIN:
+            blocking_policy = BlockingPolicy()
+        self.blocking_policy = blocking_policy
+        self.use_session_vault = use_session_vault
+        self.session_vault: Optional["SessionVault"] = None
+    
+    def start_login(self, driver: "ChromiumPage", uid: str, password: str, token_2fa: str,
                     status_callback: Optional[Callable] = None,
                     progress_callback: Optional[Callable] = None,
                     success_callback: Optional[Callable] = None,
                     error_callback: Optional[Callable] = None,
-                    finished_callback: Optional[Callable] = None) -> bool:
-        if uid in self.workers and self.workers[uid].isRunning():
+                    finished_callback: Optional[Callable] = None,
+                    cancelled_callback: Optional[Callable] = None,
+                    update_connection: Qt.ConnectionType = Qt.ConnectionType.AutoConnection) -> bool:
+        """Start a login worker.
+
+        ``update_connection`` applies to the status/progress callbacks; pass
+        DirectConnection when they are thread-safe (e.g. the UI update bus) so
+        frequent step updates skip the GUI event queue.
+        """
+        if self.is_logging_in(uid):
             return False
         
-        worker = FacebookLoginWorker(driver, uid, password, token_2fa)
+        if self.use_session_vault and self.session_vault is None:
+            from .session_vault import SessionVault
+            self.session_vault = SessionVault()
+        worker = FacebookLoginWorker(driver, uid, password, token_2fa, self.blocking_policy, self.session_vault,
+                                     self._record_step if self.concurrency else None)
         
         if status_callback:
-            worker.status_signal.connect(status_callback)
+            worker.status_signal.connect(status_callback, update_connection)
         if progress_callback:
-            worker.progress_signal.connect(progress_callback)
+            worker.progress_signal.connect(progress_callback, update_connection)
         if success_callback:
             worker.success_signal.connect(success_callback)
         if error_callback:
             worker.error_signal.connect(error_callback)
         if finished_callback:
             worker.finished_signal.connect(finished_callback)
+        if cancelled_callback:
+            worker.cancelled_signal.connect(cancelled_callback)
+        worker.finished_signal.connect(self._on_worker_finished)
         
         self.workers[uid] = worker
+        if self.concurrency:
+            if not self.concurrency.gates["login"].try_acquire():
+                self.queued.append(uid)
+                return True
+            self.holding.add(uid)
         worker.start()
         return True
     
-    def cancel_login(self, uid: str) -> None:
-        if uid in self.workers:
-            self.workers[uid].cancel()
+    def _notify_limits_changed(self, _snapshot) -> None:
+        self._limits_changed.emit()
+    
+    def _start_queued(self) -> None:
+        gate = self.concurrency.gates["login"]
+        while self.queued and gate.try_acquire():
+            uid = self.queued.popleft()
+            self.holding.add(uid)
+            self.workers[uid].start()
+    
+    def _on_worker_finished(self, uid: str) -> None:
+        if uid in self.holding:
+            self.holding.discard(uid)
+            self.concurrency.gates["login"].release()
+            self._start_queued()
+    
+    def _record_step(self, uid: str, step: str, seconds: float) -> None:
+        self.concurrency.record("login", step, seconds)
+    
+    def cancel_login(self, uid: str) -> bool:
+        if uid in self.queued:
+            # Never started: report it the way a running worker would
+            self.queued.remove(uid)
+            worker = self.workers[uid]
+            worker.cancelled_signal.emit(uid)
+            worker.finished_signal.emit(uid)
+            return True
+        worker = self.workers.get(uid)
+        if worker and worker.isRunning():
+            worker.cancel()
+            return True
+        return False
+    
+    def get_blocking_stats(self, uid: str) -> Optional[BlockingStats]:
+        worker = self.workers.get(uid)
+        return worker.blocking_stats if worker else None
     
     def is_logging_in(self, uid: str) -> bool:
-        return uid in self.workers and self.workers[uid].isRunning()
+        return uid in self.queued or (uid in self.workers and self.workers[uid].isRunning())
     
     def cleanup(self) -> None:
-        for worker in list(self.workers.values()):
+        if self.concurrency:
+            self.concurrency.unsubscribe(self._notify_limits_changed)
+        self.queued.clear()
+        running = [w for w in self.workers.values() if w.isRunning()]
+        for worker in running:
+            worker.cancel()
+        deadline = time.monotonic() + CLEANUP_GRACE_MS / 1000
+        for worker in running:
+            worker.wait(max(0, int((deadline - time.monotonic()) * 1000)))
+        # A worker stuck in a CDP call can outlive the grace period (and this manager)
+        for worker in self.workers.values():
             if worker.isRunning():
-                worker.cancel()
-                worker.wait(2000)
+                keep_until_finished(worker)
         self.workers.clear()
@@ -0,0 +1,422 @@
+"""Farm Module - Sharded multi-process browser farm with a crash-restarting supervisor
+
+The supervisor (``Farm``) lives in the UI or CLI process and owns no drivers.
+Accounts are sharded by ``crc32(uid) % workers`` onto worker processes. Each
+worker runs its own Engine, so its ChromiumPage drivers, DrissionPage
+threads and GIL are separate from the supervisor's and from the other shards.
+
+IPC is one duplex Pipe per worker. Commands go out as lists of
+``(name, payload)``; engine events come back in batches. The supervisor keeps
+the latest state of every account, so status queries never cross processes.
+A worker that dies is restarted at once (rate-limited). Its orphaned Chrome
+processes keep running and are adopted again through DevToolsActivePort.
+Launches and logins that were in flight are reported as failed.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from config import FARM_EVENT_BATCH_MS, FARM_MAX_RESTARTS_PER_MINUTE
+from .account_loader import Account
+from .enums import BrowserStatus, LoginStatus
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+# Event name -> (browser state, login state) it implies; None leaves a field unchanged
+_STATE_BY_EVENT = {
+    "browser_starting": (BrowserStatus.LAUNCHING, None),
+    "browser_started": (BrowserStatus.RUNNING, None),
+    "browser_error": (BrowserStatus.ERROR, None),
+    "browser_cancelled": (BrowserStatus.CANCELLED, None),
+    "browser_closed": (BrowserStatus.CLOSED, LoginStatus.IDLE),
+    "login_status": (None, LoginStatus.LOGGING_IN),
+    "login_success": (None, LoginStatus.SUCCESS),
+    "login_error": (None, LoginStatus.FAILED),
+    "login_cancelled": (None, LoginStatus.CANCELLED),
+}
+
+
+# ----- Worker process -----
+
+def _worker_main(shard: int, conn: Connection, options: Dict[str, Any], log_queue=None) -> None:
+    """Entry point of a worker process: run commands on a local Engine, stream events back"""
+    # Ctrl+C goes to the supervisor, which shuts workers down in order
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if log_queue is not None:
+        from .log_setup import forward_to
+        forward_to(log_queue, options["log_level"])
+    else:
+        logging.basicConfig(level=options["log_level"],
+                            format=f'%(asctime)s - %(levelname)s - [shard {shard}] [%(name)s] %(message)s')
+    from .engine import Engine
+
+    if options["trace"]:
+        tracer.enable()
+    engine = Engine(concurrency=options["concurrency"], headless=options["headless"],
+                    extra_arguments=options["extra_arguments"], use_cache_proxy=False,
+                    screen_size=options["screen_size"])
+    outbox: "queue.Queue[Optional[Event]]" = queue.Queue()
+    engine.subscribe(outbox.put)
+    sender = threading.Thread(target=_send_batches, args=(conn, outbox, FARM_EVENT_BATCH_MS / 1000),
+                              name="farm-sender", daemon=True)
+    sender.start()
+
+    close_browsers = False
+    try:
+        running = True
+        while running:
+            try:
+                commands = conn.recv()
+            except (EOFError, OSError):
+                break   # Supervisor is gone: leave the browsers for the next worker to adopt
+            for name, payload in commands:
+                if name == "exit":
+                    close_browsers, running = payload, False
+                    break
+                elif name == "open":
+                    account, slot = payload
+                    engine.open(account, slot)
+                elif name == "login":
+                    engine.login(payload)
+                elif name == "attach":
+                    engine.attach(payload)
+                elif name == "close":
+                    engine.close(payload)
+                elif name == "cancel":
+                    engine.cancel(payload)
+    finally:
+        engine.shutdown(close_browsers=close_browsers)
+        if tracer.enabled:
+            # Spans travel home on exit and land in the supervisor's export
+            outbox.put({"uid": None, "event": "trace_events", "events": tracer.trace_events()})
+        outbox.put(None)
+        sender.join(timeout=2)
+
+
+def _send_batches(conn: Connection, outbox: "queue.Queue[Optional[Event]]", interval: float) -> None:
+    """Send events in small batches: one pickle and one write per burst, not per event"""
+    while True:
+        event = outbox.get()
+        batch = [event] if event is not None else []
+        deadline = time.monotonic() + interval
+        while event is not None:
+            try:
+                event = outbox.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event is not None:
+                batch.append(event)
+        if batch:
+            try:
+                conn.send(batch)
+            except (OSError, ValueError):
+                return
+        if event is None:
+            return
+
+
+# ----- Supervisor -----
+
+class _Shard:
+    """Supervisor-side handle of one worker process"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.send_lock = threading.Lock()
+        self.restarts: Deque[float] = deque()
+        self.failed = False
+
+
+@contextmanager
+def _detached_main():
+    """Spawned children re-import the parent's __main__ (for the GUI: PyQt and the
+    whole UI). Hide it while workers start so they only import core."""
+    main = sys.modules.get('__main__')
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+class Farm:
+    """Routes commands to worker processes by uid and aggregates their events"""
+
+    def __init__(self, workers: Optional[int] = None, concurrency: int = 4, headless: bool = False,
+                 extra_arguments: Optional[List[str]] = None,
+                 screen_size: Optional[Tuple[int, int]] = None, log_queue=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.options = {
+            "concurrency": concurrency,
+            "headless": headless,
+            "extra_arguments": list(extra_arguments or []),
+            "screen_size": screen_size,
+            "log_level": logging.getLogger().getEffectiveLevel(),
+            "trace": tracer.enabled,
+        }
+        # Multiprocessing queue of the parent's log pipeline (LogPipeline.process_queue)
+        self.log_queue = log_queue
+        self.shards = [_Shard(i) for i in range(self.workers)]
+        self.accounts: Dict[str, Account] = {}
+        self.states: Dict[str, Dict[str, str]] = {}
+        self.browser_count = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._listeners: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._pump: Optional[threading.Thread] = None
+
+    # ----- Lifecycle -----
+
+    def start(self) -> "Farm":
+        if self.options["screen_size"] is None:
+            from .chrome import get_screen_size
+            self.options["screen_size"] = get_screen_size()
+        self._running = True
+        for shard in self.shards:
+            self._spawn(shard)
+        self._pump = threading.Thread(target=self._pump_events, name="farm-pump", daemon=True)
+        self._pump.start()
+        logger.info(f"Farm started with {self.workers} workers")
+        return self
+
+    def _spawn(self, shard: _Shard) -> None:
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(target=_worker_main, args=(shard.index, child_conn, self.options, self.log_queue),
+                                        name=f"farm-worker-{shard.index}", daemon=True)
+        with _detached_main():
+            process.start()
+        child_conn.close()
+        shard.process, shard.conn = process, parent_conn
+        self._publish({"uid": None, "event": "worker_started", "shard": shard.index, "pid": process.pid})
+
+    def stop(self, close_browsers: bool = False, timeout: float = 10.0) -> None:
+        """Stop every worker; browsers stay open unless asked"""
+        self._running = False
+        for shard in self.shards:
+            self._send(shard, [("exit", close_browsers)])
+        deadline = time.monotonic() + timeout
+        for shard in self.shards:
+            if shard.process:
+                shard.process.join(max(0.0, deadline - time.monotonic()))
+                if shard.process.is_alive():
+                    shard.process.terminate()
+        if self._pump:
+            self._pump.join(timeout=2)
+        for shard in self.shards:
+            if shard.conn and not shard.conn.closed:
+                self._drain(shard)   # Final browser_closed events sent while exiting
+                shard.conn.close()
+
+    # ----- Events -----
+
+    def subscribe(self, callback: Callable[[Event], None]) -> None:
+        """Call back with every event, on the supervisor's pump thread"""
+        self._listeners.append(callback)
+
+    def _publish(self, event: Event) -> None:
+        event.setdefault("ts", round(time.time(), 3))
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception(f"Farm listener failed on {event.get('event')}")
+
+    def _pump_events(self) -> None:
+        while self._running:
+            waitables: Dict[Any, _Shard] = {}
+            for shard in self.shards:
+                if shard.process and not shard.failed:
+                    waitables[shard.conn] = shard
+                    waitables[shard.process.sentinel] = shard
+            if not waitables:
+                time.sleep(0.5)
+                continue
+            for ready in wait(list(waitables), timeout=0.5):
+                shard = waitables[ready]
+                if ready is shard.conn:
+                    self._drain(shard)
+                elif self._running:
+                    self._drain(shard)
+                    self._on_worker_exit(shard)
+
+    def _drain(self, shard: _Shard) -> None:
+        try:
+            while shard.conn.poll():
+                for event in shard.conn.recv():
+                    if event["event"] == "trace_events":
+                        tracer.extend(event["events"])
+                        continue
+                    event["shard"] = shard.index
+                    self._track(event)
+                    self._publish(event)
+        except (EOFError, OSError):
+            pass
+
+    def _track(self, event: Event) -> None:
+        states = _STATE_BY_EVENT.get(event.get("event"))
+        if states is None:
+            return
+        browser, login = states
+        with self._lock:
+            state = self._state(event["uid"])
+            if browser is not None:
+                state["browser"] = browser.name
+            if login is not None:
+                state["login"] = login.name
+
+    def _state(self, uid: str) -> Dict[str, str]:
+        state = self.states.get(uid)
+        if state is None:
+            state = self.states[uid] = {"browser": BrowserStatus.READY.name, "login": LoginStatus.IDLE.name}
+        return state
+
+    def _on_worker_exit(self, shard: _Shard) -> None:
+        shard.process.join(timeout=1)
+        exitcode = shard.process.exitcode
+        logger.warning(f"Farm worker {shard.index} exited with code {exitcode}")
+        self._publish({"uid": None, "event": "worker_crashed", "shard": shard.index, "exitcode": exitcode})
+        shard.conn.close()
+
+        # Fail what was in flight; remember running browsers to adopt them again
+        orphans: List[Account] = []
+        failed: List[Event] = []
+        with self._lock:
+            for uid, state in self.states.items():
+                if self.shard_of(uid) != shard.index:
+                    continue
+                if state["browser"] == BrowserStatus.LAUNCHING.name:
+                    state["browser"] = BrowserStatus.ERROR.name
+                    failed.append({"uid": uid, "event": "browser_error", "error": "Worker crashed"})
+                if state["login"] == LoginStatus.LOGGING_IN.name:
+                    state["login"] = LoginStatus.FAILED.name
+                    failed.append({"uid": uid, "event": "login_error", "error": "Worker crashed"})
+                if state["browser"] == BrowserStatus.RUNNING.name and uid in self.accounts:
+                    orphans.append(self.accounts[uid])
+        for event in failed:
+            event["shard"] = shard.index
+            self._publish(event)
+
+        now = time.monotonic()
+        while shard.restarts and now - shard.restarts[0] > 60:
+            shard.restarts.popleft()
+        if len(shard.restarts) >= FARM_MAX_RESTARTS_PER_MINUTE:
+            shard.failed = True
+            logger.error(f"Farm worker {shard.index} keeps crashing, giving up on it")
+            self._publish({"uid": None, "event": "worker_failed", "shard": shard.index})
+            return
+        shard.restarts.append(now)
+        self._spawn(shard)
+        if orphans:
+            self._send(shard, [("attach", account) for account in orphans])
+
+    # ----- Commands -----
+
+    def shard_of(self, uid: str) -> int:
+        return zlib.crc32(uid.encode('utf-8')) % self.workers
+
+    def _send(self, shard: _Shard, commands: List[Tuple[str, Any]]) -> bool:
+        if shard.conn is None or shard.failed:
+            return False
+        try:
+            with shard.send_lock:
+                shard.conn.send(commands)
+            return True
+        except (OSError, ValueError):
+            # The pump notices the dead worker and restarts it
+            return False
+
+    def _route(self, commands: Iterable[Tuple[str, str, Any]]) -> int:
+        """Group (name, uid, payload) by shard and send one message per shard"""
+        by_shard: Dict[int, List[Tuple[str, Any]]] = {}
+        for name, uid, payload in commands:
+            by_shard.setdefault(self.shard_of(uid), []).append((name, payload))
+        sent = 0
+        for index, batch in by_shard.items():
+            if self._send(self.shards[index], batch):
+                sent += len(batch)
+        return sent
+
+    def open(self, accounts: Iterable[Account]) -> int:
+        """Launch browsers; returns how many were sent to a worker"""
+        commands = []
+        with self._lock:
+            for account in accounts:
+                state = self._state(account.uid)
+                if state["browser"] in (BrowserStatus.RUNNING.name, BrowserStatus.LAUNCHING.name):
+                    continue
+                self.accounts[account.uid] = account
+                state["browser"] = BrowserStatus.LAUNCHING.name
+                commands.append(("open", account.uid, (account, self.browser_count)))
+                self.browser_count += 1
+        return self._route(commands)
+
+    def login(self, accounts: Iterable[Account]) -> int:
+        """Log in on running browsers; accounts carry the credentials"""
+        commands = []
+        with self._lock:
+            for account in accounts:
+                state = self._state(account.uid)
+                if state["browser"] != BrowserStatus.RUNNING.name or state["login"] == LoginStatus.LOGGING_IN.name:
+                    continue
+                self.accounts[account.uid] = account
+                state["login"] = LoginStatus.LOGGING_IN.name
+                commands.append(("login", account.uid, account))
+        return self._route(commands)
+
+    def close(self, uids: Iterable[str]) -> int:
+        with self._lock:
+            commands = [("close", uid, self.accounts[uid]) for uid in uids
+                        if uid in self.accounts and self._state(uid)["browser"] == BrowserStatus.RUNNING.name]
+        return self._route(commands)
+
+    def cancel(self, uids: Iterable[str]) -> int:
+        return self._route(("cancel", uid, uid) for uid in uids)
+
+    # ----- State -----
+
+    def account(self, uid: str) -> Optional[Account]:
+        return self.accounts.get(uid)
+
+    def status(self, uid: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._state(uid))
+
+    def running_uids(self) -> List[str]:
+        with self._lock:
+            return [u for u, s in self.states.items() if s["browser"] == BrowserStatus.RUNNING.name]
+
+    def is_browser_running(self, uid: str) -> bool:
+        return self.status(uid)["browser"] == BrowserStatus.RUNNING.name
+
+    def is_browser_launching(self, uid: str) -> bool:
+        return self.status(uid)["browser"] == BrowserStatus.LAUNCHING.name
+
+    def is_logging_in(self, uid: str) -> bool:
+        return self.status(uid)["login"] == LoginStatus.LOGGING_IN.name
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker pid, liveness and restarts in the last minute"""
+        return [{
+            "shard": shard.index,
+            "pid": shard.process.pid if shard.process else None,
+            "alive": bool(shard.process and shard.process.is_alive()),
+            "restarts": len(shard.restarts),
+            "failed": shard.failed,
+        } for shard in self.shards]
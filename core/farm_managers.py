@@ -0,0 +1,192 @@
+"""Farm Managers Module - BrowserManager / FacebookLoginManager stand-ins backed by a Farm
+
+MainWindow talks to these exactly as it talks to the in-process managers; the
+drivers live in the farm's worker processes and only events cross back.
+Signals and callbacks fire from the farm's pump thread and are queued onto the
+GUI thread (status/progress callbacks may opt into a direct call).
+"""
+import logging
+from dataclasses import replace
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from .account_loader import Account
+from .farm import Farm
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteDriver:
+    """Placeholder for a driver owned by a farm worker"""
+
+    def __init__(self, uid: str, shard: int):
+        self.uid = uid
+        self.shard = shard
+
+    def __repr__(self) -> str:
+        return f"RemoteDriver({self.uid!r}, shard={self.shard})"
+
+
+class RemoteBlockingStats:
+    """Blocking summary reported by a worker (BlockingStats.summary() text)"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def summary(self) -> str:
+        return self.text
+
+
+class FarmBrowserManager(QObject):
+    """BrowserManager API over a Farm"""
+
+    browser_starting = pyqtSignal(str)
+    browser_started = pyqtSignal(str)
+    browser_error = pyqtSignal(str, str)
+    browser_closed = pyqtSignal(str)
+    browser_cancelled = pyqtSignal(str)
+    worker_event = pyqtSignal(object)       # worker_started / worker_crashed / worker_failed event dict
+
+    def __init__(self, farm: Farm, parent=None):
+        super().__init__(parent)
+        self.farm = farm
+        self.drivers: Dict[str, RemoteDriver] = {}
+        self.cache_proxy = None
+        farm.subscribe(self._on_event)
+
+    def _on_event(self, event: Dict) -> None:
+        name, uid = event["event"], event.get("uid")
+        if name.startswith("worker_"):
+            self.worker_event.emit(event)
+        elif name == "browser_starting":
+            self.browser_starting.emit(uid)
+        elif name == "browser_started":
+            self.drivers[uid] = RemoteDriver(uid, event["shard"])
+            self.browser_started.emit(uid)
+        elif name == "browser_error":
+            self.drivers.pop(uid, None)
+            self.browser_error.emit(uid, event.get("error", ""))
+        elif name == "browser_cancelled":
+            self.browser_cancelled.emit(uid)
+        elif name == "browser_closed":
+            self.drivers.pop(uid, None)
+            self.browser_closed.emit(uid)
+
+    def launch_browser(self, uid: str, profile_path: str, proxy: Optional[str] = None) -> None:
+        account = self.farm.account(uid)
+        account = Account(uid, account.password if account else "", account.token if account else "",
+                          profile_path, proxy)
+        if not self.farm.open([account]):
+            logger.info(f"Browser already running/launching for {uid}")
+
+    def cancel_launch(self, uid: str) -> bool:
+        """Cancel a pending launch; browser_cancelled follows from the worker"""
+        if not self.farm.is_browser_launching(uid):
+            return False
+        return bool(self.farm.cancel([uid]))
+
+    def close_browser(self, uid: str) -> None:
+        self.farm.close([uid])
+
+    def close_all_browsers(self) -> None:
+        self.farm.close(self.farm.running_uids())
+
+    def is_browser_running(self, uid: str) -> bool:
+        return self.farm.is_browser_running(uid)
+
+    def is_browser_launching(self, uid: str) -> bool:
+        return self.farm.is_browser_launching(uid)
+
+    def get_driver(self, uid: str) -> Optional[RemoteDriver]:
+        return self.drivers.get(uid)
+
+    def cleanup(self) -> None:
+        self.farm.stop(close_browsers=True)
+
+
+class FarmLoginManager(QObject):
+    """FacebookLoginManager API over a Farm"""
+
+    _dispatch = pyqtSignal(object, object)      # callback, args
+
+    def __init__(self, farm: Farm, parent=None):
+        super().__init__(parent)
+        self.farm = farm
+        self.callbacks: Dict[str, Dict[str, Optional[Callable]]] = {}
+        self.blocking: Dict[str, RemoteBlockingStats] = {}
+        self._dispatch.connect(self._run_callback)
+        farm.subscribe(self._on_event)
+
+    def start_login(self, driver: RemoteDriver, uid: str, password: str, token_2fa: str,
+                    status_callback: Optional[Callable] = None,
+                    progress_callback: Optional[Callable] = None,
+                    success_callback: Optional[Callable] = None,
+                    error_callback: Optional[Callable] = None,
+                    finished_callback: Optional[Callable] = None,
+                    cancelled_callback: Optional[Callable] = None,
+                    update_connection: Qt.ConnectionType = Qt.ConnectionType.AutoConnection) -> bool:
+        """Start a login on the worker that owns the browser.
+
+        With DirectConnection the status/progress callbacks run on the farm's
+        pump thread; everything else is queued to the GUI thread.
+        """
+        account = self.farm.account(uid)
+        if account is None or self.farm.is_logging_in(uid):
+            return False
+        self.callbacks[uid] = {
+            "status": status_callback, "progress": progress_callback,
+            "success": success_callback, "error": error_callback,
+            "finished": finished_callback, "cancelled": cancelled_callback,
+            "direct": update_connection == Qt.ConnectionType.DirectConnection,
+        }
+        self.blocking.pop(uid, None)
+        return bool(self.farm.login([replace(account, password=password, token=token_2fa)]))
+
+    def _on_event(self, event: Dict) -> None:
+        name, uid = event["event"], event.get("uid")
+        callbacks = self.callbacks.get(uid)
+        if callbacks is None or not name.startswith("login_"):
+            return
+        if name == "login_status":
+            self._call(callbacks, "status", uid, event["text"])
+        elif name == "login_progress":
+            self._call(callbacks, "progress", uid, event["value"])
+        else:
+            if name == "login_success":
+                if event.get("blocking"):
+                    self.blocking[uid] = RemoteBlockingStats(event["blocking"])
+                self._call(callbacks, "success", uid)
+            elif name == "login_error":
+                self._call(callbacks, "error", uid, event.get("error", ""))
+            elif name == "login_cancelled":
+                self._call(callbacks, "cancelled", uid)
+            self._call(callbacks, "finished", uid)
+            self.callbacks.pop(uid, None)
+
+    def _call(self, callbacks: Dict, key: str, *args) -> None:
+        callback = callbacks[key]
+        if callback is None:
+            return
+        if callbacks["direct"] and key in ("status", "progress"):
+            callback(*args)
+        else:
+            self._dispatch.emit(callback, args)
+
+    def _run_callback(self, callback: Callable, args: tuple) -> None:
+        callback(*args)
+
+    def cancel_login(self, uid: str) -> bool:
+        if not self.farm.is_logging_in(uid):
+            return False
+        return bool(self.farm.cancel([uid]))
+
+    def get_blocking_stats(self, uid: str) -> Optional[RemoteBlockingStats]:
+        return self.blocking.get(uid)
+
+    def is_logging_in(self, uid: str) -> bool:
+        return self.farm.is_logging_in(uid)
+
+    def cleanup(self) -> None:
+        # The farm (stopped by FarmBrowserManager.cleanup) cancels its own logins
+        self.callbacks.clear()
@@ -0,0 +1,184 @@
+"""Journal Module - Crash-safe append-only job journal (fsynced JSONL)
+
+Every requested operation and every state change after it is one line::
+
+    {"ts": 1700000000.123, "uid": "1000...", "op": "login", "state": "requested"}
+
+``op`` is ``open`` or ``login``. A writer thread appends the lines and fsyncs
+once per burst (group commit), so a batch of thousands of requests costs a
+few fsyncs, not thousands, and callers never wait for the disk.
+
+Replay keeps the last state of each (uid, op). An op is unfinished while that
+state is not terminal. Duplicate lines and a torn last line (crash mid-write)
+do not change the result, so replaying twice, or resuming twice, is harmless.
+Credentials are never written.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+OPS = ("open", "login")
+TERMINAL_STATES = {"done", "error", "cancelled", "closed", "dropped"}
+
+# Engine/farm event -> (op, state)
+_EVENT_STATES = {
+    "browser_starting": ("open", "starting"),
+    "browser_started": ("open", "done"),
+    "browser_error": ("open", "error"),
+    "browser_cancelled": ("open", "cancelled"),
+    "browser_closed": ("open", "closed"),
+    "login_status": ("login", "running"),
+    "login_success": ("login", "done"),
+    "login_error": ("login", "error"),
+    "login_cancelled": ("login", "cancelled"),
+}
+
+
+def replay(path: str) -> Dict[str, Dict[str, str]]:
+    """Last state per uid and op, read from a journal file"""
+    states: Dict[str, Dict[str, str]] = {}
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return states
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                states.setdefault(record["uid"], {})[record["op"]] = record["state"]
+            except (ValueError, KeyError, TypeError):
+                continue   # Torn or foreign line
+    return states
+
+
+class JobJournal:
+    """Appends job records in the background; ``path=None`` keeps it in memory only"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.states: Dict[str, Dict[str, str]] = {}
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> "JobJournal":
+        """Replay the file, compact it to the unfinished ops and start the writer"""
+        if self.path:
+            self.states = replay(self.path)
+            self._compact()
+            self._writer = threading.Thread(target=self._write_loop, name="job-journal", daemon=True)
+            self._writer.start()
+        return self
+
+    def close(self) -> None:
+        """Flush and stop the writer"""
+        if self._writer:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    # ----- Recording -----
+
+    def record(self, uid: str, op: str, state: str, **fields: Any) -> None:
+        with self._lock:
+            current = self.states.setdefault(uid, {})
+            if current.get(op) == state and not fields:
+                return   # Idempotent: the same transition twice is one line
+            current[op] = state
+            # A login waiting on a browser that failed or went away will never run
+            cascade = op == "open" and state != "done" and state in TERMINAL_STATES \
+                and current.get("login", "done") not in TERMINAL_STATES
+        if self._writer:
+            line = dict(ts=round(time.time(), 3), uid=uid, op=op, state=state, **fields)
+            self._queue.put(json.dumps(line, ensure_ascii=False))
+        if cascade:
+            self.record(uid, "login", state)
+
+    def requested(self, op: str, uids: Iterable[str]) -> None:
+        for uid in uids:
+            self.record(uid, op, "requested")
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """Journal an engine/farm event dict (subscribe this to an Engine or Farm)"""
+        mapping = _EVENT_STATES.get(event.get("event"))
+        if mapping and event.get("uid"):
+            op, state = mapping
+            if event["event"] == "browser_error":
+                self.record(event["uid"], op, state, error=str(event.get("error", ""))[:200])
+            else:
+                self.record(event["uid"], op, state)
+
+    def drop(self, uids: Iterable[str]) -> None:
+        """Mark unfinished ops of these accounts as not to be resumed"""
+        for uid in uids:
+            for op in self.pending_ops(uid):
+                self.record(uid, op, "dropped")
+
+    # ----- Queries -----
+
+    def pending_ops(self, uid: str) -> Set[str]:
+        with self._lock:
+            ops = self.states.get(uid, {})
+            return {op for op, state in ops.items() if state not in TERMINAL_STATES}
+
+    def pending(self) -> Dict[str, Set[str]]:
+        """Unfinished ops per uid"""
+        with self._lock:
+            uids = list(self.states)
+        pending = {uid: self.pending_ops(uid) for uid in uids}
+        return {uid: ops for uid, ops in pending.items() if ops}
+
+    # ----- Writer -----
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                line = self._queue.get()
+                lines: List[str] = []
+                stop = line is None
+                if not stop:
+                    lines.append(line)
+                # Group commit: take everything queued meanwhile, then one fsync
+                while not stop:
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        stop = True
+                    else:
+                        lines.append(line)
+                if lines:
+                    try:
+                        f.write("\n".join(lines) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    except OSError as e:
+                        logger.error(f"Job journal write failed: {e}")
+                if stop:
+                    return
+
+    def _compact(self) -> None:
+        """Rewrite the file with only the unfinished ops (atomic rename)"""
+        pending = self.pending()
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for uid, ops in pending.items():
+                    for op in sorted(ops):
+                        f.write(json.dumps({"ts": round(time.time(), 3), "uid": uid, "op": op,
+                                            "state": self.states[uid][op]}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Job journal compaction failed: {e}")
+        self.states = {uid: {op: self.states[uid][op] for op in ops} for uid, ops in pending.items()}
+        if pending:
+            logger.info(f"Job journal: {len(pending)} accounts with unfinished operations")
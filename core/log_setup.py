@@ -0,0 +1,195 @@
+"""Log Setup Module - Queued logging with rotation, per-account streams and redaction
+
+Logging calls only format the message and put it on a queue. One listener
+thread then writes the rotating log file and the console. It also feeds the
+optional per-account files and the in-memory ring buffer behind the table's
+log viewer. Farm workers forward their records to the same listener through a
+multiprocessing queue.
+
+A record belongs to an account when its message starts with ``[<uid>] ``
+(the repo-wide log prefix) or it was logged with ``extra={"uid": ...}``.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config import (
+    LOG_FILE, LOG_MAX_MB, LOG_BACKUP_COUNT, LOG_RING_LINES,
+    LOG_PER_ACCOUNT_DIR, LOG_PER_ACCOUNT_MAX_KB,
+)
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(name)s] %(message)s'
+
+_UID_PREFIX = re.compile(r"\[([^\]\s]+)\] ")
+# TOTP codes next to "2FA"/"code" mentions, e.g. "Generated 2FA code: 123456"
+_2FA_CODE = re.compile(r"((?:2FA|approvals?)[ _]code\W{0,3})\d{6,8}\b", re.IGNORECASE)
+
+
+def redact(message: str) -> str:
+    return _2FA_CODE.sub(r"\1******", message)
+
+
+class AccountQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that redacts the message and tags the record with its uid
+    in the calling thread, so the listener side never re-parses it"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.msg = record.message = redact(record.msg)
+        if getattr(record, "uid", None) is None:
+            match = _UID_PREFIX.match(record.msg)
+            record.uid = match.group(1) if match else None
+        return record
+
+
+class AccountLogBuffer(logging.Handler):
+    """Last ``capacity`` formatted lines of every account"""
+
+    def __init__(self, capacity: int = LOG_RING_LINES):
+        super().__init__()
+        self.capacity = capacity
+        self._lines: Dict[str, Deque[str]] = {}
+        self._totals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        uid = getattr(record, "uid", None)
+        if not uid:
+            return
+        line = self.format(record)
+        with self._lock:
+            lines = self._lines.get(uid)
+            if lines is None:
+                lines = self._lines[uid] = deque(maxlen=self.capacity)
+            lines.append(line)
+            self._totals[uid] = self._totals.get(uid, 0) + 1
+
+    def tail(self, uid: str, since: int = 0) -> Tuple[List[str], int]:
+        """Lines logged after the ``since``-th line of this account, and the new total"""
+        with self._lock:
+            total = self._totals.get(uid, 0)
+            lines = self._lines.get(uid, ())
+            new = total - since if 0 <= since <= total else total   # Cleared since: resend all
+            new = min(new, len(lines))
+            return list(lines)[len(lines) - new:], total
+
+    def clear(self, uid: Optional[str] = None) -> None:
+        with self._lock:
+            if uid is None:
+                self._lines.clear()
+                self._totals.clear()
+            else:
+                self._lines.pop(uid, None)
+                self._totals.pop(uid, None)
+
+
+class PerAccountFileHandler(logging.Handler):
+    """Writes each account's records to ``<directory>/<uid>.log``.
+
+    Files rotate at ``max_bytes`` and only the ``max_open`` most recently used
+    ones stay open, so thousands of accounts do not exhaust file descriptors.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_open: int = 64):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_open = max_open
+        self._files: "OrderedDict[str, logging.Handler]" = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        uid = getattr(record, "uid", None)
+        if not uid:
+            return
+        handler = self._files.get(uid)
+        if handler is None:
+            safe = re.sub(r"[^\w.-]", "_", uid)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(self.directory, f"{safe}.log"), maxBytes=self.max_bytes,
+                backupCount=1, encoding="utf-8", delay=True)
+            handler.setFormatter(self.formatter)
+            self._files[uid] = handler
+            if len(self._files) > self.max_open:
+                self._files.popitem(last=False)[1].close()
+        else:
+            self._files.move_to_end(uid)
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        self._files.clear()
+        super().close()
+
+
+class LogPipeline:
+    """Queue, listener thread and sinks set up by ``setup_logging``"""
+
+    def __init__(self, handlers: List[logging.Handler], buffer: AccountLogBuffer):
+        self.handlers = handlers
+        self.buffer = buffer
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._process_listener: Optional[logging.handlers.QueueListener] = None
+        self.process_log_queue = None
+        self._stopped = False
+
+    def process_queue(self):
+        """Multiprocessing queue for worker processes, drained by a second listener"""
+        if self.process_log_queue is None:
+            import multiprocessing
+            self.process_log_queue = multiprocessing.get_context("spawn").Queue()
+            self._process_listener = logging.handlers.QueueListener(
+                self.process_log_queue, *self.handlers, respect_handler_level=True)
+            self._process_listener.start()
+        return self.process_log_queue
+
+    def stop(self) -> None:
+        """Drain the queues and close the sinks (registered with atexit)"""
+        if self._stopped:
+            return
+        self._stopped = True
+        for listener in (self._process_listener, self.listener):
+            if listener is not None:
+                listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def setup_logging(level: int = logging.INFO, log_file: Optional[str] = LOG_FILE, console: bool = True,
+                  per_account_dir: Optional[str] = LOG_PER_ACCOUNT_DIR) -> LogPipeline:
+    """Route the root logger through a queue to a single listener thread"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    buffer = AccountLogBuffer()
+    handlers: List[logging.Handler] = [buffer]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_MB * 1024 * 1024, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"))
+    if console:
+        handlers.append(logging.StreamHandler())
+    if per_account_dir:
+        handlers.append(PerAccountFileHandler(per_account_dir, LOG_PER_ACCOUNT_MAX_KB * 1024))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    pipeline = LogPipeline(handlers, buffer)
+    root = logging.getLogger()
+    root.handlers[:] = [AccountQueueHandler(pipeline.queue)]
+    root.setLevel(level)
+    pipeline.listener.start()
+    atexit.register(pipeline.stop)
+    return pipeline
+
+
+def forward_to(log_queue, level: int) -> None:
+    """In a worker process: send every record to the parent's pipeline"""
+    root = logging.getLogger()
+    root.handlers[:] = [AccountQueueHandler(log_queue)]
+    root.setLevel(level)
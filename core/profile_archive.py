@@ -0,0 +1,391 @@
+"""Profile Archive Module - Pack idle profiles into compressed tars, restore them on launch
+
+``sweep()`` packs every profile under PROFILES_DIR that has not been launched
+for PROFILE_ARCHIVE_IDLE_DAYS into ``<PROFILE_ARCHIVE_DIR>/<uid>.tar.zst``,
+then deletes the directory. Caches and lock files are left out. Without the
+optional ``zstandard`` package the archive is ``.tar.gz`` instead. An archive
+is read back and checked against what was written before the profile is
+deleted.
+
+``restore()`` runs at the start of every launch. When the profile has an
+archive, it is decompressed and unpacked in one streaming pass into a
+temporary directory, which is then renamed into place. The caller sees an
+ordinary profile directory, only later.
+
+Profiles whose Chrome is running, or that are staged in RAM, are never
+archived. A per-uid lock file in the archive directory (flock, or msvcrt
+on Windows) keeps a sweep and a launch in different processes from touching
+the same profile. Launchers only involve the archive when sweeping is on or
+``has_archive()`` finds one for the uid.
+"""
+import gzip
+import logging
+import os
+import shutil
+import stat
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from config import PROFILES_DIR, PROFILE_STAGE_DIR, PROFILE_ARCHIVE_DIR, PROFILE_ARCHIVE_IDLE_DAYS, \
+    PROFILE_ARCHIVE_ZSTD_LEVEL
+from .chrome import chrome_processes
+from .profile_stage import SKIP_DIRS, SKIP_FILES, STAGE_MARKER, TMP_SUFFIX
+
+if os.name == "posix":
+    import fcntl
+else:
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAST_LAUNCH_FILE = ".fbm-last-launch"
+# Written by Chrome on every run; used for profiles launched before usage was recorded
+USAGE_HINTS = (LAST_LAUNCH_FILE, "Local State", os.path.join("Default", "Preferences"))
+ZSTD_SUFFIX = ".tar.zst"
+GZIP_SUFFIX = ".tar.gz"
+GZIP_LEVEL = 6
+LOCK_RETRY_INTERVAL = 0.1
+
+
+@dataclass
+class ArchiveStats:
+    archived: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    restored: int = 0
+    restore_seconds: float = 0.0
+    restore_max_seconds: float = 0.0
+
+    @property
+    def reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def summary(self) -> str:
+        parts = []
+        if self.archived:
+            parts.append(f"{self.archived} archived, {self.reclaimed / (1024 * 1024):.1f} MB reclaimed "
+                         f"({self.bytes_after / (1024 * 1024):.1f} MB of archives)")
+        if self.restored:
+            avg_ms = self.restore_seconds / self.restored * 1000
+            parts.append(f"{self.restored} restored (avg {avg_ms:.0f} ms, max {self.restore_max_seconds * 1000:.0f} ms)")
+        return ", ".join(parts) or "nothing archived or restored"
+
+
+def _archive_file(archive_dir: str, uid: str) -> Optional[str]:
+    for suffix in (ZSTD_SUFFIX, GZIP_SUFFIX):
+        path = os.path.join(archive_dir, uid + suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def has_archive(uid: str, archive_dir: str = PROFILE_ARCHIVE_DIR) -> bool:
+    """Whether the uid's profile is archived (a launch must restore it)"""
+    return _archive_file(os.path.join(BASE_DIR, archive_dir), uid) is not None
+
+
+def _lock_file(fd: int, wait: bool) -> bool:
+    """Exclusive lock on fd; False if it is held elsewhere and wait is off"""
+    if os.name == "posix":
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not wait:
+                return False
+            time.sleep(LOCK_RETRY_INTERVAL)
+
+
+def _zstandard():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _tree_size(path: str) -> Tuple[int, int]:
+    """(files, bytes) of a profile, caches excluded"""
+    files = size = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name in SKIP_FILES or name.endswith(TMP_SUFFIX):
+                continue
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files += 1
+                size += st.st_size
+    return files, size
+
+
+def _exclude(info: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    name = os.path.basename(info.name)
+    if name in SKIP_FILES or name.endswith(TMP_SUFFIX) or (info.isdir() and name in SKIP_DIRS):
+        return None
+    if not (info.isfile() or info.isdir()):
+        return None   # Sockets and Chrome's lock symlinks mean nothing after a restart
+    return info
+
+
+class ProfileArchive:
+    """Archives idle profiles and restores them when they are launched again"""
+
+    def __init__(self, profiles_dir: str = PROFILES_DIR, archive_dir: str = PROFILE_ARCHIVE_DIR):
+        self.profiles_dir = os.path.join(BASE_DIR, profiles_dir)
+        self.archive_dir = os.path.join(BASE_DIR, archive_dir)
+        self.stats = ArchiveStats()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----- Launch side -----
+
+    def archive_path(self, uid: str) -> Optional[str]:
+        """The uid's archive, if it has one"""
+        return _archive_file(self.archive_dir, uid)
+
+    def restore(self, uid: str, profile_path: str) -> Optional[float]:
+        """Unpack the uid's archive into profile_path; returns the seconds taken, None if not archived.
+
+        Also records the launch, under the same lock a sweep takes, so a
+        profile being launched is never archived from under Chrome.
+        """
+        with self._locked(uid, wait=True):
+            archive = self.archive_path(uid)
+            if archive is None:
+                self.mark_launched(profile_path)
+                return None
+            if self._has_data(profile_path) and self._last_used(profile_path) > os.path.getmtime(archive):
+                logger.warning(f"[{uid}] Profile was used after it was archived; keeping the profile "
+                               f"and leaving {archive} untouched")
+                self.mark_launched(profile_path)
+                return None
+
+            started = time.perf_counter()
+            restoring = profile_path + TMP_SUFFIX
+            shutil.rmtree(restoring, ignore_errors=True)
+            try:
+                with self._reader(archive) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(restoring, filter="data")
+                    else:
+                        tar.extractall(restoring)
+                os.makedirs(restoring, exist_ok=True)
+                # Empty (created when the account list was loaded), or what an interrupted
+                # sweep had not deleted yet: either way the archive is the complete copy
+                shutil.rmtree(profile_path, ignore_errors=True)
+                os.rename(restoring, profile_path)
+            except (OSError, tarfile.TarError, EOFError) as e:
+                shutil.rmtree(restoring, ignore_errors=True)
+                raise RuntimeError(f"Profile restore from {os.path.basename(archive)} failed: {e}") from e
+            os.remove(archive)
+            elapsed = time.perf_counter() - started
+            self.mark_launched(profile_path)
+
+        with self._stats_lock:
+            self.stats.restored += 1
+            self.stats.restore_seconds += elapsed
+            self.stats.restore_max_seconds = max(self.stats.restore_max_seconds, elapsed)
+        logger.info(f"[{uid}] Profile restored from archive in {elapsed * 1000:.0f} ms")
+        return elapsed
+
+    @staticmethod
+    def mark_launched(profile_path: str) -> None:
+        """Record the launch time the idle policy goes by"""
+        try:
+            os.makedirs(profile_path, exist_ok=True)
+            with open(os.path.join(profile_path, LAST_LAUNCH_FILE), "w", encoding="utf-8") as f:
+                f.write(str(round(time.time())))
+        except OSError as e:
+            logger.debug(f"Failed to record launch time in {profile_path}: {e}")
+
+    # ----- Archiving -----
+
+    def idle_profiles(self, idle_days: float = PROFILE_ARCHIVE_IDLE_DAYS,
+                      uids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """(uid, last used) of profiles idle for idle_days (only these uids if given), oldest first"""
+        cutoff = time.time() - idle_days * 86400
+        wanted = set(uids) if uids is not None else None
+        idle = []
+        try:
+            entries = list(os.scandir(self.profiles_dir))
+        except OSError:
+            return []
+        for entry in entries:
+            if not entry.is_dir() or entry.name.endswith(TMP_SUFFIX) \
+                    or (wanted is not None and entry.name not in wanted):
+                continue
+            last_used = self._last_used(entry.path)
+            if last_used < cutoff and self._has_data(entry.path):
+                idle.append((entry.name, last_used))
+        idle.sort(key=lambda item: item[1])
+        return idle
+
+    def archive(self, uid: str, idle_days: float = PROFILE_ARCHIVE_IDLE_DAYS) -> Optional[ArchiveStats]:
+        """Pack one profile and delete it; None when it is in use or already being handled"""
+        profile_path = os.path.join(self.profiles_dir, uid)
+        if os.path.exists(os.path.join(PROFILE_STAGE_DIR, uid, STAGE_MARKER)) or chrome_processes(profile_path):
+            return None
+        with self._locked(uid, wait=False) as locked:
+            if not locked or self.archive_path(uid) is not None or not self._has_data(profile_path):
+                return None
+            if self._last_used(profile_path) >= time.time() - idle_days * 86400:
+                return None   # Launched since the sweep listed it
+            files, size = _tree_size(profile_path)
+            suffix = ZSTD_SUFFIX if _zstandard() else GZIP_SUFFIX
+            target = os.path.join(self.archive_dir, uid + suffix)
+            tmp = target + TMP_SUFFIX
+            try:
+                with open(tmp, "wb") as raw:
+                    with self._writer(raw, suffix) as stream, tarfile.open(fileobj=stream, mode="w|") as tar:
+                        for name in sorted(os.listdir(profile_path)):
+                            tar.add(os.path.join(profile_path, name), arcname=name, filter=_exclude)
+                    raw.flush()
+                    os.fsync(raw.fileno())
+                # Read it all back before anything is deleted
+                archived_files, archived_bytes = self._verify(tmp)
+                if (archived_files, archived_bytes) != (files, size):
+                    raise RuntimeError(f"archive holds {archived_files} files / {archived_bytes} bytes, "
+                                       f"profile has {files} / {size}")
+                os.replace(tmp, target)
+            except (OSError, tarfile.TarError, EOFError, RuntimeError) as e:
+                logger.warning(f"[{uid}] Archiving failed, profile kept: {e}")
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                return None
+            shutil.rmtree(profile_path, ignore_errors=True)
+        stats = ArchiveStats(archived=1, bytes_before=size, bytes_after=os.path.getsize(target))
+        logger.info(f"[{uid}] Profile archived: {size // 1024} KB -> {stats.bytes_after // 1024} KB")
+        return stats
+
+    def sweep(self, idle_days: float = PROFILE_ARCHIVE_IDLE_DAYS, uids: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None,
+              on_archived: Optional[Callable[[str, ArchiveStats], None]] = None) -> ArchiveStats:
+        """Archive every idle profile (up to limit); returns what was reclaimed"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        total = ArchiveStats()
+        for uid, _last_used in self.idle_profiles(idle_days, uids)[:limit]:
+            if self._stopping.is_set():
+                break
+            stats = self.archive(uid, idle_days)
+            if stats and on_archived:
+                on_archived(uid, stats)
+            if stats:
+                total.archived += 1
+                total.bytes_before += stats.bytes_before
+                total.bytes_after += stats.bytes_after
+        if total.archived:
+            logger.info(f"Profile archive sweep: {total.summary()}")
+        with self._stats_lock:
+            self.stats.archived += total.archived
+            self.stats.bytes_before += total.bytes_before
+            self.stats.bytes_after += total.bytes_after
+        return total
+
+    def start_sweeper(self, interval_hours: float) -> "ProfileArchive":
+        """Sweep now and then every interval_hours on a background thread"""
+        def run():
+            while not self._stopping.is_set():
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Profile archive sweep failed")
+                self._stopping.wait(interval_hours * 3600)
+        self._thread = threading.Thread(target=run, name="profile-archive", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ----- Helpers -----
+
+    def _verify(self, path: str) -> Tuple[int, int]:
+        files = size = 0
+        suffix = ZSTD_SUFFIX if path.endswith(ZSTD_SUFFIX + TMP_SUFFIX) else GZIP_SUFFIX
+        with open(path, "rb") as raw, self._reader(raw, suffix) as stream, \
+                tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                if member.isfile():
+                    files += 1
+                    size += member.size
+                    data = tar.extractfile(member)
+                    while data.read(1024 * 1024):
+                        pass
+        return files, size
+
+    @contextmanager
+    def _writer(self, raw: IO[bytes], suffix: str) -> Iterator[IO[bytes]]:
+        if suffix == ZSTD_SUFFIX:
+            compressor = _zstandard().ZstdCompressor(level=PROFILE_ARCHIVE_ZSTD_LEVEL, write_checksum=True)
+            with compressor.stream_writer(raw, closefd=False) as stream:
+                yield stream
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL) as stream:
+                yield stream
+
+    @contextmanager
+    def _reader(self, source, suffix: Optional[str] = None) -> Iterator[IO[bytes]]:
+        """Decompressing stream over a path or an open file"""
+        raw = open(source, "rb") if isinstance(source, str) else source
+        suffix = suffix or (ZSTD_SUFFIX if source.endswith(ZSTD_SUFFIX) else GZIP_SUFFIX)
+        try:
+            if suffix == ZSTD_SUFFIX:
+                zstandard = _zstandard()
+                if zstandard is None:
+                    raise RuntimeError("the zstandard package is needed to restore .tar.zst archives")
+                with zstandard.ZstdDecompressor().stream_reader(raw, closefd=False) as stream:
+                    yield stream
+            else:
+                with gzip.GzipFile(fileobj=raw, mode="rb") as stream:
+                    yield stream
+        finally:
+            if raw is not source:
+                raw.close()
+
+    @contextmanager
+    def _locked(self, uid: str, wait: bool) -> Iterator[bool]:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.archive_dir, f".{uid}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            yield _lock_file(fd, wait)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _has_data(path: str) -> bool:
+        try:
+            with os.scandir(path) as entries:
+                return any(e.name != LAST_LAUNCH_FILE for e in entries)
+        except OSError:
+            return False
+
+    @staticmethod
+    def _last_used(path: str) -> float:
+        for hint in USAGE_HINTS:
+            try:
+                return os.path.getmtime(os.path.join(path, hint))
+            except OSError:
+                continue
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
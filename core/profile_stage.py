@@ -0,0 +1,538 @@
+"""Profile Stage Module - RAM-backed (tmpfs) working copies of Chrome profiles
+
+With staging on, Chrome runs on ``<PROFILE_STAGE_DIR>/<uid>`` instead of the
+profile under PROFILES_DIR, so its small-file writes land in RAM. A
+background thread copies changed files back every PROFILE_SYNC_INTERVAL
+seconds. When the browser closes, a final sync runs and then the RAM copy
+is removed.
+
+Sync is incremental and every file is replaced atomically:
+
+- Changed files are found by comparing (size, mtime) with the manifest of
+  the last sync (``.fbm-sync.json`` in the persistent profile). The slow
+  disk is only written, never scanned.
+- Each file is written to a temporary name, fsynced and renamed over the
+  old one. A copy whose source changed while it was being read is dropped
+  and retried next round.
+- SQLite databases are copied with the online backup API and must pass
+  ``PRAGMA quick_check`` before they replace anything. A database Chrome
+  keeps locked waits for the final sync.
+- LevelDB ``CURRENT`` files are copied only after the rest of their
+  directory, and deletions are applied only for directories that synced
+  completely.
+
+The RAM copy outlives a crash of this process, though not a reboot. Its
+owner holds an flock on ``.fbm-stage.json``, so ``recover()`` (run when the
+stager starts) only touches copies whose owner is gone. If Chrome has exited
+it syncs the copy back and removes it. If Chrome still runs it adopts the
+copy.
+
+Staging needs Linux (a tmpfs under /dev/shm and flock); ``start_stager()``
+leaves it off elsewhere.
+"""
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from urllib.parse import quote
+
+from config import PROFILE_STAGE_DIR, PROFILE_SYNC_INTERVAL, PROFILE_STAGE_MIN_FREE_MB
+from .chrome import chrome_processes
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUPPORTED = sys.platform.startswith("linux")
+if STAGING_SUPPORTED:
+    import fcntl
+
+STAGE_MARKER = ".fbm-stage.json"
+SYNC_MANIFEST = ".fbm-sync.json"
+TMP_SUFFIX = ".fbm-tmp"
+# Rebuilt by Chrome on demand; never worth RAM or a disk write
+SKIP_DIRS = {"Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache",
+             "DawnCache", "DawnGraphiteCache", "GraphiteDawnCache", "Crashpad"}
+# Per-run locks and markers
+SKIP_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "DevToolsActivePort",
+              "lockfile", STAGE_MARKER, SYNC_MANIFEST}
+# A backup-API copy is self-contained; these would roll it back on the next open
+SQLITE_SIDE_SUFFIXES = ("-journal", "-wal", "-shm")
+SQLITE_HEADER = b"SQLite format 3\x00"
+RELEASE_POLL_INTERVAL = 0.5
+RELEASE_WAIT = 5.0
+
+
+def _synced(name: str) -> bool:
+    return name not in SKIP_FILES and not name.endswith(TMP_SUFFIX) \
+        and not name.endswith(SQLITE_SIDE_SUFFIXES)
+
+
+def _ignore_on_stage(directory: str, names: List[str]) -> Set[str]:
+    return {n for n in names if n in SKIP_DIRS or n in SKIP_FILES or n.endswith(TMP_SUFFIX)}
+
+
+def _is_sqlite(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class SyncStats:
+    copied: int = 0
+    deleted: int = 0
+    skipped: int = 0            # Locked or changing while read; retried next round
+    bytes: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.skipped == 0
+
+    def summary(self) -> str:
+        return (f"{self.copied} copied ({self.bytes // 1024} KB), {self.deleted} deleted, "
+                f"{self.skipped} deferred")
+
+
+@dataclass
+class StagedProfile:
+    uid: str
+    source: str                 # Persistent profile directory
+    path: str                   # RAM copy Chrome runs on
+    lock_fd: int
+    manifest: Dict[str, List[int]] = field(default_factory=dict)   # rel path -> [size, mtime_ns]
+    released: bool = False      # Browser closed: sync, then remove the RAM copy
+
+
+class ProfileStager:
+    """Stages profiles onto tmpfs and keeps the persistent copies in sync"""
+
+    def __init__(self, root: str = PROFILE_STAGE_DIR, sync_interval: float = PROFILE_SYNC_INTERVAL,
+                 min_free_mb: int = PROFILE_STAGE_MIN_FREE_MB):
+        self.root = root
+        self.sync_interval = sync_interval
+        self.min_free_bytes = min_free_mb * 1024 * 1024
+        self.staged: Dict[str, StagedProfile] = {}
+        self._uid_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ProfileStager":
+        """Recover copies left by a crash, then sync in the background"""
+        try:
+            os.makedirs(self.root, mode=0o700, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Profile staging disabled, cannot create {self.root}: {e}")
+            return self
+        self._thread = threading.Thread(target=self._run, name="profile-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Final sync of every staged profile; closed ones are removed from RAM"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        deadline = time.monotonic() + RELEASE_WAIT
+        for entry in self._entries():
+            while entry.released and chrome_processes(entry.path) and time.monotonic() < deadline:
+                time.sleep(RELEASE_POLL_INTERVAL)
+            with self._uid_lock(entry.uid):
+                if self.staged.get(entry.uid) is not entry:
+                    continue
+                if entry.released and self._finish(entry):
+                    continue
+                # Chrome keeps running: leave the copy for the next start to adopt
+                stats = self._sync(entry)
+                logger.info(f"[{entry.uid}] Profile synced on exit: {stats.summary()}")
+                self._forget(entry)
+
+    # ----- Staging -----
+
+    def stage(self, uid: str, source: str) -> str:
+        """Directory Chrome should use for this profile: the RAM copy, or ``source`` as a fallback"""
+        if self._thread is None:
+            return source
+        absolute = os.path.abspath(source)
+        with self._uid_lock(uid):
+            entry = self.staged.get(uid)
+            if entry is None:
+                entry = self._claim(uid)
+                if entry is not None and entry.source != absolute:
+                    # Left over for another profile directory: write it back first
+                    if not self._finish(entry, force=True):
+                        return source
+                    entry = None
+                if entry is None:
+                    entry = self._copy_in(uid, absolute)
+                if entry is None:
+                    return source
+                with self._lock:
+                    self.staged[uid] = entry
+            entry.released = False
+            return entry.path
+
+    def active_path(self, uid: str, source: str) -> str:
+        """Where a browser of this profile runs (for attaching to it or killing it)"""
+        entry = self.staged.get(uid)
+        if entry is not None and entry.source == os.path.abspath(source):
+            return entry.path
+        path = os.path.join(self.root, uid)
+        if self._thread is not None and os.path.exists(os.path.join(path, STAGE_MARKER)):
+            return path   # Staged by a process that died; recovery adopts it
+        return source
+
+    def release(self, uid: str) -> None:
+        """The browser is closing: sync back once Chrome exits, then free the RAM"""
+        entry = self.staged.get(uid)
+        if entry is not None:
+            entry.released = True
+            self._wake.set()
+
+    def _copy_in(self, uid: str, source: str) -> Optional[StagedProfile]:
+        try:
+            free = shutil.disk_usage(self.root).free
+        except OSError as e:
+            logger.warning(f"[{uid}] Profile staging unavailable: {e}")
+            return None
+        if free < self.min_free_bytes:
+            logger.warning(f"[{uid}] Only {free // (1024 * 1024)} MB free in {self.root}, launching from disk")
+            return None
+
+        started = time.perf_counter()
+        path = os.path.join(self.root, uid)
+        staging = path + TMP_SUFFIX
+        shutil.rmtree(staging, ignore_errors=True)
+        fd = None
+        try:
+            os.makedirs(source, exist_ok=True)
+            os.makedirs(staging, mode=0o700)
+            with open(os.path.join(staging, STAGE_MARKER), "w", encoding="utf-8") as f:
+                json.dump({"uid": uid, "source": source, "staged_at": round(time.time(), 3)}, f)
+            fd = self._lock_marker(staging)
+            shutil.copytree(source, staging, ignore=_ignore_on_stage, dirs_exist_ok=True)
+            # A half-copied profile never appears under the final name
+            os.rename(staging, path)
+        except OSError as e:
+            logger.warning(f"[{uid}] Profile staging failed, launching from disk: {e}")
+            if fd is not None:
+                os.close(fd)
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+
+        entry = StagedProfile(uid, source, path, fd)
+        # copy2 kept the mtimes, so the RAM copy and the disk copy match as of now
+        size = 0
+        for rel, st in self._walk(path):
+            entry.manifest[rel] = [st.st_size, st.st_mtime_ns]
+            size += st.st_size
+        self._save_manifest(entry)
+        logger.info(f"[{uid}] Profile staged to RAM: {len(entry.manifest)} files, "
+                    f"{size // (1024 * 1024)} MB in {time.perf_counter() - started:.2f}s")
+        return entry
+
+    # ----- Recovery -----
+
+    def recover(self) -> None:
+        """Write back (or adopt) copies whose owning process is gone"""
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.root, name)
+            if name.endswith(TMP_SUFFIX):
+                fd = self._lock_marker(path)
+                if fd is not None:   # Staging interrupted by a crash; the disk copy is intact
+                    shutil.rmtree(path, ignore_errors=True)
+                    os.close(fd)
+                continue
+            with self._uid_lock(name):
+                if name in self.staged:
+                    continue
+                entry = self._claim(name)
+                if entry is None:
+                    continue
+                if chrome_processes(entry.path):
+                    logger.info(f"[{name}] Adopted RAM profile of a running browser")
+                    with self._lock:
+                        self.staged[name] = entry
+                elif self._finish(entry, force=True):
+                    logger.info(f"[{name}] Recovered unsynced RAM profile to {entry.source}")
+
+    def _claim(self, uid: str) -> Optional[StagedProfile]:
+        """Take over a RAM copy left on disk, unless a live process still owns it"""
+        path = os.path.join(self.root, uid)
+        fd = self._lock_marker(path)
+        if fd is None:
+            return None
+        try:
+            with open(os.path.join(path, STAGE_MARKER), encoding="utf-8") as f:
+                source = json.load(f)["source"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[{uid}] Unreadable stage marker in {path}: {e}")
+            os.close(fd)
+            return None
+        entry = StagedProfile(uid, source, path, fd)
+        try:
+            with open(os.path.join(source, SYNC_MANIFEST), encoding="utf-8") as f:
+                entry.manifest = json.load(f)
+        except (OSError, ValueError):
+            pass   # No manifest: everything is copied back
+        return entry
+
+    @staticmethod
+    def _lock_marker(path: str) -> Optional[int]:
+        try:
+            fd = os.open(os.path.join(path, STAGE_MARKER), os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    # ----- Sync -----
+
+    def sync(self, uid: str) -> Optional[SyncStats]:
+        """Copy this profile's changes back now"""
+        with self._uid_lock(uid):
+            entry = self.staged.get(uid)
+            return self._sync(entry) if entry else None
+
+    def _run(self) -> None:
+        self.recover()
+        next_sync = time.monotonic() + self.sync_interval
+        while not self._stopping.is_set():
+            pending = [e for e in self._entries() if e.released]
+            timeout = max(0.0, next_sync - time.monotonic())
+            if pending:
+                timeout = min(timeout, RELEASE_POLL_INTERVAL)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stopping.is_set():
+                return
+            for entry in self._entries():
+                if entry.released:
+                    with self._uid_lock(entry.uid):
+                        if self.staged.get(entry.uid) is entry and entry.released:
+                            self._finish(entry)
+            if time.monotonic() >= next_sync:
+                for entry in self._entries():
+                    if not entry.released:
+                        with self._uid_lock(entry.uid):
+                            if self.staged.get(entry.uid) is entry:
+                                self._sync(entry)
+                next_sync = time.monotonic() + self.sync_interval
+
+    def _finish(self, entry: StagedProfile, force: bool = False) -> bool:
+        """Final sync once Chrome has exited; removes the RAM copy when nothing was deferred"""
+        if not force and chrome_processes(entry.path):
+            return False
+        stats = self._sync(entry)
+        if not stats.complete:
+            logger.warning(f"[{entry.uid}] Final profile sync incomplete ({stats.summary()}), "
+                           f"keeping RAM copy {entry.path}")
+            entry.released = True
+            with self._lock:
+                self.staged.setdefault(entry.uid, entry)
+            return False
+        shutil.rmtree(entry.path, ignore_errors=True)
+        self._forget(entry)
+        logger.info(f"[{entry.uid}] Profile synced back and unstaged: {stats.summary()}")
+        return True
+
+    def _sync(self, entry: StagedProfile) -> SyncStats:
+        stats = SyncStats()
+        seen: Set[str] = set()
+        visited: Set[str] = set()
+        incomplete: Set[str] = set()
+        for directory, names in self._walk_dirs(entry.path):
+            visited.add(directory)
+            # LevelDB: CURRENT names the live MANIFEST, so it goes last
+            for name in sorted(names, key=lambda n: n == "CURRENT"):
+                rel = os.path.join(directory, name)
+                src = os.path.join(entry.path, rel)
+                try:
+                    st = os.stat(src)
+                except FileNotFoundError:
+                    continue
+                seen.add(rel)
+                key = [st.st_size, st.st_mtime_ns]
+                if entry.manifest.get(rel) == key:
+                    continue
+                if name == "CURRENT" and directory in incomplete:
+                    stats.skipped += 1
+                elif self._copy_file(entry.uid, src, os.path.join(entry.source, rel), st):
+                    entry.manifest[rel] = key
+                    stats.copied += 1
+                    stats.bytes += st.st_size
+                else:
+                    incomplete.add(directory)
+                    stats.skipped += 1
+
+        for rel in set(entry.manifest) - seen:
+            directory = os.path.dirname(rel)
+            if directory in incomplete:
+                continue
+            target = os.path.join(entry.source, rel)
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"[{entry.uid}] Failed to delete {target}: {e}")
+                continue
+            del entry.manifest[rel]
+            stats.deleted += 1
+            if directory and directory not in visited:
+                try:
+                    os.rmdir(os.path.dirname(target))
+                except OSError:
+                    pass
+
+        if stats.copied or stats.deleted:
+            self._save_manifest(entry)
+            logger.debug(f"[{entry.uid}] Profile sync: {stats.summary()}")
+        return stats
+
+    def _copy_file(self, uid: str, src: str, dst: str, st: os.stat_result) -> bool:
+        """Replace dst with a verified copy of src; False leaves dst untouched"""
+        tmp = dst + TMP_SUFFIX
+        ok = False
+        try:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if _is_sqlite(src):
+                ok = self._backup_sqlite(uid, src, tmp)
+                if ok:
+                    # A stale rollback journal next to the new database would corrupt it
+                    for suffix in SQLITE_SIDE_SUFFIXES:
+                        if os.path.exists(dst + suffix):
+                            os.remove(dst + suffix)
+            else:
+                with open(src, "rb") as fin, open(tmp, "wb") as fout:
+                    shutil.copyfileobj(fin, fout, 1024 * 1024)
+                    fout.flush()
+                    os.fsync(fout.fileno())
+                after = os.stat(src)
+                ok = (after.st_size, after.st_mtime_ns) == (st.st_size, st.st_mtime_ns) \
+                    and os.path.getsize(tmp) == st.st_size
+            if ok:
+                os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+                os.replace(tmp, dst)
+        except OSError as e:
+            logger.warning(f"[{uid}] Profile sync of {src} failed: {e}")
+            ok = False
+        finally:
+            if not ok and os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+        return ok
+
+    @staticmethod
+    def _backup_sqlite(uid: str, src: str, tmp: str) -> bool:
+        """Consistent snapshot of a live database, checked before it is used"""
+        try:
+            source = sqlite3.connect(f"file:{quote(src)}?mode=ro", uri=True, timeout=0,
+                                     isolation_level=None)
+            try:
+                # Take the shared lock up front: backup() itself retries a locked source forever
+                source.execute("BEGIN")
+                source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+                target = sqlite3.connect(tmp)
+                try:
+                    source.backup(target)
+                    result = target.execute("PRAGMA quick_check").fetchone()[0]
+                finally:
+                    target.close()
+            finally:
+                source.close()
+        except sqlite3.Error as e:
+            if "locked" in str(e):
+                logger.debug(f"[{uid}] {os.path.basename(src)} deferred: {e}")   # Chrome holds it
+            else:
+                logger.warning(f"[{uid}] {os.path.basename(src)} not synced: {e}")
+            return False
+        if result != "ok":
+            logger.warning(f"[{uid}] Integrity check failed for {src}: {result}")
+            return False
+        _fsync(tmp)
+        return True
+
+    def _save_manifest(self, entry: StagedProfile) -> None:
+        """Written after the files it describes, so a crash mid-sync only means recopying"""
+        path = os.path.join(entry.source, SYNC_MANIFEST)
+        tmp = path + TMP_SUFFIX
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry.manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"[{entry.uid}] Failed to save profile sync manifest: {e}")
+
+    # ----- Helpers -----
+
+    @staticmethod
+    def _walk_dirs(root: str):
+        """(relative directory, synced file names) for the RAM copy, caches skipped"""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            directory = os.path.relpath(dirpath, root)
+            yield ("" if directory == "." else directory), [n for n in filenames if _synced(n)]
+
+    def _walk(self, root: str):
+        for directory, names in self._walk_dirs(root):
+            for name in names:
+                rel = os.path.join(directory, name)
+                try:
+                    yield rel, os.stat(os.path.join(root, rel))
+                except FileNotFoundError:
+                    continue
+
+    def _uid_lock(self, uid: str) -> threading.Lock:
+        with self._lock:
+            return self._uid_locks.setdefault(uid, threading.Lock())
+
+    def _entries(self) -> List[StagedProfile]:
+        with self._lock:
+            return list(self.staged.values())
+
+    def _forget(self, entry: StagedProfile) -> None:
+        with self._lock:
+            if self.staged.get(entry.uid) is entry:
+                del self.staged[entry.uid]
+        os.close(entry.lock_fd)
+
+
+def start_stager() -> Optional[ProfileStager]:
+    """A started ProfileStager, or None where staging is not supported"""
+    if not STAGING_SUPPORTED:
+        logger.warning(f"Profile staging disabled: it needs Linux (tmpfs and flock), not {sys.platform}")
+        return None
+    return ProfileStager().start()
@@ -0,0 +1,330 @@
+"""Proxy Pool Module - Health checks, latency scoring and sticky per-account assignment"""
+import base64
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import (
+    PROXY_POOL_FILE, PROXY_PROBE_TARGET, PROXY_PROBE_TIMEOUT, PROXY_PROBE_CONCURRENCY,
+    PROXY_MAX_LATENCY_MS, PROXY_MAX_ERROR_RATE,
+)
+from .cancellation import CancellationToken, OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3
+SCHEMES = ('http', 'https', 'socks4', 'socks5')
+
+
+def normalize_proxy(text: str) -> Optional[str]:
+    """Normalize host:port, host:port:user:pass, user:pass@host:port or scheme://... to a URL"""
+    text = text.strip()
+    if not text or text.startswith('#'):
+        return None
+    if '://' not in text:
+        parts = text.split(':')
+        if len(parts) == 4 and '@' not in text:
+            host, port, user, password = parts
+            text = f"{user}:{password}@{host}:{port}"
+        text = f"http://{text}"
+    try:
+        parts = urlsplit(text)
+        if parts.scheme not in SCHEMES or not parts.hostname or not parts.port:
+            return None
+    except ValueError:
+        return None
+    return text
+
+
+def chrome_proxy_argument(proxy: str) -> str:
+    """Chrome's --proxy-server does not accept credentials, strip them"""
+    if '://' not in proxy:
+        return proxy    # Already Chrome proxy rules, e.g. "http=127.0.0.1:8080"
+    parts = urlsplit(proxy)
+    if parts.username:
+        logger.warning(f"Chrome ignores proxy credentials, allowlist this host instead: {parts.hostname}")
+    return f"{parts.scheme}://{parts.hostname}:{parts.port}"
+
+
+@dataclass
+class ProxyInfo:
+    """A proxy with its rolling health score"""
+    url: str
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    probes: int = 0
+    failures: int = 0
+    last_probe: float = 0.0
+    last_error: str = ""
+
+    @property
+    def healthy(self) -> bool:
+        if self.probes == 0:
+            return True
+        return (self.error_rate <= PROXY_MAX_ERROR_RATE and self.latency_ms is not None
+                and self.latency_ms <= PROXY_MAX_LATENCY_MS)
+
+    @property
+    def needs_auth(self) -> bool:
+        """Chrome cannot send the credentials, so the pool only uses these when pinned"""
+        return bool(urlsplit(self.url).username)
+
+    @property
+    def score(self) -> float:
+        """Lower is better; unprobed proxies rank behind probed healthy ones"""
+        latency = self.latency_ms if self.latency_ms is not None else PROXY_MAX_LATENCY_MS
+        return latency * (1.0 + 4.0 * self.error_rate)
+
+    def record(self, ok: bool, latency_ms: Optional[float] = None, error: str = "") -> None:
+        self.probes += 1
+        self.last_probe = time.time()
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate + EWMA_ALPHA * (0.0 if ok else 1.0)
+        if ok and latency_ms is not None:
+            self.latency_ms = latency_ms if self.latency_ms is None else \
+                (1 - EWMA_ALPHA) * self.latency_ms + EWMA_ALPHA * latency_ms
+            self.last_error = ""
+        else:
+            self.failures += 1
+            self.last_error = error
+
+
+@dataclass
+class ProxyPool:
+    """Pool of proxies with sticky uid -> proxy assignments persisted to disk"""
+    proxies: Dict[str, ProxyInfo] = field(default_factory=dict)
+    assignments: Dict[str, str] = field(default_factory=dict)
+    path: Optional[str] = None
+
+    def __post_init__(self):
+        self._lock = threading.RLock()
+
+    # ----- Persistence -----
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "ProxyPool":
+        if path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(base_dir, PROXY_POOL_FILE)
+        pool = cls(path=path)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            pool.proxies = {p['url']: ProxyInfo(**p) for p in data.get('proxies', [])}
+            pool.assignments = {u: p for u, p in data.get('assignments', {}).items() if p in pool.proxies}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Failed to load proxy pool {path}: {e}")
+        return pool
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                'proxies': [asdict(p) for p in self.proxies.values()],
+                'assignments': dict(self.assignments),
+            }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    # ----- Pool contents -----
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def import_text(self, text: str) -> int:
+        """Add proxies from one-per-line text, return number of new entries"""
+        added = 0
+        with self._lock:
+            for line in text.splitlines():
+                url = normalize_proxy(line)
+                if url and url not in self.proxies:
+                    self.proxies[url] = ProxyInfo(url)
+                    added += 1
+        self.save()
+        return added
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            self.proxies.pop(url, None)
+            self.assignments = {u: p for u, p in self.assignments.items() if p != url}
+        self.save()
+
+    def snapshot(self) -> List[Tuple[ProxyInfo, int]]:
+        """Proxies best-first with their assignment counts"""
+        with self._lock:
+            loads = self._loads()
+            return [(p, loads.get(p.url, 0)) for p in sorted(self.proxies.values(), key=lambda p: p.score)]
+
+    # ----- Assignment -----
+
+    def _loads(self) -> Dict[str, int]:
+        loads: Dict[str, int] = {}
+        for url in self.assignments.values():
+            loads[url] = loads.get(url, 0) + 1
+        return loads
+
+    def pin(self, uid: str, proxy: str) -> None:
+        """Assign a specific proxy to uid (e.g. from the account line)"""
+        self.pin_many([(uid, proxy)])
+
+    def pin_many(self, pairs: List[Tuple[str, str]]) -> None:
+        """Pin several (uid, proxy) pairs with a single save"""
+        changed = False
+        with self._lock:
+            for uid, proxy in pairs:
+                url = normalize_proxy(proxy)
+                if not url:
+                    continue
+                self.proxies.setdefault(url, ProxyInfo(url))
+                self.assignments[uid] = url
+                changed = True
+        if changed:
+            self.save()
+
+    def assign(self, uid: str) -> Optional[str]:
+        """Sticky assignment: keep a healthy proxy, otherwise pick the fastest least-loaded one"""
+        with self._lock:
+            current = self.assignments.get(uid)
+            if current and current in self.proxies and self.proxies[current].healthy:
+                return current
+            url = self._pick(exclude=current)
+            if url is None:
+                return current if current in self.proxies else None
+            self.assignments[uid] = url
+        self.save()
+        if current and current != url:
+            logger.info(f"[{uid}] Proxy rotated {current} -> {url}")
+        return url
+
+    def _pick(self, exclude: Optional[str] = None) -> Optional[str]:
+        healthy = [p for p in self.proxies.values() if p.healthy and not p.needs_auth and p.url != exclude]
+        if not healthy:
+            return None
+        loads = self._loads()
+        return min(healthy, key=lambda p: p.score * (1 + loads.get(p.url, 0))).url
+
+    def rebalance(self) -> List[str]:
+        """Move accounts off degraded proxies, return the rotated uids"""
+        rotated = []
+        with self._lock:
+            for uid, url in list(self.assignments.items()):
+                info = self.proxies.get(url)
+                if info is None or not info.healthy:
+                    new_url = self._pick(exclude=url)
+                    if new_url:
+                        self.assignments[uid] = new_url
+                        rotated.append(uid)
+        if rotated:
+            self.save()
+        return rotated
+
+    def report_failure(self, proxy: str, error: str) -> None:
+        """Feed launch/navigation failures into the proxy's error rate"""
+        with self._lock:
+            info = self.proxies.get(proxy)
+            if info:
+                info.record(False, error=error)
+
+    # ----- Probing -----
+
+    def probe_all(self, concurrency: int = PROXY_PROBE_CONCURRENCY,
+                  cancel_token: Optional[CancellationToken] = None) -> None:
+        """Probe every proxy concurrently (blocking, run off the GUI thread).
+
+        Cancelling ``cancel_token`` aborts the open probes at once and raises
+        OperationCancelled; nothing from the round is recorded.
+        """
+        with self._lock:
+            urls = list(self.proxies)
+        if not urls:
+            return
+        import asyncio  # deferred: only needed once a probe round runs
+        try:
+            results = asyncio.run(_probe_many(urls, concurrency, cancel_token))
+        except asyncio.CancelledError:
+            raise OperationCancelled()
+        with self._lock:
+            for url, (ok, latency_ms, error) in results.items():
+                if url in self.proxies:
+                    self.proxies[url].record(ok, latency_ms, error)
+        self.save()
+
+
+async def _probe_many(urls: List[str], concurrency: int, cancel_token: Optional[CancellationToken] = None
+                      ) -> Dict[str, Tuple[bool, Optional[float], str]]:
+    import asyncio
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(url: str):
+        async with semaphore:
+            return url, await probe_proxy(url)
+
+    probes = asyncio.gather(*(guarded(u) for u in urls))
+    if cancel_token is not None:
+        loop = asyncio.get_running_loop()
+
+        def cancel() -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(probes.cancel)
+        cancel_token.on_cancel(cancel)
+    return dict(await probes)
+
+
+async def probe_proxy(url: str, target: str = PROXY_PROBE_TARGET,
+                      timeout: float = PROXY_PROBE_TIMEOUT) -> Tuple[bool, Optional[float], str]:
+    """Open a tunnel to target through the proxy, return (ok, latency_ms, error)"""
+    import asyncio
+    parts = urlsplit(url)
+    started = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, parts.port), timeout)
+        if parts.scheme == 'socks4':
+            # CONNECT to the resolved target, as Chrome does (it resolves names itself for SOCKS4)
+            host, port = target.rsplit(':', 1)
+            infos = await asyncio.wait_for(asyncio.get_running_loop().getaddrinfo(
+                host, int(port), family=socket.AF_INET, type=socket.SOCK_STREAM), timeout)
+            address = socket.inet_aton(infos[0][4][0])
+            writer.write(struct.pack('>BBH', 4, 1, int(port)) + address + b'\x00')
+            await writer.drain()
+            reply = await asyncio.wait_for(reader.readexactly(8), timeout)
+            ok = reply[1] == 90
+            error = "" if ok else f"SOCKS4 connect rejected: {reply[1]}"
+        elif parts.scheme == 'socks5':
+            # Greeting only: version 5, offering "no auth" and "username/password"
+            writer.write(b'\x05\x02\x00\x02')
+            await writer.drain()
+            reply = await asyncio.wait_for(reader.readexactly(2), timeout)
+            ok = reply[0] == 5 and reply[1] in (0, 2)
+            error = "" if ok else f"SOCKS greeting rejected: {reply!r}"
+        else:
+            request = f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n"
+            if parts.username:
+                creds = base64.b64encode(f"{parts.username}:{parts.password or ''}".encode()).decode()
+                request += f"Proxy-Authorization: Basic {creds}\r\n"
+            writer.write((request + "\r\n").encode())
+            await writer.drain()
+            status = await asyncio.wait_for(reader.readline(), timeout)
+            ok = b' 200' in status
+            error = "" if ok else status.decode('latin-1', 'replace').strip() or "Empty reply"
+        latency_ms = (time.perf_counter() - started) * 1000
+        return ok, latency_ms if ok else None, error
+    except asyncio.TimeoutError:
+        return False, None, "Timeout"
+    except (OSError, asyncio.IncompleteReadError) as e:
+        return False, None, str(e) or type(e).__name__
+    finally:
+        if writer:
+            writer.close()
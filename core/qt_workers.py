@@ -0,0 +1,206 @@
+"""Qt Workers Module - QThread adapters for account loading, proxy probing, broadcasts and thumbnails"""
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import QThread, QBuffer, QByteArray, QIODevice, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from config import LOAD_BATCH_SIZE, LOAD_BATCH_INTERVAL_MS, THUMBNAIL_SIZE
+from .account_loader import Account, AccountLoader
+from .broadcast import BroadcastAction, Broadcaster
+from .cancellation import CancellationToken, OperationCancelled
+from .proxy_pool import ProxyPool
+
+logger = logging.getLogger(__name__)
+
+# Threads still running when their owner cleaned up (see keep_until_finished)
+_outliving: Set[QThread] = set()
+
+
+def keep_until_finished(thread: QThread) -> None:
+    """Keep a running thread alive past its owner; Qt aborts when a running QThread is destroyed"""
+    thread.setParent(None)
+    _outliving.add(thread)
+    thread.finished.connect(thread.deleteLater)
+
+
+class AccountLoadWorker(QThread):
+    """Parses accounts and prepares profiles off the GUI thread, streaming batches"""
+    
+    batch_signal = pyqtSignal(list)             # List[Account]
+    progress_signal = pyqtSignal(int, int)      # lines processed, total lines
+    finished_signal = pyqtSignal(int, bool)     # accounts loaded, cancelled
+    
+    def __init__(self, loader: AccountLoader, text_data: str,
+                 batch_size: int = LOAD_BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.text_data = text_data
+        self.batch_size = batch_size
+        self.cancel_token = CancellationToken()
+    
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
+    
+    def run(self) -> None:
+        lines = self.text_data.strip().split("\n")
+        total, loaded = len(lines), 0
+        batch: List[Account] = []
+        interval = LOAD_BATCH_INTERVAL_MS / 1000
+        last_flush = time.monotonic()
+        try:
+            for i, line in enumerate(lines, 1):
+                if self.cancel_token.is_cancelled:
+                    break
+                account = self.loader.build_account(line)
+                if account:
+                    batch.append(account)
+                # Flush on size or time so the first rows show up quickly
+                now = time.monotonic()
+                if len(batch) >= self.batch_size or (batch and now - last_flush >= interval):
+                    loaded += len(batch)
+                    self.batch_signal.emit(batch)
+                    self.progress_signal.emit(i, total)
+                    batch, last_flush = [], now
+            if batch and not self.cancel_token.is_cancelled:
+                loaded += len(batch)
+                self.batch_signal.emit(batch)
+            self.progress_signal.emit(total if not self.cancel_token.is_cancelled else i, total)
+        except Exception:
+            logger.exception("Account loading failed")
+        finally:
+            self.finished_signal.emit(loaded, self.cancel_token.is_cancelled)
+
+
+class ProxyProbeWorker(QThread):
+    """Runs a probe round in the background, then rotates degraded assignments"""
+
+    finished_signal = pyqtSignal(list)
+
+    def __init__(self, pool: ProxyPool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.cancel_token = CancellationToken()
+
+    def cancel(self) -> None:
+        """Abort the round's open probes; nothing is recorded or rotated"""
+        self.cancel_token.cancel()
+
+    def run(self) -> None:
+        rotated: List[str] = []
+        try:
+            self.pool.probe_all(cancel_token=self.cancel_token)
+            rotated = self.pool.rebalance()
+        except OperationCancelled:
+            logger.info("Proxy probe round cancelled")
+        except Exception:
+            logger.exception("Proxy probe round failed")
+        finally:
+            self.finished_signal.emit(rotated)
+
+
+class BroadcastWorker(QThread):
+    """Fans a BroadcastAction out over drivers, streaming each browser's result"""
+
+    result_signal = pyqtSignal(object)          # BroadcastResult
+    finished_signal = pyqtSignal(object)        # BroadcastSummary
+
+    def __init__(self, drivers: Dict[str, Any], action: BroadcastAction, broadcaster: Broadcaster, parent=None):
+        super().__init__(parent)
+        self.drivers = dict(drivers)
+        self.action = action
+        self.broadcaster = broadcaster
+        self.cancel_token = CancellationToken()
+
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
+
+    def run(self) -> None:
+        summary = None
+        try:
+            summary = self.broadcaster.run(self.drivers, self.action, self.result_signal.emit, self.cancel_token)
+        except Exception:
+            logger.exception("Broadcast failed")
+        finally:
+            self.finished_signal.emit(summary)
+
+
+class ScreencastDecoder(QThread):
+    """Decodes screencast JPEGs off the GUI thread into two reused images per browser.
+
+    ``submit`` may be called from any thread and keeps only the newest
+    undecoded frame per browser. Frames are decoded alternately into a
+    browser's two images; once the view has moved on to the newer one, the
+    older one's pixel buffer is decoded into again instead of reallocated.
+    """
+
+    frame_ready = pyqtSignal(str, QImage)
+
+    def __init__(self, size: Tuple[int, int] = THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self.size = QSize(*size)
+        self.decoded = 0
+        self.dropped = 0                        # Frames replaced by a newer one before being decoded
+        self._pending: Dict[str, Optional[str]] = {}    # uid -> base64 JPEG, None = free its images
+        self._images: Dict[str, List[QImage]] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def submit(self, uid: str, data: str) -> None:
+        with self._cond:
+            if self._pending.get(uid) is not None:
+                self.dropped += 1
+            self._pending[uid] = data
+            self._cond.notify()
+
+    def forget(self, uid: str) -> None:
+        """Drop a browser's pending frame and images"""
+        with self._cond:
+            self._pending[uid] = None
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.wait(2000)
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                batch, self._pending = self._pending, {}
+            for uid, data in batch.items():
+                if data is None:
+                    self._images.pop(uid, None)
+                    continue
+                try:
+                    image = self._decode(uid, data)
+                except Exception:
+                    logger.exception(f"[{uid}] Screencast frame decode failed")
+                    continue
+                if image is not None:
+                    self.frame_ready.emit(uid, image)
+
+    def _decode(self, uid: str, data: str) -> Optional[QImage]:
+        images = self._images.setdefault(uid, [QImage(), QImage()])
+        images.reverse()
+        image = images[0]
+        device = QBuffer()
+        device.setData(QByteArray.fromBase64(data.encode("ascii")))
+        device.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(device, b"jpeg")
+        size = reader.size()
+        if size.width() > self.size.width() or size.height() > self.size.height():
+            # libjpeg scales while decoding, far cheaper than scaling the full image afterwards
+            reader.setScaledSize(size.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio))
+        if not reader.read(image):
+            logger.debug(f"[{uid}] Bad screencast frame: {reader.errorString()}")
+            return None
+        self.decoded += 1
+        return image
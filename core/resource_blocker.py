@@ -0,0 +1,114 @@
+"""Resource Blocker Module - CDP request blocking while automation drives a page"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from config import BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS
+
+logger = logging.getLogger(__name__)
+
+# Typical transfer size per CDP resource type, used to estimate bytes saved
+# (a blocked request never reports its real size)
+ESTIMATED_SIZES = {
+    'Image': 40 * 1024,
+    'Media': 512 * 1024,
+    'Font': 60 * 1024,
+    'Script': 80 * 1024,
+    'Stylesheet': 30 * 1024,
+    'Other': 8 * 1024,
+}
+
+
+@dataclass
+class BlockingPolicy:
+    """What to block: CDP resource types and URL wildcard patterns"""
+    resource_types: List[str] = field(default_factory=lambda: list(BLOCKED_RESOURCE_TYPES))
+    url_patterns: List[str] = field(default_factory=lambda: list(BLOCKED_URL_PATTERNS))
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.resource_types or self.url_patterns)
+
+
+@dataclass
+class BlockingStats:
+    """Counters collected while blocking was active"""
+    blocked_requests: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    estimated_bytes_saved: int = 0
+    bytes_received: int = 0
+
+    def summary(self) -> str:
+        return (f"blocked {self.blocked_requests} requests, "
+                f"~{self.estimated_bytes_saved // 1024} KB saved, "
+                f"{self.bytes_received // 1024} KB received")
+
+
+class ResourceBlocker:
+    """Applies a BlockingPolicy to a ChromiumPage via Network.setBlockedURLs and Fetch"""
+
+    def __init__(self, driver, policy: Optional[BlockingPolicy] = None):
+        self.driver = driver
+        self.policy = policy or BlockingPolicy()
+        self.stats = BlockingStats()
+        self.active = False
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        if self.active or self.policy.is_empty:
+            return
+        cdp = self.driver.driver
+        cdp.set_callback('Network.loadingFailed', self._on_loading_failed)
+        cdp.set_callback('Network.loadingFinished', self._on_loading_finished)
+        self.driver.run_cdp('Network.enable')
+        if self.policy.url_patterns:
+            self.driver.run_cdp('Network.setBlockedURLs', urls=self.policy.url_patterns)
+        if self.policy.resource_types:
+            cdp.set_callback('Fetch.requestPaused', self._on_request_paused)
+            self.driver.run_cdp('Fetch.enable', patterns=[
+                {'urlPattern': '*', 'resourceType': t, 'requestStage': 'Request'}
+                for t in self.policy.resource_types
+            ])
+        self.active = True
+
+    def disable(self) -> BlockingStats:
+        """Stop blocking and return the collected stats"""
+        if not self.active:
+            return self.stats
+        self.active = False
+        try:
+            if self.policy.resource_types:
+                self.driver.run_cdp('Fetch.disable')
+            if self.policy.url_patterns:
+                self.driver.run_cdp('Network.setBlockedURLs', urls=[])
+        except Exception as e:
+            logger.warning(f"Failed to disable resource blocking: {e}")
+        finally:
+            try:
+                cdp = self.driver.driver
+                for event in ('Fetch.requestPaused', 'Network.loadingFailed', 'Network.loadingFinished'):
+                    cdp.set_callback(event, None)
+            except Exception:
+                pass
+        return self.stats
+
+    def _on_request_paused(self, **params) -> None:
+        try:
+            self.driver.run_cdp('Fetch.failRequest', requestId=params['requestId'],
+                                errorReason='BlockedByClient')
+        except Exception as e:
+            logger.debug(f"Fetch.failRequest failed: {e}")
+
+    def _on_loading_failed(self, **params) -> None:
+        if 'BLOCKED_BY_CLIENT' not in params.get('errorText', '') and not params.get('blockedReason'):
+            return
+        rtype = params.get('type', 'Other')
+        with self._lock:
+            self.stats.blocked_requests += 1
+            self.stats.blocked_by_type[rtype] = self.stats.blocked_by_type.get(rtype, 0) + 1
+            self.stats.estimated_bytes_saved += ESTIMATED_SIZES.get(rtype, ESTIMATED_SIZES['Other'])
+
+    def _on_loading_finished(self, **params) -> None:
+        with self._lock:
+            self.stats.bytes_received += int(params.get('encodedDataLength', 0))
@@ -0,0 +1,148 @@
+"""Screencast Module - Low-rate JPEG thumbnails streamed from running browsers over CDP
+
+``Page.startScreencast`` makes Chrome push a frame, already scaled down to
+THUMBNAIL_SIZE, each time the page repaints, and send no more until that
+frame is acked. Acks are held back until 1/THUMBNAIL_FPS seconds after
+their frame arrived, which caps every browser at that rate; a page that
+does not repaint costs nothing. Frames are handed to ``on_frame`` as base64
+JPEG on the browser's DrissionPage event thread; decoding is up to the
+caller. Only the browsers in view need to stream: ``watch()`` starts the
+new ones and stops the rest.
+
+One thread makes every CDP call and none of them waits for its reply, so a
+hung browser cannot hold up the others' frames and callers (the GUI thread)
+never wait on a browser. A browser whose screencast did not start simply
+sends no frames.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from config import THUMBNAIL_FPS, THUMBNAIL_SIZE, THUMBNAIL_QUALITY
+
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+
+logger = logging.getLogger(__name__)
+
+FRAME_EVENT = "Page.screencastFrame"
+
+
+class ScreencastHub:
+    """Keeps a screencast running on each watched browser and paces its frames"""
+
+    def __init__(self, on_frame: Callable[[str, str], None], fps: float = THUMBNAIL_FPS,
+                 size: Tuple[int, int] = THUMBNAIL_SIZE, quality: int = THUMBNAIL_QUALITY):
+        self.on_frame = on_frame
+        self.interval = 1.0 / max(fps, 0.1)
+        self.size = size
+        self.quality = quality
+        self.streams: Dict[str, "ChromiumPage"] = {}
+        self.frames = 0
+        self._wanted: Optional[Dict[str, "ChromiumPage"]] = None     # Set by watch(), applied by the thread
+        self._acks: List[Tuple[float, int, str, int]] = []           # Heap of (due, seq, uid, frame session)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ----- Lifecycle -----
+
+    def watch(self, drivers: Dict[str, "ChromiumPage"]) -> None:
+        """Stream exactly these browsers from now on (returns at once)"""
+        with self._cond:
+            if self._stopped:
+                return
+            self._wanted = dict(drivers)
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="screencast", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Drop frames from now on; the thread stops every screencast in the background, then exits"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and self._wanted is None \
+                        and not (self._acks and self._acks[0][0] <= time.monotonic()):
+                    self._cond.wait(self._acks[0][0] - time.monotonic() if self._acks else None)
+                if self._stopped:
+                    break
+                wanted, self._wanted = self._wanted, None
+                due = []
+                while self._acks and self._acks[0][0] <= time.monotonic():
+                    due.append(heapq.heappop(self._acks))
+            if wanted is not None:
+                self._reconcile(wanted)
+            for _due, _seq, uid, session_id in due:
+                self._ack(uid, session_id)
+        for uid in list(self.streams):
+            self._stop_stream(uid)
+
+    # ----- Streams (screencast thread) -----
+
+    def _reconcile(self, wanted: Dict[str, "ChromiumPage"]) -> None:
+        for uid, driver in list(self.streams.items()):
+            if wanted.get(uid) is not driver:
+                self._stop_stream(uid)
+        for uid, driver in wanted.items():
+            if uid not in self.streams:
+                self._start_stream(uid, driver)
+
+    def _start_stream(self, uid: str, driver: "ChromiumPage") -> None:
+        self.streams[uid] = driver
+        try:
+            driver.driver.set_callback(FRAME_EVENT, self._frame_handler(uid, driver))
+            width, height = self.size
+            driver.run_cdp('Page.startScreencast', format='jpeg', quality=self.quality,
+                           maxWidth=width, maxHeight=height, _timeout=0)
+        except Exception as e:
+            logger.warning(f"[{uid}] Screencast not started: {e}")
+            self._stop_stream(uid)
+
+    def _stop_stream(self, uid: str) -> None:
+        driver = self.streams.pop(uid, None)
+        if driver is None:
+            return
+        try:
+            driver.driver.set_callback(FRAME_EVENT, None)
+            driver.run_cdp('Page.stopScreencast', _timeout=0)
+        except Exception as e:
+            # Usually the browser is already gone
+            logger.debug(f"[{uid}] Screencast not stopped: {e}")
+
+    def _ack(self, uid: str, session_id: int) -> None:
+        driver = self.streams.get(uid)
+        if driver is None:
+            return
+        try:
+            # Sent raw because run_cdp() would take sessionId for the CDP target session
+            driver.driver._send({'method': 'Page.screencastFrameAck', 'params': {'sessionId': session_id}},
+                                timeout=0)
+        except Exception as e:
+            logger.debug(f"[{uid}] Screencast frame not acked: {e}")
+
+    # ----- Frames (browser event threads) -----
+
+    def _frame_handler(self, uid: str, driver: "ChromiumPage") -> Callable[..., None]:
+        def on_frame(data: str, sessionId: int, **_metadata) -> None:
+            if self._stopped or self.streams.get(uid) is not driver:
+                return
+            self.frames += 1
+            try:
+                self.on_frame(uid, data)
+            except Exception:
+                logger.exception(f"[{uid}] Screencast frame handler failed")
+            with self._cond:
+                heapq.heappush(self._acks, (time.monotonic() + self.interval, next(self._seq), uid, sessionId))
+                self._cond.notify()
+        return on_frame
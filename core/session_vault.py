@@ -0,0 +1,179 @@
+"""Session Vault Module - Per-account cookie/localStorage snapshots restored over CDP
+
+After a successful login the flow saves the account's session to
+``<SESSION_VAULT_DIR>/<uid>.json.gz`` (mode 0600). A session is the
+account's cookies for SESSION_DOMAINS, read with ``Storage.getCookies``,
+plus the localStorage of the logged-in page.
+
+``restore()`` puts a session into a browser with one ``Storage.setCookies``
+call, plus a document-start script that refills localStorage. No login page
+is loaded and no 2FA code is needed. The target is either the account's own
+(fresh) profile or a new browser context inside any running Chrome, so
+several accounts can share one browser process.
+
+A snapshot is a credential: whoever holds the file is logged in as the account.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from config import SESSION_VAULT_DIR, SESSION_DOMAINS
+
+if TYPE_CHECKING:
+    from DrissionPage import ChromiumPage
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+# Everything Storage.setCookies needs; the rest of a CDP cookie is derived or per-run
+COOKIE_FIELDS = ("name", "value", "domain", "path", "expires", "httpOnly", "secure", "sameSite")
+# Where Chrome keeps cookies (moved under Network/ in Chrome 96)
+COOKIE_STORES = (("Default", "Network", "Cookies"), ("Default", "Cookies"))
+
+LOCAL_STORAGE_SCRIPT = """(() => {
+  const items = %s[location.origin];
+  if (!items) return;
+  try {
+    for (const [key, value] of Object.entries(items)) {
+      if (localStorage.getItem(key) === null) localStorage.setItem(key, value);
+    }
+  } catch (e) {}
+})();"""
+
+
+@dataclass
+class Session:
+    uid: str
+    captured_at: float
+    cookies: List[Dict[str, Any]]
+    local_storage: Dict[str, Dict[str, str]] = field(default_factory=dict)   # origin -> items
+
+
+@dataclass
+class RestoredSession:
+    uid: str
+    cookies: int
+    elapsed_ms: float
+    context_id: Optional[str] = None      # Set when restored into a new browser context
+    page: Any = None                      # Tab of that context (the driver itself otherwise)
+
+
+def has_cookie_store(profile_path: str) -> bool:
+    """False for a profile Chrome has never run in (or whose data is gone)"""
+    return any(os.path.exists(os.path.join(profile_path, *parts)) for parts in COOKIE_STORES)
+
+
+def _compact_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    kept = {k: cookie[k] for k in COOKIE_FIELDS if k in cookie}
+    if cookie.get("session") or kept.get("expires", -1) < 0:
+        kept.pop("expires", None)
+    return kept
+
+
+class SessionVault:
+    """Saves sessions after login and injects them into browsers"""
+
+    def __init__(self, directory: str = SESSION_VAULT_DIR, domains: Optional[List[str]] = None):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.directory = os.path.join(base_dir, directory)
+        self.domains = list(SESSION_DOMAINS if domains is None else domains)
+
+    def path(self, uid: str) -> str:
+        return os.path.join(self.directory, f"{uid}.json.gz")
+
+    def has(self, uid: str) -> bool:
+        return os.path.exists(self.path(uid))
+
+    def _relevant(self, domain: str) -> bool:
+        domain = domain.lstrip(".")
+        return any(domain == d or domain.endswith("." + d) for d in self.domains)
+
+    # ----- Storage -----
+
+    def load(self, uid: str) -> Optional[Session]:
+        try:
+            with gzip.open(self.path(uid), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"[{uid}] Unreadable saved session: {e}")
+            return None
+        if data.get("v") != FORMAT_VERSION:
+            return None
+        return Session(uid, data.get("at", 0.0), data.get("cookies", []), data.get("storage", {}))
+
+    def save(self, session: Session) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = self.path(session.uid)
+        tmp = path + ".tmp"
+        payload = {"v": FORMAT_VERSION, "uid": session.uid, "at": session.captured_at,
+                   "cookies": session.cookies, "storage": session.local_storage}
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+
+    def delete(self, uid: str) -> None:
+        try:
+            os.remove(self.path(uid))
+        except FileNotFoundError:
+            pass
+
+    # ----- Browser side -----
+
+    def capture(self, driver: "ChromiumPage", uid: str) -> Session:
+        """Snapshot the logged-in browser's session and save it"""
+        try:
+            cookies = driver.run_cdp("Storage.getCookies").get("cookies", [])
+        except Exception:
+            cookies = driver.run_cdp("Network.getAllCookies").get("cookies", [])   # Older Chrome
+        session = Session(uid, round(time.time(), 3),
+                          [_compact_cookie(c) for c in cookies if self._relevant(c.get("domain", ""))])
+        try:
+            origin = driver.run_js("return location.origin;")
+            items = json.loads(driver.run_js("return JSON.stringify(Object.assign({}, localStorage));") or "{}")
+            if items and self._relevant(origin.split("://", 1)[-1]):
+                session.local_storage[origin] = items
+        except Exception as e:
+            logger.debug(f"[{uid}] localStorage not captured: {e}")
+        self.save(session)
+        logger.info(f"[{uid}] Session saved: {len(session.cookies)} cookies, "
+                    f"{sum(len(v) for v in session.local_storage.values())} localStorage items")
+        return session
+
+    def restore(self, driver: "ChromiumPage", uid: str, new_context: bool = False) -> Optional[RestoredSession]:
+        """Inject the saved session; None when there is none.
+
+        With ``new_context`` the session goes into a fresh browser context
+        (own cookie jar and storage) of ``driver``'s Chrome, opened on a blank
+        tab returned as ``page``. Dispose of it with ``Target.disposeBrowserContext``.
+        """
+        session = self.load(uid)
+        if session is None:
+            return None
+        started = time.perf_counter()
+        context_id = None
+        page = driver
+        if new_context:
+            context_id = driver.run_cdp("Target.createBrowserContext", disposeOnDetach=False)["browserContextId"]
+            driver.run_cdp("Storage.setCookies", cookies=session.cookies, browserContextId=context_id)
+            target_id = driver.run_cdp("Target.createTarget", url="about:blank",
+                                       browserContextId=context_id)["targetId"]
+            page = driver.get_tab(target_id)
+        else:
+            driver.run_cdp("Storage.setCookies", cookies=session.cookies)
+        if session.local_storage:
+            page.run_cdp("Page.addScriptToEvaluateOnNewDocument",
+                         source=LOCAL_STORAGE_SCRIPT % json.dumps(session.local_storage, ensure_ascii=False))
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"[{uid}] Session restored: {len(session.cookies)} cookies in {elapsed_ms} ms"
+                    + (f" (context {context_id})" if context_id else ""))
+        return RestoredSession(uid, len(session.cookies), elapsed_ms, context_id, page)
@@ -0,0 +1,111 @@
+"""Tracing Module - Launch/login phase spans exported as Chrome Trace Event JSON
+
+Wrap a phase in ``with span("chrome.spawn", uid):``. While tracing is off
+(the default) ``span`` returns one shared no-op context manager, so the only
+cost is a function call and a flag check. While it is on, each span stores a
+tuple. The tuples become trace events only on ``export``. Open the file in
+https://ui.perfetto.dev or chrome://tracing. Spans show per thread, tagged
+with the account uid, and farm workers appear as their own processes.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NOOP = nullcontext()
+
+# (name, uid, tid, start_ns, end_ns, args)
+Record = Tuple[str, Optional[str], int, int, int, Optional[Dict[str, Any]]]
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "uid", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, uid: Optional[str], args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.uid = uid
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args = dict(self.args or (), error=exc_type.__name__)
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.uid, self.args)
+
+
+class Tracer:
+    """Collects spans from any thread; list.append keeps recording lock-free"""
+
+    def __init__(self):
+        self.enabled = False
+        self.records: List[Record] = []
+        self.thread_names: Dict[int, str] = {}
+        self.imported: List[Dict[str, Any]] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.records = []
+        self.imported = []
+
+    def span(self, name: str, uid: Optional[str] = None, **args):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, uid, args or None)
+
+    def record(self, name: str, start_ns: int, end_ns: int, uid: Optional[str] = None,
+               args: Optional[Dict[str, Any]] = None) -> None:
+        """Add a span measured elsewhere (e.g. time a job waited for a pool slot)"""
+        if not self.enabled:
+            return
+        tid = threading.get_native_id()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.records.append((name, uid, tid, start_ns, end_ns, args))
+
+    def extend(self, events: List[Dict[str, Any]]) -> None:
+        """Merge trace events exported by another process (farm workers)"""
+        self.imported.extend(events)
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": 0,
+             "args": {"name": multiprocessing.current_process().name}},
+        ]
+        for tid, name in list(self.thread_names.items()):
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}})
+        for name, uid, tid, start, end, args in list(self.records):
+            event = {"ph": "X", "name": name, "cat": name.split(".", 1)[0], "pid": pid, "tid": tid,
+                     "ts": start / 1000, "dur": (end - start) / 1000}
+            if uid is not None or args:
+                event["args"] = dict(args or (), uid=uid) if uid is not None else dict(args)
+            events.append(event)
+        return events + self.imported
+
+    def export(self, path: str) -> int:
+        """Write the Chrome Trace Event JSON file; returns the number of spans"""
+        events = self.trace_events()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        spans = sum(1 for e in events if e["ph"] == "X")
+        logger.info(f"Trace with {spans} spans written to {path}")
+        return spans
+
+
+tracer = Tracer()
+span = tracer.span
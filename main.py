@@ -1,59 +1,181 @@
 #!/usr/bin/env python3
-"""Facebook Account Manager - Entry point"""
+"""Facebook Account Manager - Entry point
+
+Options:
+    --profile-startup       Print import-time and startup phase breakdown
+    --startup-report PATH   Also write that breakdown as JSON
+    --quit-after-startup    Exit once the window has painted (benchmarks)
+    --control-api [PORT]    Serve the localhost control API (default port 8790)
+    --farm [N]              Run browsers in N worker processes (default: one per CPU core)
+    --trace PATH            Record launch/login phase spans, write Chrome Trace JSON on exit
+"""
 import sys
 import os
 import logging
+import argparse
+
+from startup_profile import StartupProfiler
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s',
-    handlers=[
-        logging.FileHandler('facebook_login_debug.log'),
-        logging.StreamHandler()
-    ]
-)
+# Must be installed before the heavy imports below to see them
+profiler = StartupProfiler.from_argv(sys.argv)
 
 # Add project root to path
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+# Setup logging: callers only enqueue, a listener thread writes the files
+from core.log_setup import setup_logging
+log_pipeline = setup_logging(logging.INFO)
+
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QFont, QFontDatabase
+from PyQt6.QtCore import QObject, QEvent, QSettings, QTimer
 
 from core.browser_launcher import BrowserManager
 from core.facebook_login import FacebookLoginManager
 from ui.main_window import MainWindow
 
+profiler.mark("imports")
+
+PREFERRED_FONTS = ["Segoe UI", "SF Pro Display", "Roboto", "Helvetica Neue", "Arial"]
+
+
+def parse_args(argv):
+    """Split our own flags from the ones Qt should see"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile-startup", action="store_true")
+    parser.add_argument("--startup-report")
+    parser.add_argument("--quit-after-startup", action="store_true")
+    parser.add_argument("--control-api", nargs="?", type=int, const=0, default=None, metavar="PORT")
+    parser.add_argument("--farm", nargs="?", type=int, const=0, default=None, metavar="N")
+    parser.add_argument("--trace", metavar="PATH")
+    return parser.parse_known_args(argv[1:])
+
+
+def resolve_font_family() -> str:
+    """Preferred UI font, cached in QSettings so the font database is scanned once"""
+    settings = QSettings()
+    cached = settings.value("ui/font_family")
+    if cached:
+        return cached
+    families = set(QFontDatabase.families())
+    font_family = next((pf for pf in PREFERRED_FONTS if pf in families), "Segoe UI")
+    settings.setValue("ui/font_family", font_family)
+    return font_family
+
+
+class FirstPaintWatcher(QObject):
+    """Calls back once, on the window's first paint event"""
+
+    def __init__(self, window, callback):
+        super().__init__(window)
+        self.callback = callback
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.callback)
+        return False
+
+
+def start_control_api(app: QApplication, window, port: int) -> None:
+    """Serve the control API for this window until the app quits"""
+    from config import CONTROL_API_PORT
+    from core.control_api import ControlServer, EventHub
+    from ui.control_bridge import QtControlBackend
+
+    hub = EventHub()
+    server = ControlServer(QtControlBackend(window, hub), hub, port or CONTROL_API_PORT).start()
+    app.aboutToQuit.connect(server.stop)
+    window.status_bar.showMessage(f"🛰️ Control API on {server.address}")
+
+
+def create_farm_managers(workers: int):
+    """Browser/login managers whose drivers live in sharded worker processes"""
+    from core.farm import Farm
+    from core.farm_managers import FarmBrowserManager, FarmLoginManager
+
+    farm = Farm(workers=workers or None, log_queue=log_pipeline.process_queue()).start()
+    return FarmBrowserManager(farm), FarmLoginManager(farm)
+
+
+def show_worker_events(window, browser_manager) -> None:
+    """Surface farm worker crashes/restarts in the status bar"""
+    messages = {
+        "worker_crashed": "💥 Worker {shard} crashed (exit {exitcode}), restarting",
+        "worker_failed": "❌ Worker {shard} keeps crashing, its accounts are unavailable",
+    }
+    browser_manager.worker_event.connect(
+        lambda e: e["event"] in messages and window.status_bar.showMessage(messages[e["event"]].format(**e)))
+
 
 def main() -> None:
+    args, qt_argv = parse_args(sys.argv)
     os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
-    
-    app = QApplication(sys.argv)
+    if args.trace:
+        from core.tracing import tracer
+        tracer.enable()
+
+    app = QApplication(sys.argv[:1] + qt_argv)
     app.setApplicationName("Facebook Account Manager")
     app.setApplicationVersion("1.0.0")
     app.setOrganizationName("FBManager")
-    
-    # Try modern fonts, fallback to system default
-    preferred_fonts = ["Segoe UI", "SF Pro Display", "Roboto", "Helvetica Neue", "Arial"]
-    font_family = "Segoe UI"
-    for pf in preferred_fonts:
-        if pf in QFontDatabase.families():
-            font_family = pf
-            break
-    
-    font = QFont(font_family, 10)
+    profiler.mark("qapplication")
+
+    font = QFont(resolve_font_family(), 10)
     font.setStyleStrategy(QFont.StyleStrategy.PreferAntialias)
     app.setFont(font)
-    
+    profiler.mark("font")
+
     # Dependency injection
-    browser_manager = BrowserManager()
-    login_manager = FacebookLoginManager()
-    
-    window = MainWindow(browser_manager=browser_manager, login_manager=login_manager)
+    concurrency = None
+    if args.farm is not None:
+        # Each worker's engine adapts its own limits
+        browser_manager, login_manager = create_farm_managers(args.farm)
+    else:
+        from config import ADAPTIVE_CONCURRENCY_ENABLED
+        if ADAPTIVE_CONCURRENCY_ENABLED:
+            from core.concurrency import ConcurrencyController
+            concurrency = ConcurrencyController().start()
+        browser_manager = BrowserManager(concurrency=concurrency)
+        login_manager = FacebookLoginManager(concurrency=concurrency)
+    profiler.mark("managers")
+
+    from config import JOURNAL_FILE
+    from core.journal import JobJournal
+    journal = JobJournal(JOURNAL_FILE).open()
+
+    window = MainWindow(browser_manager=browser_manager, login_manager=login_manager,
+                        account_logs=log_pipeline.buffer, journal=journal, concurrency=concurrency)
+    profiler.mark("main_window")
+
+    if args.farm is not None:
+        show_worker_events(window, browser_manager)
+
+    if args.control_api is not None:
+        start_control_api(app, window, args.control_api)
+
+    def on_first_paint() -> None:
+        profiler.mark("first_paint")
+        if profiler.enabled:
+            profiler.uninstall()
+            profiler.print_report()
+            profiler.write_report(args.startup_report)
+        if args.quit_after_startup:
+            window.close()
+
+    FirstPaintWatcher(window, on_first_paint)
     window.show()
-    
-    sys.exit(app.exec())
+
+    exit_code = app.exec()
+    journal.close()
+    if concurrency:
+        concurrency.stop()
+    if args.trace:
+        # After closeEvent, so farm workers have sent their spans home
+        tracer.export(args.trace)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
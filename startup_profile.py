@@ -0,0 +1,131 @@
+"""Startup Profiler - Import timing and startup phase breakdown (--profile-startup)
+
+Installs a meta path finder that wraps every module loader to time its
+execution, and records named phases relative to process start. Stdlib only,
+so it can be imported before anything heavy.
+"""
+import importlib.abc
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegates to the real loader, timing create_module through exec_module.
+
+    Extension modules (PyQt6.*) do their real work in create_module.
+    """
+
+    def __init__(self, loader, profiler: "StartupProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+        self._started = 0.0
+
+    def create_module(self, spec):
+        self._profiler._enter()
+        self._started = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._profiler._leave(self._name, time.perf_counter() - self._started)
+            raise
+
+    def exec_module(self, module) -> None:
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name, time.perf_counter() - self._started)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """Collects cumulative/self import times and phase marks"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        self._child_time: List[float] = []
+        self._resolving = False
+
+    @classmethod
+    def from_argv(cls, argv: List[str]) -> "StartupProfiler":
+        """Enabled (and installed) when --profile-startup or --startup-report is given"""
+        enabled = any(a == "--profile-startup" or a.startswith("--startup-report") for a in argv)
+        profiler = cls(enabled)
+        if enabled:
+            sys.meta_path.insert(0, profiler)
+        return profiler
+
+    # ----- Import timing -----
+
+    def find_spec(self, fullname, path, target=None):
+        if self._resolving:
+            return None
+        self._resolving = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._resolving = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def _enter(self) -> None:
+        self._child_time.append(0.0)
+
+    def _leave(self, name: str, elapsed: float) -> None:
+        children = self._child_time.pop()
+        if self._child_time:
+            self._child_time[-1] += elapsed
+        self.imports[name] = (elapsed, elapsed - children)
+
+    # ----- Phases -----
+
+    def mark(self, phase: str) -> None:
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - self.started))
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def report(self, top: int = 20) -> dict:
+        slowest = sorted(self.imports.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        return {
+            "phases_ms": {name: round(t * 1000, 1) for name, t in self.phases},
+            "modules_imported": len(self.imports),
+            "slowest_imports_ms": [
+                {"module": name, "cumulative": round(cum * 1000, 1), "self": round(own * 1000, 1)}
+                for name, (cum, own) in slowest
+            ],
+        }
+
+    def print_report(self, stream=None, top: int = 20) -> None:
+        stream = stream or sys.stderr
+        data = self.report(top)
+        print("\n⏱️  Startup phases (ms since start)", file=stream)
+        previous = 0.0
+        for name, t in self.phases:
+            print(f"  {name:<20} {t * 1000:8.1f}  (+{(t - previous) * 1000:.1f})", file=stream)
+            previous = t
+        print(f"\n📦 Slowest imports of {data['modules_imported']} (cumulative / self ms)", file=stream)
+        for row in data["slowest_imports_ms"]:
+            print(f"  {row['cumulative']:8.1f} {row['self']:8.1f}  {row['module']}", file=stream)
+
+    def write_report(self, path: Optional[str]) -> None:
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2)
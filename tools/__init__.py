@@ -0,0 +1 @@
+"""Developer tools - local test servers and benchmarks"""
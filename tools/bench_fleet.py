@@ -0,0 +1,340 @@
+"""Fleet Benchmark - End-to-end launch and login throughput against the fake server
+
+Loads N synthetic accounts through AccountLoader, launches them through
+BrowserManager and logs them in against tools.fake_facebook, then writes a
+JSON report that can be compared across commits and settings.
+
+Usage:
+    python -m tools.bench_fleet --accounts 20 --concurrency 5 --headless -o bench.json
+    python -m tools.bench_fleet --accounts 20 --headless --trace bench_trace.json   # + phase timeline
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict, List, Optional, Set
+
+import pyotp
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from core.account_loader import Account, AccountLoader
+from core.browser_launcher import BrowserManager
+from core.facebook_login import FacebookLoginManager
+from core.login_flow import LoginFlow
+from core.resource_blocker import BlockingPolicy
+from core.tracing import tracer
+from tools.fake_facebook import FakeFacebookConfig, FakeFacebookServer
+
+logger = logging.getLogger(__name__)
+
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Summarize a latency sample (seconds)"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return round(ordered[idx], 4)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "min": round(ordered[0], 4),
+        "p50": pct(50), "p90": pct(90), "p99": pct(99),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def synthetic_accounts_text(count: int) -> str:
+    """Build UID|PASSWORD|TOKEN lines for synthetic accounts"""
+    return "\n".join(
+        f"{900000000000000 + i}|bench-pass-{i}|{pyotp.random_base32()}" for i in range(count)
+    )
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+class ProcessSampler:
+    """Samples RSS and CPU time of this process and the benchmark's Chrome processes"""
+
+    def __init__(self, marker: str):
+        self.marker = marker
+        self.peak_rss_bytes = 0
+        self._cpu_ticks: Dict[int, int] = {}
+
+    def _tracked_pids(self) -> Set[int]:
+        pids = {os.getpid()}
+        if not os.path.isdir('/proc'):
+            return pids
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                    if self.marker.encode() in f.read():
+                        pids.add(int(entry))
+            except OSError:
+                continue
+        return pids
+
+    def sample(self) -> None:
+        total_rss = 0
+        for pid in self._tracked_pids():
+            try:
+                with open(f'/proc/{pid}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            # Fields after the command name: utime=11, stime=12, rss=21 (0-based)
+            self._cpu_ticks[pid] = int(fields[11]) + int(fields[12])
+            total_rss += int(fields[21]) * PAGE_SIZE
+        self.peak_rss_bytes = max(self.peak_rss_bytes, total_rss)
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(self._cpu_ticks.values()) / CLK_TCK
+
+
+class FleetBenchmark(QObject):
+    """Drives accounts through launch -> login with bounded concurrency"""
+
+    def __init__(self, accounts: List[Account], concurrency: int,
+                 browser_manager: BrowserManager, login_manager: FacebookLoginManager,
+                 sampler: ProcessSampler, timeout: float, parent=None):
+        super().__init__(parent)
+        self.pending = list(accounts)
+        self.accounts = {acc.uid: acc for acc in accounts}
+        self.concurrency = max(1, concurrency)
+        self.browser_manager = browser_manager
+        self.login_manager = login_manager
+        self.sampler = sampler
+        self.timeout = timeout
+        self.in_flight: Set[str] = set()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.launch_requested: Dict[str, float] = {}
+        self.launch_latency: Dict[str, float] = {}
+        self.launch_errors: Dict[str, str] = {}
+        self.login_started: Dict[str, float] = {}
+        self.login_latency: Dict[str, float] = {}
+        self.login_errors: Dict[str, str] = {}
+        self.step_marks: Dict[str, List[tuple]] = defaultdict(list)
+        self.bytes_saved: List[int] = []
+        self.bytes_received: List[int] = []
+
+        browser_manager.browser_started.connect(self._on_browser_started)
+        browser_manager.browser_error.connect(self._on_browser_error)
+
+        self._sample_timer = QTimer(self)
+        self._sample_timer.timeout.connect(self.sampler.sample)
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.timeout.connect(self._on_deadline)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._sample_timer.start(250)
+        self._deadline_timer.start(int(self.timeout * 1000))
+        self._fill()
+
+    def _fill(self) -> None:
+        while self.pending and len(self.in_flight) < self.concurrency:
+            acc = self.pending.pop(0)
+            self.in_flight.add(acc.uid)
+            self.launch_requested[acc.uid] = time.perf_counter()
+            self.browser_manager.launch_browser(acc.uid, acc.profile_path)
+        if not self.pending and not self.in_flight:
+            self._finish()
+
+    def _on_browser_started(self, uid: str) -> None:
+        if uid not in self.launch_requested:
+            return
+        now = time.perf_counter()
+        self.launch_latency[uid] = now - self.launch_requested[uid]
+        acc = self.accounts[uid]
+        self.login_started[uid] = now
+        self.step_marks[uid].append(("start", now))
+        self.login_manager.start_login(
+            driver=self.browser_manager.get_driver(uid), uid=uid,
+            password=acc.password, token_2fa=acc.token,
+            status_callback=self._on_login_status,
+            success_callback=self._on_login_success,
+            error_callback=self._on_login_error,
+            finished_callback=self._on_login_finished,
+        )
+
+    def _on_browser_error(self, uid: str, error: str) -> None:
+        self.launch_errors[uid] = error
+        self._release(uid)
+
+    def _on_login_status(self, uid: str, status: str) -> None:
+        # Drop variable parts after ':'
+        self.step_marks[uid].append((status.split(':')[0].strip(), time.perf_counter()))
+
+    def _on_login_success(self, uid: str) -> None:
+        self.login_latency[uid] = time.perf_counter() - self.login_started[uid]
+
+    def _on_login_error(self, uid: str, error: str) -> None:
+        self.login_errors.setdefault(uid, error)
+
+    def _on_login_finished(self, uid: str) -> None:
+        self.step_marks[uid].append(("end", time.perf_counter()))
+        stats = self.login_manager.get_blocking_stats(uid)
+        if stats:
+            self.bytes_saved.append(stats.estimated_bytes_saved)
+            self.bytes_received.append(stats.bytes_received)
+        self._release(uid)
+
+    def _release(self, uid: str) -> None:
+        if uid in self.in_flight:
+            self.in_flight.discard(uid)
+            self.browser_manager.close_browser(uid)
+            self._fill()
+
+    def _on_deadline(self) -> None:
+        logger.warning(f"Benchmark timed out with {len(self.in_flight)} accounts in flight")
+        self.pending.clear()
+        self.in_flight.clear()
+        self._finish()
+
+    def _finish(self) -> None:
+        if self.finished_at is not None:
+            return
+        self.finished_at = time.perf_counter()
+        self.sampler.sample()
+        self._sample_timer.stop()
+        self._deadline_timer.stop()
+        QApplication.instance().quit()
+
+    def step_durations(self) -> Dict[str, List[float]]:
+        """Time spent in each login step, keyed by the status that opened it"""
+        durations: Dict[str, List[float]] = defaultdict(list)
+        for marks in self.step_marks.values():
+            for (name, begin), (_, end) in zip(marks, marks[1:]):
+                durations[name].append(end - begin)
+        return durations
+
+    def report(self, settings: Dict) -> Dict:
+        wall = self.finished_at - self.started_at
+        return {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "settings": settings,
+            },
+            "launch": {
+                "ok": len(self.launch_latency),
+                "errors": len(self.launch_errors),
+                "latency_s": percentiles(list(self.launch_latency.values())),
+            },
+            "login": {
+                "ok": len(self.login_latency),
+                "errors": len(self.login_errors),
+                "latency_s": percentiles(list(self.login_latency.values())),
+                "steps_s": {name: percentiles(v) for name, v in self.step_durations().items()},
+                "est_bytes_saved_per_login": percentiles(self.bytes_saved),
+                "bytes_received_per_login": percentiles(self.bytes_received),
+            },
+            "resources": {
+                "peak_rss_mb": round(self.sampler.peak_rss_bytes / (1024 * 1024), 1),
+                "cpu_seconds": round(self.sampler.cpu_seconds, 2),
+            },
+            "throughput": {
+                "wall_seconds": round(wall, 3),
+                "accounts_per_minute": round(len(self.login_latency) / wall * 60, 2) if wall > 0 else 0,
+            },
+            "errors": {"launch": self.launch_errors, "login": self.login_errors},
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end fleet launch/login benchmark")
+    parser.add_argument("--accounts", type=int, default=10, help="Number of synthetic accounts")
+    parser.add_argument("--concurrency", type=int, default=5, help="Accounts in flight at once")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--chrome-arg", action="append", default=[], help="Extra Chrome argument (repeatable)")
+    parser.add_argument("--cache-proxy", action="store_true", help="Route browsers through the static cache proxy")
+    parser.add_argument("--no-blocking", action="store_true", help="Disable login resource blocking")
+    parser.add_argument("--latency-ms", type=int, default=50, help="Fake server latency")
+    parser.add_argument("--jitter-ms", type=int, default=50)
+    parser.add_argument("--layout", default="classic")
+    parser.add_argument("--timeout", type=float, default=600, help="Overall timeout in seconds")
+    parser.add_argument("-o", "--output", default="bench_fleet.json")
+    parser.add_argument("--trace", metavar="PATH", help="Also write launch/login phase spans (Chrome Trace JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s')
+    app = QApplication(sys.argv)
+    if args.trace:
+        tracer.enable()
+
+    with tempfile.TemporaryDirectory(prefix="fbm-bench-") as profiles_dir:
+        text = synthetic_accounts_text(args.accounts)
+        accounts = AccountLoader(profiles_base_dir=profiles_dir).load_accounts(text)
+
+        server = FakeFacebookServer(FakeFacebookConfig(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, layout=args.layout,
+        )).start()
+        server.load_accounts_text(text)
+        LoginFlow.FB_LOGIN_URL = server.url
+
+        browser_manager = BrowserManager(headless=args.headless, extra_arguments=args.chrome_arg,
+                                         use_cache_proxy=args.cache_proxy)
+        login_manager = FacebookLoginManager(
+            blocking_policy=BlockingPolicy([], []) if args.no_blocking else None)
+        bench = FleetBenchmark(accounts, args.concurrency, browser_manager,
+                               login_manager, ProcessSampler(profiles_dir), args.timeout)
+        QTimer.singleShot(0, bench.start)
+        app.exec()
+
+        cache_stats = browser_manager.cache_proxy.stats if browser_manager.cache_proxy else None
+        login_manager.cleanup()
+        browser_manager.cleanup()
+        server.stop()
+
+        settings = {
+            "accounts": args.accounts, "concurrency": args.concurrency,
+            "headless": args.headless, "chrome_args": args.chrome_arg,
+            "server_latency_ms": args.latency_ms, "server_jitter_ms": args.jitter_ms,
+            "layout": args.layout, "resource_blocking": not args.no_blocking,
+            "cache_proxy": args.cache_proxy,
+        }
+        report = bench.report(settings)
+        report["server"] = server.snapshot_stats()
+        if cache_stats:
+            report["cache_proxy"] = dict(asdict(cache_stats), hit_ratio=round(cache_stats.hit_ratio, 4))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({k: report[k] for k in ("launch", "login", "resources", "throughput")}, indent=2))
+    print(f"Report written to {args.output}")
+    if args.trace:
+        tracer.export(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Startup Benchmark - Cold start to first paint of the main window
+
+Runs ``main.py --quit-after-startup --startup-report`` in fresh processes and
+summarizes the phase timings, so startup regressions show up across commits.
+
+Usage:
+    python -m tools.bench_startup --runs 10 -o bench_startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from tools.bench_fleet import git_revision, percentiles
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(timeout: float) -> Dict:
+    """One cold start; returns the startup report plus wall time of the process"""
+    with tempfile.TemporaryDirectory(prefix="fbm-startup-") as work_dir:
+        report_path = os.path.join(work_dir, "startup.json")
+        env = dict(os.environ)
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(PROJECT_ROOT, "main.py"),
+             "--quit-after-startup", f"--startup-report={report_path}"],
+            cwd=work_dir, env=env, timeout=timeout,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+        )
+        wall = time.perf_counter() - started
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+    report["process_wall_ms"] = round(wall * 1000, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("-o", "--output", default="bench_startup.json")
+    args = parser.parse_args()
+
+    runs: List[Dict] = []
+    for i in range(args.runs):
+        runs.append(run_once(args.timeout))
+        print(f"run {i + 1}/{args.runs}: first paint {runs[-1]['phases_ms'].get('first_paint')} ms")
+
+    phases: Dict[str, List[float]] = {}
+    for run in runs:
+        for name, ms in run["phases_ms"].items():
+            phases.setdefault(name, []).append(ms / 1000)
+    summary = {name: percentiles(values) for name, values in phases.items()}
+    summary["process_wall"] = percentiles([r["process_wall_ms"] / 1000 for r in runs])
+
+    report = {
+        "revision": git_revision(),
+        "runs": args.runs,
+        "phases": summary,
+        "slowest_imports_ms": runs[-1]["slowest_imports_ms"],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["phases"], indent=2))
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Style Benchmark - Cost of a button state change on the GUI thread
+
+Compares three ways of flipping N buttons between two states:
+  stylesheet  per-widget setStyleSheet(get_button_style(...)) (the old path)
+  property    style_button + set_button_variant (compiled global stylesheet)
+  painted     AccountTableModel update painted by the table delegates
+
+Each round flips every button ("update") and then repaints the window
+synchronously ("update_and_paint").
+
+Usage:
+    python -m tools.bench_styles --buttons 200 --rounds 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+from PyQt6.QtWidgets import QApplication, QWidget, QGridLayout, QPushButton
+
+from core.account_loader import Account
+from ui.styles import MAIN_STYLESHEET, COLORS, get_button_style, style_button, set_button_variant
+from ui.widgets import AccountTable
+from ui.models.account_model import button_state
+
+STATES = [("⏳ Opening...", False, 'warning'), ("✅ Running", True, 'success')]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def _time_rounds(rounds: int, flip: Callable[[int], None], window: QWidget) -> Dict[str, Dict[str, float]]:
+    """Time the state change itself and the change plus a full repaint"""
+    update: List[float] = []
+    total: List[float] = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        flip(i)
+        QApplication.processEvents()
+        update.append(time.perf_counter() - started)
+        window.repaint()
+        total.append(time.perf_counter() - started)
+    return {"update": _summary(update), "update_and_paint": _summary(total)}
+
+
+def _button_grid(count: int) -> tuple:
+    window = QWidget()
+    window.setStyleSheet(MAIN_STYLESHEET)
+    layout = QGridLayout(window)
+    buttons = []
+    for i in range(count):
+        btn = QPushButton("🌐 Open")
+        layout.addWidget(btn, i // 10, i % 10)
+        buttons.append(btn)
+    window.resize(1400, 900)
+    window.show()
+    QApplication.processEvents()
+    return window, buttons
+
+
+def bench_stylesheet(count: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    window, buttons = _button_grid(count)
+
+    def flip(i: int) -> None:
+        text, enabled, variant = STATES[i % 2]
+        for btn in buttons:
+            btn.setText(text)
+            btn.setEnabled(enabled)
+            btn.setStyleSheet(get_button_style(COLORS[variant], 70, 10))
+
+    result = _time_rounds(rounds, flip, window)
+    window.close()
+    return result
+
+
+def bench_property(count: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    window, buttons = _button_grid(count)
+    for btn in buttons:
+        style_button(btn, 'success', 70, 10)
+
+    def flip(i: int) -> None:
+        text, enabled, variant = STATES[i % 2]
+        for btn in buttons:
+            btn.setText(text)
+            btn.setEnabled(enabled)
+            set_button_variant(btn, variant)
+
+    result = _time_rounds(rounds, flip, window)
+    window.close()
+    return result
+
+
+def bench_painted(count: int, rounds: int) -> Dict[str, Dict[str, float]]:
+    table = AccountTable()
+    table.setStyleSheet(MAIN_STYLESHEET)
+    table.add_accounts([Account(str(100000 + i), "pw", "TOKEN", f"/tmp/{i}") for i in range(count)])
+    table.resize(1400, 900)
+    table.show()
+    QApplication.processEvents()
+
+    def flip(i: int) -> None:
+        text, enabled, variant = STATES[i % 2]
+        state = button_state(text, enabled, COLORS[variant])
+        for row in table.model.rows:
+            table.update_bus.post(row.account.uid, browser_button=state)
+        table.update_bus.flush()
+
+    result = _time_rounds(rounds, flip, table)
+    table.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Button state-change micro-benchmark")
+    parser.add_argument("--buttons", type=int, default=200, help="Buttons flipped per round")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("-o", "--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+
+    report = {
+        "buttons": args.buttons,
+        "rounds": args.rounds,
+        "stylesheet": bench_stylesheet(args.buttons, args.rounds),
+        "property": bench_property(args.buttons, args.rounds),
+        "painted": bench_painted(args.buttons, args.rounds),
+    }
+    app.quit()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,540 @@
+"""Fake Driver - In-memory ChromiumPage stand-in for fast, deterministic login-flow runs
+
+Implements the part of DrissionPage's ChromiumPage that LoginFlow uses (get,
+url, ele, run_js, run_cdp, and elements with input/click/clear/attr) over the
+page-state machine of tools.fake_facebook: login form, then an optional 2FA
+checkpoint, then a trust prompt or verification dead end, then the home feed,
+in the classic/modern/minimal layouts. Navigation latency and late-appearing
+fields play out on a VirtualClock that the flow's sleeps and polls advance.
+A login that takes ~15 s in Chrome runs in well under a millisecond, and a
+seed always gives the same runs.
+
+Usage:
+    python -m tools.fake_driver --scenarios 5000                # scenario matrix, exit 1 on a mismatch
+    python -m tools.fake_driver --scenarios 5000 --seed 7 -v    # ...and print every mismatch
+    python -m tools.fake_driver --bench 2000 -o overhead.json   # LoginFlow/worker overhead per login
+"""
+import argparse
+import itertools
+import json
+import logging
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pyotp
+
+from core.cancellation import CancellationToken
+from core.login_flow import Clock, LoginFlow
+from tools.fake_facebook import LAYOUTS, STAGE_ANONYMOUS, STAGE_NEEDS_2FA, STAGE_NEEDS_TRUST, \
+    STAGE_BLOCKED, STAGE_LOGGED_IN
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.facebook.com"
+# LoginFlow errors the scenarios expect
+LOGIN_NOT_CONFIRMED = "Login not confirmed: still on a login or recovery page"
+VERIFICATION_REQUIRED = "Additional verification required"
+_SELECTOR = re.compile(r'(?P<tag>[a-z]+)?(?:#(?P<id>[\w-]+))?(?P<attrs>(?:\[[^\]]+\])*)')
+_ATTRIBUTE = re.compile(r'\[([\w-]+)="([^"]*)"\]')
+
+
+class VirtualClock(Clock):
+    """Clock that only moves when someone waits on it"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, token: CancellationToken, seconds: float) -> None:
+        token.check()
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@dataclass
+class FakeScenario:
+    """What the fake account and site do during one login"""
+    layout: str = "classic"         # classic | modern | minimal
+    password_ok: bool = True        # The flow is given the right password
+    two_factor: bool = True         # A 2FA checkpoint follows the password
+    code_ok: bool = True            # The flow is given the right TOTP secret
+    trust_prompt: bool = True       # "Trust this device" after verification
+    checkpoint: bool = False        # Extra verification dead end after verification
+    latency: float = 0.3            # Virtual seconds per navigation
+    field_delay: float = 0.0        # Virtual seconds before the 2FA input appears
+
+    @property
+    def label(self) -> str:
+        if not self.password_ok:
+            return f"{self.layout}/bad-password"
+        parts = [self.layout]
+        if self.two_factor:
+            parts.append("2fa" if self.code_ok else "2fa-bad-code")
+            if self.field_delay:
+                parts.append("late-field")
+        if self.checkpoint:
+            parts.append("checkpoint")
+        elif self.trust_prompt:
+            parts.append("trust")
+        return "/".join(parts)
+
+    @property
+    def expected_error(self) -> Optional[str]:
+        """LoginFlow.error this scenario must end with; None when the login must succeed"""
+        if not self.password_ok:
+            return LOGIN_NOT_CONFIRMED
+        if (self.two_factor and not self.code_ok) or self.checkpoint:
+            return VERIFICATION_REQUIRED
+        return None
+
+
+@lru_cache(maxsize=256)
+def _parse_selector(locator: str) -> Optional[Tuple[Optional[str], Tuple[Tuple[str, str], ...]]]:
+    """``tag#id[attr="value"]...`` -> (tag, ((attr, value), ...)); None when not understood"""
+    match = _SELECTOR.fullmatch(locator)
+    if not match or not locator:
+        return None
+    attributes = _ATTRIBUTE.findall(match.group("attrs"))
+    if match.group("id"):
+        attributes.append(("id", match.group("id")))
+    return match.group("tag"), tuple(attributes)
+
+
+class FakeElement:
+    """One form control or button; mirrors the ChromiumElement calls the flow makes"""
+
+    def __init__(self, page: "FakeChromiumPage", tag: str, text: str = "", visible_at: float = 0.0,
+                 **attributes: str):
+        self.page = page
+        self.tag = tag
+        self.text = text
+        self.visible_at = visible_at
+        self.attributes = {name.replace("_", "-"): value for name, value in attributes.items()}
+        self.value = ""
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.attributes.get(name)
+
+    def matches(self, tag: Optional[str], attributes: Tuple[Tuple[str, str], ...]) -> bool:
+        if tag and tag != self.tag:
+            return False
+        return all(self.attributes.get(name) == value for name, value in attributes)
+
+    def clear(self) -> None:
+        self.page.calls["clear"] += 1
+        self.value = ""
+
+    def input(self, text: str) -> None:
+        self.page.calls["input"] += 1
+        if text.endswith("\n"):
+            self.value += text[:-1]
+            self.page._submit()
+        else:
+            self.value += text
+
+    def click(self) -> None:
+        self.page.calls["click"] += 1
+        if self.tag == "button" or self.attributes.get("role") == "button":
+            self.page._submit(self)
+
+    def __repr__(self) -> str:
+        return f"<FakeElement {self.tag} {self.attributes}>"
+
+
+class FakeChromiumPage:
+    """ChromiumPage subset over the fake site's state machine.
+
+    Form submissions navigate ``latency`` virtual seconds later, as a real
+    click returns before the next page loads. ``get`` blocks for the latency.
+    ``run_js`` recognises the flow's two scripts (focus the 2FA input, click
+    the trust button); others can be added with ``on_script``.
+    """
+
+    def __init__(self, scenario: FakeScenario, uid: str, password: str, secret: str,
+                 clock: Optional[VirtualClock] = None):
+        self.scenario = scenario
+        self.uid = uid
+        self.password = password
+        self.secret = secret
+        self.clock = clock or VirtualClock()
+        self.stage = STAGE_ANONYMOUS
+        self.calls: Counter = Counter()
+        self.elements: List[FakeElement] = []
+        self.focused: Optional[FakeElement] = None
+        self._url = "about:blank"
+        self._pending: Optional[Tuple[float, str]] = None      # (due, path) of a navigation in flight
+        self._scripts: List[Tuple[str, Callable[[str], Any]]] = [
+            ("focus()", self._focus_code_input), ("trust", self._click_trust),
+        ]
+
+    # ----- ChromiumPage surface -----
+
+    @property
+    def url(self) -> str:
+        self._settle()
+        return self._url
+
+    def get(self, url: str, timeout: Optional[float] = None) -> bool:
+        self.calls["get"] += 1
+        self._pending = None
+        self.clock.advance(self.scenario.latency)
+        self._load(urlparse(url).path or "/")
+        return True
+
+    def ele(self, locator: str, timeout: Optional[float] = None) -> Optional[FakeElement]:
+        self.calls["ele"] += 1
+        self._settle()
+        if locator == "@focused":
+            return self.focused
+        selector = _parse_selector(locator)
+        if selector is None:
+            return None
+        tag, attributes = selector
+        now = self.clock.now
+        for element in self.elements:
+            if element.visible_at <= now and element.matches(tag, attributes):
+                return element
+        return None
+
+    def run_js(self, script: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        self.calls["run_js"] += 1
+        self._settle()
+        lowered = script.lower()
+        for marker, handler in self._scripts:
+            if marker in lowered:
+                return handler(script)
+        return None
+
+    def run_cdp(self, cmd: str, **cmd_args: Any) -> Dict[str, Any]:
+        self.calls["run_cdp"] += 1
+        if cmd == "Page.stopLoading":
+            self._pending = None
+        return {}
+
+    def on_script(self, marker: str, handler: Callable[[str], Any]) -> None:
+        """Answer scripts containing ``marker`` (lower case) with handler(script), before the built-ins"""
+        self._scripts.insert(0, (marker, handler))
+
+    # ----- State machine -----
+
+    def _settle(self) -> None:
+        if self._pending and self._pending[0] <= self.clock.now:
+            path = self._pending[1]
+            self._pending = None
+            self._load(path)
+
+    def _navigate(self, path: str) -> None:
+        self._pending = (self.clock.now + self.scenario.latency, path)
+
+    def _load(self, path: str) -> None:
+        self._url = BASE_URL + path
+        self.focused = None
+        if (path in ("/", "/index.php") and self.stage == STAGE_LOGGED_IN) or path.startswith("/home"):
+            if self.stage != STAGE_LOGGED_IN:
+                return self._load("/")
+            self.elements = self._feed()
+        elif path.startswith("/checkpoint/trust"):
+            self.elements = self._trust_prompt() if self.stage == STAGE_NEEDS_TRUST else []
+        elif path.startswith("/checkpoint/review"):
+            self.elements = []
+        elif path.startswith("/checkpoint"):
+            self.elements = self._checkpoint_form() if self.stage == STAGE_NEEDS_2FA else []
+        else:
+            self.elements = self._login_form()
+
+    def _submit(self, button: Optional[FakeElement] = None) -> None:
+        path = urlparse(self._url).path
+        fields = {e.attributes.get("name"): e.value for e in self.elements if e.tag == "input"}
+        if path == "/" or path.startswith("/login"):
+            if fields.get("email") != self.uid or fields.get("pass") != self.password:
+                return self._navigate("/login/?error=1")
+            if self.scenario.two_factor:
+                self.stage = STAGE_NEEDS_2FA
+                return self._navigate("/checkpoint/?next")
+            return self._after_verification()
+        if path.startswith("/checkpoint/trust") and self.stage == STAGE_NEEDS_TRUST:
+            self.stage = STAGE_LOGGED_IN
+            return self._navigate("/home/")
+        if path.startswith("/checkpoint") and self.stage == STAGE_NEEDS_2FA:
+            code = fields.get("approvals_code") or fields.get("code") or ""
+            if not pyotp.TOTP(self.secret).verify(code.strip(), valid_window=1):
+                return self._navigate("/checkpoint/?error=1")
+            return self._after_verification()
+
+    def _after_verification(self) -> None:
+        if self.scenario.checkpoint:
+            self.stage = STAGE_BLOCKED
+            return self._navigate("/checkpoint/review/")
+        if self.scenario.trust_prompt:
+            self.stage = STAGE_NEEDS_TRUST
+            return self._navigate("/checkpoint/trust/")
+        self.stage = STAGE_LOGGED_IN
+        self._navigate("/home/")
+
+    # ----- Pages (same controls as tools.fake_facebook) -----
+
+    def _login_form(self) -> List[FakeElement]:
+        layout = self.scenario.layout
+        if layout == "modern":
+            return [FakeElement(self, "input", type="text", name="email", autocomplete="username"),
+                    FakeElement(self, "input", type="password", name="pass", autocomplete="current-password"),
+                    FakeElement(self, "button", "Log in", type="submit")]
+        if layout == "minimal":
+            return [FakeElement(self, "input", type="text", name="email"),
+                    FakeElement(self, "input", type="password", name="pass")]
+        return [FakeElement(self, "input", type="text", id="email", name="email"),
+                FakeElement(self, "input", type="password", id="pass", name="pass"),
+                FakeElement(self, "button", "Log in", name="login", type="submit", id="loginbutton")]
+
+    def _checkpoint_form(self) -> List[FakeElement]:
+        visible_at = self.clock.now + self.scenario.field_delay
+        if self.scenario.layout == "classic":
+            return [FakeElement(self, "input", visible_at=visible_at, type="text", id="approvals_code",
+                                name="approvals_code"),
+                    FakeElement(self, "button", "Continue", type="submit", id="checkpointSubmitButton",
+                                name="submit[Continue]")]
+        return [FakeElement(self, "input", visible_at=visible_at, type="text", name="code",
+                            autocomplete="one-time-code", inputmode="numeric"),
+                FakeElement(self, "button", "Continue", type="submit")]
+
+    def _trust_prompt(self) -> List[FakeElement]:
+        return [FakeElement(self, "button", "Trust this device", type="submit", name="trust"),
+                FakeElement(self, "button", "Not now", type="submit", name="skip")]
+
+    def _feed(self) -> List[FakeElement]:
+        return [FakeElement(self, "a", self.uid, aria_label="Your profile"),
+                FakeElement(self, "div", "Account", role="button", aria_label="Account")]
+
+    # ----- Built-in scripts -----
+
+    def _focus_code_input(self, _script: str) -> bool:
+        now = self.clock.now
+        for element in self.elements:
+            if element.tag == "input" and element.visible_at <= now \
+                    and element.attributes.get("type") in ("text", "tel", "number") \
+                    and element.attributes.get("name") not in ("email", "pass"):
+                self.focused = element
+                return True
+        return False
+
+    def _click_trust(self, _script: str) -> bool:
+        for element in self.elements:
+            if element.tag == "button" and "trust" in element.text.lower():
+                element.click()
+                return True
+        return False
+
+
+# ----- Scenario runner -----
+
+@dataclass
+class ScenarioResult:
+    label: str
+    ok: bool                    # What LoginFlow.run() returned
+    logged_in: bool             # Whether the fake site actually reached the home feed
+    error: Optional[str]
+    expected_error: Optional[str]
+    virtual_s: float            # Simulated duration (what the sleeps and latency would take for real)
+    wall_ms: float
+
+    @property
+    def matches(self) -> bool:
+        """The flow's verdict agrees with the site, and it failed (or not) for the expected reason"""
+        return self.ok == self.logged_in == (self.expected_error is None) and self.error == self.expected_error
+
+
+def scenario_matrix() -> List[FakeScenario]:
+    """Every meaningful combination of layout, credentials, 2FA and post-verification page"""
+    scenarios = []
+    for layout, password_ok in itertools.product(LAYOUTS, (True, False)):
+        if not password_ok:
+            scenarios.append(FakeScenario(layout, password_ok=False))
+            continue
+        for two_factor, trust_prompt, checkpoint in itertools.product((True, False), repeat=3):
+            if checkpoint and trust_prompt:
+                continue
+            if not two_factor:
+                scenarios.append(FakeScenario(layout, two_factor=False, trust_prompt=trust_prompt,
+                                              checkpoint=checkpoint))
+                continue
+            for code_ok, field_delay in ((True, 0.0), (True, 1.5), (False, 0.0)):
+                scenarios.append(FakeScenario(layout, code_ok=code_ok, trust_prompt=trust_prompt,
+                                              checkpoint=checkpoint, field_delay=field_delay))
+    return scenarios
+
+
+def iter_scenarios(count: int, seed: int = 0) -> Iterator[FakeScenario]:
+    """``count`` scenarios cycling through the matrix, each with a seeded navigation latency"""
+    rng = random.Random(seed)
+    matrix = scenario_matrix()
+    for i in range(count):
+        scenario = FakeScenario(**asdict(matrix[i % len(matrix)]))
+        scenario.latency = round(rng.uniform(0.05, 1.5), 3)
+        yield scenario
+
+
+def build_login(scenario: FakeScenario, index: int = 0) -> Tuple[FakeChromiumPage, Dict[str, Any]]:
+    """A fake page for one synthetic account, and the LoginFlow arguments that go with it"""
+    uid, password = f"{900000000000000 + index}", f"fake-pass-{index}"
+    secret = pyotp.random_base32()
+    page = FakeChromiumPage(scenario, uid, password, secret)
+    arguments = {
+        "uid": uid,
+        "password": password if scenario.password_ok else password + "-wrong",
+        "token_2fa": secret if scenario.code_ok else pyotp.random_base32(),
+        "clock": page.clock,
+    }
+    return page, arguments
+
+
+def run_scenario(scenario: FakeScenario, index: int = 0) -> ScenarioResult:
+    page, arguments = build_login(scenario, index)
+    flow = LoginFlow(page, **arguments)
+    started = time.perf_counter()
+    ok = flow.run()
+    wall_ms = (time.perf_counter() - started) * 1000
+    return ScenarioResult(scenario.label, ok, page.stage == STAGE_LOGGED_IN, flow.error, scenario.expected_error,
+                          round(page.clock.now, 2), round(wall_ms, 3))
+
+
+def run_scenarios(count: int, seed: int = 0, verbose: bool = False) -> Dict[str, Any]:
+    outcomes: Dict[str, Counter] = {}
+    mismatches: List[Dict[str, Any]] = []
+    virtual_s = 0.0
+    started = time.perf_counter()
+    for index, scenario in enumerate(iter_scenarios(count, seed)):
+        result = run_scenario(scenario, index)
+        virtual_s += result.virtual_s
+        outcome = "logged in" if result.ok else f"failed: {result.error}"
+        outcomes.setdefault(result.label, Counter())[outcome] += 1
+        if not result.matches:
+            mismatches.append(asdict(result))
+            if verbose:
+                print(f"MISMATCH {result.label}: flow {'succeeded' if result.ok else 'failed'} "
+                      f"({result.error}), site {'logged in' if result.logged_in else 'not logged in'}, "
+                      f"expected {result.expected_error or 'success'}")
+    elapsed = time.perf_counter() - started
+    return {
+        "scenarios": count,
+        "seed": seed,
+        "elapsed_s": round(elapsed, 3),
+        "scenarios_per_s": round(count / elapsed, 1) if elapsed else None,
+        "virtual_hours": round(virtual_s / 3600, 2),
+        "mismatches": len(mismatches),
+        "outcomes": {label: dict(counter) for label, counter in sorted(outcomes.items())},
+        "mismatch_samples": mismatches[:20],
+    }
+
+
+# ----- Overhead benchmark -----
+
+def bench_flow(count: int, seed: int = 0) -> Dict[str, Any]:
+    """LoginFlow alone, in this thread: every millisecond measured is the flow's own work"""
+    from tools.bench_fleet import percentiles
+    latencies, calls = [], Counter()
+    for index, scenario in enumerate(iter_scenarios(count, seed)):
+        page, arguments = build_login(scenario, index)
+        flow = LoginFlow(page, **arguments)
+        started = time.perf_counter()
+        flow.run()
+        latencies.append((time.perf_counter() - started) * 1000)
+        calls.update(page.calls)
+    return {"per_login_ms": percentiles(latencies),
+            "driver_calls_per_login": {name: round(n / count, 1) for name, n in sorted(calls.items())}}
+
+
+def bench_worker(count: int, parallel: int, seed: int = 0) -> Dict[str, Any]:
+    """FacebookLoginWorker QThreads, ``parallel`` at a time, timed from start() to finished on the event loop"""
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from core.facebook_login import FacebookLoginWorker
+    from tools.bench_fleet import percentiles
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    pending = list(enumerate(iter_scenarios(count, seed)))
+    running: Dict[str, Tuple[FacebookLoginWorker, float]] = {}
+    latencies: List[float] = []
+    signals = Counter()
+
+    def start_next() -> None:
+        while pending and len(running) < parallel:
+            index, scenario = pending.pop()
+            page, arguments = build_login(scenario, index)
+            worker = FacebookLoginWorker(page, arguments["uid"], arguments["password"], arguments["token_2fa"],
+                                         clock=arguments["clock"])
+            worker.status_signal.connect(lambda *_: signals.update(["status"]))
+            worker.progress_signal.connect(lambda *_: signals.update(["progress"]))
+            worker.finished_signal.connect(finished)
+            running[worker.uid] = (worker, time.perf_counter())
+            worker.start()
+        if not running:
+            app.quit()
+
+    def finished(uid: str) -> None:
+        worker, started = running.pop(uid)
+        latencies.append((time.perf_counter() - started) * 1000)
+        worker.wait()
+        worker.deleteLater()
+        start_next()
+
+    began = time.perf_counter()
+    QTimer.singleShot(0, start_next)
+    app.exec()
+    elapsed = time.perf_counter() - began
+    return {"parallel": parallel, "per_login_ms": percentiles(latencies),
+            "logins_per_s": round(count / elapsed, 1) if elapsed else None,
+            "signals_per_login": {name: round(n / count, 1) for name, n in sorted(signals.items())}}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run login-flow scenarios or benchmarks on the in-memory fake driver")
+    parser.add_argument("--scenarios", type=int, default=0, help="Scenarios to run through LoginFlow")
+    parser.add_argument("--bench", type=int, default=0, help="Logins per overhead benchmark")
+    parser.add_argument("--parallel", type=int, default=8, help="Concurrent workers in the worker benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Write the JSON report here")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every mismatch")
+    args = parser.parse_args()
+    if not args.scenarios and not args.bench:
+        args.scenarios = len(scenario_matrix()) * 100
+
+    # The flow logs every step; only problems matter here
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    logging.getLogger("core.login_flow").setLevel(logging.CRITICAL)
+
+    report: Dict[str, Any] = {}
+    if args.scenarios:
+        report["scenarios"] = run_scenarios(args.scenarios, args.seed, args.verbose)
+        summary = report["scenarios"]
+        print(f"{summary['scenarios']} scenarios in {summary['elapsed_s']} s "
+              f"({summary['scenarios_per_s']}/s, {summary['virtual_hours']} h simulated), "
+              f"{summary['mismatches']} mismatches")
+    if args.bench:
+        report["flow"] = bench_flow(args.bench, args.seed)
+        report["worker"] = bench_worker(args.bench, args.parallel, args.seed)
+        flow, worker = report["flow"]["per_login_ms"], report["worker"]["per_login_ms"]
+        print(f"LoginFlow: p50 {flow['p50']:.3f} ms, p99 {flow['p99']:.3f} ms per login")
+        print(f"FacebookLoginWorker x{args.parallel}: p50 {worker['p50']:.3f} ms, "
+              f"{report['worker']['logins_per_s']} logins/s")
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if report.get("scenarios", {}).get("mismatches") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
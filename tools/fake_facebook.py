@@ -0,0 +1,453 @@
+"""Fake Facebook Server - Local stand-in for the pages the login flow drives
+
+Serves the login form, the approvals_code checkpoint (verifying real TOTP codes),
+the "trust this device" prompt and a home feed with static assets.
+
+Usage:
+    python -m tools.fake_facebook --port 8765 --accounts accounts.txt
+    FB_LOGIN_URL=http://127.0.0.1:8765/ python main.py
+"""
+import argparse
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, asdict
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pyotp
+
+from core.account_loader import AccountLoader
+
+logger = logging.getLogger(__name__)
+
+LAYOUTS = ("classic", "modern", "minimal")
+SESSION_COOKIE = "fbm_sid"
+
+# Session stages
+STAGE_ANONYMOUS = "anonymous"
+STAGE_NEEDS_2FA = "needs_2fa"
+STAGE_NEEDS_TRUST = "needs_trust"
+STAGE_BLOCKED = "blocked"
+STAGE_LOGGED_IN = "logged_in"
+
+
+@dataclass
+class FakeFacebookConfig:
+    """Behaviour knobs of the fake server"""
+    latency_ms: int = 0              # Base latency added to every response
+    jitter_ms: int = 0               # Uniform random extra latency
+    error_rate: float = 0.0          # Probability of an HTTP 500 on page requests
+    bad_credentials_rate: float = 0.0  # Probability of rejecting valid credentials
+    two_factor_rate: float = 1.0     # Probability the checkpoint asks for a 2FA code
+    trust_prompt_rate: float = 1.0   # Probability of the "trust this device" page
+    checkpoint_rate: float = 0.0     # Probability of an extra verification dead end
+    layout: str = "classic"          # classic | modern | minimal | random
+    accept_any: bool = False         # Accept unknown UIDs (any password, no TOTP check)
+    feed_assets: int = 12            # Number of images on the home feed
+    asset_kb: int = 48               # Size of each generated static asset
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Session:
+    uid: str = ""
+    stage: str = STAGE_ANONYMOUS
+    layout: str = "classic"
+
+
+class FakeFacebookServer:
+    """Threaded HTTP server mimicking the Facebook login flow"""
+
+    def __init__(self, config: Optional[FakeFacebookConfig] = None,
+                 accounts: Optional[Dict[str, Tuple[str, str]]] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeFacebookConfig()
+        self.accounts: Dict[str, Tuple[str, str]] = dict(accounts or {})
+        self.sessions: Dict[str, _Session] = {}
+        self.stats: Dict[str, int] = {
+            "requests": 0, "errors": 0, "logins_ok": 0, "logins_failed": 0,
+            "codes_ok": 0, "codes_failed": 0, "trusted": 0, "blocked": 0, "bytes_sent": 0,
+        }
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._asset = bytes(self._rng.getrandbits(8) for _ in range(self.config.asset_kb * 1024))
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def add_account(self, uid: str, password: str, token: str) -> None:
+        with self._lock:
+            self.accounts[uid] = (password, token)
+
+    def load_accounts_text(self, text_data: str) -> int:
+        """Register accounts from UID|PASSWORD|TOKEN lines, return count"""
+        loader = AccountLoader()
+        count = 0
+        for line in text_data.splitlines():
+            parsed = loader.parse_line(line)
+            if parsed:
+                self.add_account(*parsed)
+                count += 1
+        return count
+
+    def start(self) -> "FakeFacebookServer":
+        """Serve in a background daemon thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-facebook", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Facebook server listening on {self.url}")
+        return self
+
+    def serve_forever(self) -> None:
+        logger.info(f"Fake Facebook server listening on {self.url}")
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    # ----- Internal helpers used by the request handler -----
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _chance(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        if probability >= 1:
+            return True
+        with self._lock:
+            return self._rng.random() < probability
+
+    def _delay(self) -> None:
+        cfg = self.config
+        delay = cfg.latency_ms
+        if cfg.jitter_ms > 0:
+            with self._lock:
+                delay += self._rng.uniform(0, cfg.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _new_session(self) -> Tuple[str, _Session]:
+        layout = self.config.layout
+        if layout == "random":
+            with self._lock:
+                layout = self._rng.choice(LAYOUTS)
+        sid = secrets.token_hex(16)
+        session = _Session(layout=layout)
+        with self._lock:
+            self.sessions[sid] = session
+        return sid, session
+
+    def _get_session(self, sid: Optional[str]) -> Optional[_Session]:
+        if not sid:
+            return None
+        with self._lock:
+            return self.sessions.get(sid)
+
+    def _check_credentials(self, uid: str, password: str) -> bool:
+        with self._lock:
+            known = self.accounts.get(uid)
+        if known is None:
+            return self.config.accept_any and bool(uid and password)
+        return known[0] == password and not self._chance(self.config.bad_credentials_rate)
+
+    def _check_code(self, uid: str, code: str) -> bool:
+        with self._lock:
+            known = self.accounts.get(uid)
+        if known is None:
+            return self.config.accept_any and code.isdigit()
+        try:
+            totp = pyotp.TOTP(known[1].replace(" ", "").upper())
+            return totp.verify(code.strip(), valid_window=1)
+        except Exception:
+            return False
+
+
+def _make_handler(server: FakeFacebookServer):
+    class Handler(_FakeFacebookHandler):
+        fb = server
+    return Handler
+
+
+class _FakeFacebookHandler(BaseHTTPRequestHandler):
+    """Routes requests to the fake login pages"""
+
+    fb: FakeFacebookServer
+    _pending_cookie: Optional[str] = None
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeFacebook/1.0"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    # ----- Routing -----
+
+    def do_GET(self) -> None:
+        self.fb._count("requests")
+        path = urlparse(self.path).path
+
+        if path.startswith("/static/"):
+            return self._send_asset(path)
+        if path.startswith("/tr/"):
+            return self._send(204, b"", "image/gif")
+        if path == "/__stats":
+            return self._send(200, json.dumps(self.fb.snapshot_stats()).encode(), "application/json")
+
+        self.fb._delay()
+        if self.fb._chance(self.fb.config.error_rate):
+            self.fb._count("errors")
+            return self._send_page(500, "Error", "<h1>Sorry, something went wrong.</h1>")
+
+        sid, session = self._session()
+        if path in ("/", "/index.php"):
+            if session.stage == STAGE_LOGGED_IN:
+                return self._send_feed(session)
+            return self._send_login_form(session)
+        if path.startswith("/home") or path == "/feed/":
+            if session.stage != STAGE_LOGGED_IN:
+                return self._redirect("/")
+            return self._send_feed(session)
+        if path == "/checkpoint/":
+            return self._send_checkpoint(session)
+        if path == "/checkpoint/trust/":
+            return self._send_trust_prompt(session)
+        if path == "/checkpoint/review/":
+            return self._send_page(200, "Checkpoint", "<h1>We need to confirm it's you</h1>"
+                                   "<p>Additional verification required.</p>")
+        if path.startswith("/login"):
+            return self._send_login_form(session, error="The password you've entered is incorrect.")
+        return self._send_page(404, "Not found", "<h1>This page isn't available</h1>")
+
+    def do_POST(self) -> None:
+        self.fb._count("requests")
+        self.fb._delay()
+        path = urlparse(self.path).path
+        form = self._read_form()
+        sid, session = self._session()
+
+        if path.startswith("/login"):
+            uid, password = form.get("email", ""), form.get("pass", "")
+            if not self.fb._check_credentials(uid, password):
+                self.fb._count("logins_failed")
+                return self._redirect("/login/?error=1")
+            self.fb._count("logins_ok")
+            session.uid = uid
+            if self.fb._chance(self.fb.config.two_factor_rate):
+                session.stage = STAGE_NEEDS_2FA
+                return self._redirect("/checkpoint/?next")
+            return self._after_verification(session)
+
+        if path == "/checkpoint/" and session.stage == STAGE_NEEDS_2FA:
+            code = form.get("approvals_code") or form.get("code", "")
+            if not self.fb._check_code(session.uid, code):
+                self.fb._count("codes_failed")
+                return self._send_checkpoint(session, error="The login code you entered doesn't match.")
+            self.fb._count("codes_ok")
+            return self._after_verification(session)
+
+        if path == "/checkpoint/trust/" and session.stage == STAGE_NEEDS_TRUST:
+            if "trust" in form:
+                self.fb._count("trusted")
+            session.stage = STAGE_LOGGED_IN
+            return self._redirect("/home/")
+
+        return self._redirect("/")
+
+    def _after_verification(self, session: _Session):
+        if self.fb._chance(self.fb.config.checkpoint_rate):
+            session.stage = STAGE_BLOCKED
+            self.fb._count("blocked")
+            return self._redirect("/checkpoint/review/")
+        if self.fb._chance(self.fb.config.trust_prompt_rate):
+            session.stage = STAGE_NEEDS_TRUST
+            return self._redirect("/checkpoint/trust/")
+        session.stage = STAGE_LOGGED_IN
+        return self._redirect("/home/")
+
+    # ----- Pages -----
+
+    def _send_login_form(self, session: _Session, error: str = "") -> None:
+        if session.layout == "modern":
+            fields = """
+            <input type="text" name="email" placeholder="Email or phone number" autocomplete="username">
+            <input type="password" name="pass" placeholder="Password" autocomplete="current-password">
+            <button type="submit">Log in</button>"""
+        elif session.layout == "minimal":
+            fields = """
+            <input type="text" name="email" placeholder="Email or phone number">
+            <input type="password" name="pass" placeholder="Password">"""
+        else:
+            fields = """
+            <input type="text" id="email" name="email" placeholder="Email or phone number">
+            <input type="password" id="pass" name="pass" placeholder="Password">
+            <button name="login" type="submit" id="loginbutton">Log in</button>"""
+        err = f'<div role="alert">{error}</div>' if error else ""
+        body = f"""
+        <h1>facebook</h1>{err}
+        <form method="post" action="/login/device-based/regular/login/">{fields}
+        </form>"""
+        self._send_page(200, "Facebook - log in or sign up", body)
+
+    def _send_checkpoint(self, session: _Session, error: str = "") -> None:
+        if session.stage != STAGE_NEEDS_2FA:
+            return self._redirect("/")
+        if session.layout == "classic":
+            fields = """
+            <input type="text" id="approvals_code" name="approvals_code" placeholder="Login code">
+            <button type="submit" id="checkpointSubmitButton" name="submit[Continue]">Continue</button>"""
+        else:
+            fields = """
+            <input type="text" name="code" autocomplete="one-time-code" inputmode="numeric" placeholder="Code">
+            <button type="submit">Continue</button>"""
+        err = f'<div role="alert">{error}</div>' if error else ""
+        body = f"""
+        <h2>Two-factor authentication required</h2>{err}
+        <form method="post" action="/checkpoint/">{fields}
+        </form>"""
+        self._send_page(200, "Two-factor authentication", body)
+
+    def _send_trust_prompt(self, session: _Session) -> None:
+        if session.stage != STAGE_NEEDS_TRUST:
+            return self._redirect("/")
+        body = """
+        <h2>Remember this browser?</h2>
+        <form method="post" action="/checkpoint/trust/">
+            <button type="submit" name="trust" value="1">Trust this device</button>
+            <button type="submit" name="skip" value="1">Not now</button>
+        </form>"""
+        self._send_page(200, "Remember browser", body)
+
+    def _send_feed(self, session: _Session) -> None:
+        images = "\n".join(
+            f'<img src="/static/img/{i}.jpg" width="320" height="180">'
+            for i in range(self.fb.config.feed_assets)
+        )
+        body = f"""
+        <div role="banner">
+            <a href="/profile.php?id={session.uid}" aria-label="Your profile">{session.uid}</a>
+            <div role="button" aria-label="Account">Account</div>
+        </div>
+        <div role="feed">{images}</div>
+        <video src="/static/media/clip.mp4" preload="auto" muted></video>
+        <img src="/tr/?ev=PageView" width="1" height="1">
+        <script src="/static/js/bundle.js"></script>"""
+        head = '<link rel="stylesheet" href="/static/css/app.css">'
+        self._send_page(200, "Facebook", body, head)
+
+    def _send_asset(self, path: str) -> None:
+        if path.endswith(".css"):
+            payload = b"@font-face{font-family:fb;src:url(/static/font/fb.woff2)} body{font-family:fb,sans-serif}"
+            content_type = "text/css"
+        elif path.endswith(".js"):
+            payload = b"/* bundle */" + b" " * (len(self.fb._asset) - 12)
+            content_type = "application/javascript"
+        elif path.endswith(".woff2"):
+            payload, content_type = self.fb._asset, "font/woff2"
+        elif path.endswith(".mp4"):
+            payload, content_type = self.fb._asset * 4, "video/mp4"
+        else:
+            payload, content_type = self.fb._asset, "image/jpeg"
+        self._send(200, payload, content_type,
+                   {"Cache-Control": "public, max-age=31536000, immutable"})
+
+    # ----- Plumbing -----
+
+    def _session(self) -> Tuple[str, _Session]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        sid = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+        session = self.fb._get_session(sid)
+        if session is None:
+            sid, session = self.fb._new_session()
+            self._pending_cookie = sid
+        return sid, session
+
+    def _read_form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+        return {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+    def _redirect(self, location: str) -> None:
+        self._send(302, b"", "text/html", {"Location": location})
+
+    def _send_page(self, status: int, title: str, body: str, head: str = "") -> None:
+        html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>{head}</head>
+<body>{body}
+</body></html>"""
+        self._send(status, html.encode("utf-8"), "text/html; charset=utf-8", {"Cache-Control": "no-store"})
+
+    def _send(self, status: int, payload: bytes, content_type: str,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if self._pending_cookie:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={self._pending_cookie}; Path=/; HttpOnly")
+            self._pending_cookie = None
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+        self.fb._count("bytes_sent", len(payload))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Facebook stand-in for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--accounts", help="File with UID|PASSWORD|TOKEN lines")
+    parser.add_argument("--accept-any", action="store_true", help="Accept unknown UIDs")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bad-credentials-rate", type=float, default=0.0)
+    parser.add_argument("--two-factor-rate", type=float, default=1.0)
+    parser.add_argument("--trust-prompt-rate", type=float, default=1.0)
+    parser.add_argument("--checkpoint-rate", type=float, default=0.0)
+    parser.add_argument("--layout", choices=LAYOUTS + ("random",), default="classic")
+    parser.add_argument("--feed-assets", type=int, default=12)
+    parser.add_argument("--asset-kb", type=int, default=48)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s')
+    config = FakeFacebookConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        bad_credentials_rate=args.bad_credentials_rate, two_factor_rate=args.two_factor_rate,
+        trust_prompt_rate=args.trust_prompt_rate, checkpoint_rate=args.checkpoint_rate,
+        layout=args.layout, accept_any=args.accept_any, feed_assets=args.feed_assets,
+        asset_kb=args.asset_kb, seed=args.seed,
+    )
+    server = FakeFacebookServer(config, host=args.host, port=args.port)
+    if args.accounts:
+        with open(args.accounts, encoding="utf-8") as f:
+            logger.info(f"Loaded {server.load_accounts_text(f.read())} accounts")
+    logger.info(f"Config: {asdict(config)}")
+    logger.info(f"Point the app at it with: FB_LOGIN_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
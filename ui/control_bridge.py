@@ -0,0 +1,115 @@
+"""Control bridge - runs control API calls on the GUI thread and publishes row changes"""
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from config import CONTROL_API_CALL_TIMEOUT
+from core.control_api import ControlBackend, ControlError, EventHub
+from .models.account_index import status_category
+
+logger = logging.getLogger(__name__)
+
+
+class QtControlBackend(QObject, ControlBackend):
+    """ControlBackend over MainWindow.
+
+    HTTP threads hand each call to the GUI thread through a queued signal and
+    wait for the result. Row changes reach the event hub from the update bus,
+    once per flush, as ``status`` events::
+
+        {"event": "status", "uid": "...", "status": "✅ Running", "category": "running", "progress": 40}
+    """
+
+    _call = pyqtSignal(object, object)      # callable, Future
+
+    def __init__(self, window, hub: EventHub, parent=None):
+        super().__init__(parent or window)
+        self.window = window
+        self.hub = hub
+        self._call.connect(self._run)
+        window.account_table.update_bus.add_listener(self._on_flush)
+        window.accounts_loaded.connect(
+            lambda count, cancelled: hub.publish({"event": "loaded", "count": count, "cancelled": cancelled}))
+
+    # ----- Thread hop -----
+
+    def _run(self, fn: Callable[[], Any], future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _on_gui(self, fn: Callable[[], Any]) -> Any:
+        future: Future = Future()
+        self._call.emit(fn, future)
+        try:
+            return future.result(timeout=CONTROL_API_CALL_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            raise ControlError("GUI thread busy, try again", 503)
+
+    def _on_flush(self, batch: Dict[str, Dict[str, Any]]) -> None:
+        for uid, fields in batch.items():
+            if 'status' not in fields and 'progress' not in fields:
+                continue
+            event = {"event": "status", "uid": uid}
+            if 'status' in fields:
+                event["status"] = fields['status']
+                event["category"] = status_category(fields['status'])
+            if 'progress' in fields:
+                event["progress"] = fields['progress']
+            self.hub.publish(event)
+
+    # ----- ControlBackend -----
+
+    def _bulk(self, uids: Optional[List[str]], action: Callable[[List[str]], int]) -> Dict:
+        def call() -> Dict:
+            data = self.window.account_data
+            if uids is None:
+                known, unknown = list(data), []
+            else:
+                known = [u for u in uids if u in data]
+                unknown = [u for u in uids if u not in data]
+            return {"requested": len(known) + len(unknown), "started": action(known), "unknown": unknown}
+        return self._on_gui(call)
+
+    def load(self, text: str, append: bool = False) -> Dict:
+        if not self._on_gui(lambda: self.window.load_account_text(text, append, offer_resume=False)):
+            raise ControlError("An import is already running", 409)
+        return {"started": True, "lines": text.count("\n") + 1}
+
+    def launch(self, uids: Optional[List[str]]) -> Dict:
+        return self._bulk(uids, self.window.open_browsers)
+
+    def login(self, uids: Optional[List[str]]) -> Dict:
+        return self._bulk(uids, self.window.login_accounts)
+
+    def close(self, uids: Optional[List[str]]) -> Dict:
+        return self._bulk(uids, self.window.close_browsers)
+
+    def cancel(self, uids: Optional[List[str]]) -> Dict:
+        return self._bulk(uids, self.window.cancel_operations)
+
+    def status(self, uids: Optional[List[str]]) -> Dict:
+        def call() -> Dict:
+            model = self.window.account_table.model
+            browsers = self.window.browser_manager
+            logins = self.window.login_manager
+            rows = model.rows if uids is None else [r for r in map(model.row_data, uids) if r]
+            accounts = {
+                row.account.uid: {
+                    "status": row.status,
+                    "category": status_category(row.status),
+                    "progress": row.progress,
+                    "browser_running": browsers.is_browser_running(row.account.uid),
+                    "logging_in": logins.is_logging_in(row.account.uid),
+                }
+                for row in rows
+            }
+            unknown = [] if uids is None else [u for u in uids if u not in accounts]
+            return {"accounts": accounts, "counts": model.account_index.counts(), "unknown": unknown}
+        return self._on_gui(call)
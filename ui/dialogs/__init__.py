@@ -1,2 +1,6 @@
 """UI Dialogs"""
 from .validation_dialog import ValidationDialog
+from .proxy_dialog import ProxyDialog
+from .log_viewer import LogViewerDialog
+from .broadcast_dialog import BroadcastDialog
+from .thumbnail_dialog import ThumbnailWallDialog
@@ -0,0 +1,177 @@
+"""Broadcast dialog - send one script or navigation to many running browsers"""
+import json
+from typing import Any, Dict, Optional
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QComboBox,
+    QSpinBox, QDoubleSpinBox, QTableWidget, QTableWidgetItem, QHeaderView, QLabel
+)
+from PyQt6.QtGui import QColor
+
+from config import BROADCAST_CONCURRENCY, BROADCAST_TIMEOUT
+from core.broadcast import JS, NAVIGATE, BroadcastAction, BroadcastResult, BroadcastSummary, Broadcaster
+from core.qt_workers import BroadcastWorker
+from ..styles import INPUT_LABEL_STYLE, style_button, COLORS
+
+MAX_VALUE_CHARS = 300
+MODES = [("📜 JavaScript", JS), ("🧭 Navigate to URL", NAVIGATE)]
+
+
+def _display(value: Any) -> str:
+    if isinstance(value, str):
+        text = value
+    else:
+        try:
+            text = json.dumps(value, ensure_ascii=False, default=str)
+        except ValueError:
+            text = repr(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS] + "…"
+
+
+class BroadcastDialog(QDialog):
+    """Runs a script or navigation on the target browsers and streams each result into the grid"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.targets: Dict[str, Any] = {}
+        self.rows: Dict[str, int] = {}
+        self.worker: Optional[BroadcastWorker] = None
+        self.done = 0
+        self.setWindowTitle("📡 Broadcast")
+        self.resize(860, 560)
+        self._setup_ui()
+
+    def _setup_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        self.lbl_targets = QLabel()
+        self.lbl_targets.setStyleSheet(INPUT_LABEL_STYLE)
+        layout.addWidget(self.lbl_targets)
+
+        self.mode = QComboBox()
+        for label, kind in MODES:
+            self.mode.addItem(label, kind)
+        self.mode.currentIndexChanged.connect(self._update_placeholder)
+        layout.addWidget(self.mode)
+
+        self.input_box = QPlainTextEdit()
+        self.input_box.setMaximumHeight(120)
+        layout.addWidget(self.input_box)
+        self._update_placeholder()
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(QLabel("Parallel"))
+        self.spin_concurrency = QSpinBox()
+        self.spin_concurrency.setRange(1, 1000)
+        self.spin_concurrency.setValue(BROADCAST_CONCURRENCY)
+        btn_layout.addWidget(self.spin_concurrency)
+        btn_layout.addWidget(QLabel("Timeout (s)"))
+        self.spin_timeout = QDoubleSpinBox()
+        self.spin_timeout.setRange(0.5, 600)
+        self.spin_timeout.setValue(BROADCAST_TIMEOUT)
+        btn_layout.addWidget(self.spin_timeout)
+
+        self.btn_run = QPushButton("▶️ Run")
+        style_button(self.btn_run, 'success', 90, 11)
+        self.btn_run.clicked.connect(self._run)
+        btn_layout.addWidget(self.btn_run)
+
+        self.btn_cancel = QPushButton("⛔ Cancel")
+        style_button(self.btn_cancel, 'danger', 90, 11)
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self._cancel)
+        btn_layout.addWidget(self.btn_cancel)
+
+        btn_layout.addStretch()
+        self.lbl_summary = QLabel()
+        btn_layout.addWidget(self.lbl_summary)
+        layout.addLayout(btn_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(3)
+        self.table.setHorizontalHeaderLabels(["UID", "Result", "Time"])
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+    def _update_placeholder(self) -> None:
+        if self.mode.currentData() == JS:
+            self.input_box.setPlaceholderText("Function body; use return to send a value back, e.g.\n"
+                                              "return document.title;")
+        else:
+            self.input_box.setPlaceholderText("https://www.facebook.com/")
+
+    def set_targets(self, drivers: Dict[str, Any]) -> None:
+        """Browsers the next run goes to (ignored while a run is in progress)"""
+        if self.is_running():
+            return
+        self.targets = dict(drivers)
+        self.lbl_targets.setText(f"📡 {len(self.targets)} running browsers selected")
+        self._reset_rows()
+        self.lbl_summary.clear()
+
+    def is_running(self) -> bool:
+        return bool(self.worker and self.worker.isRunning())
+
+    def _reset_rows(self) -> None:
+        self.rows = {uid: row for row, uid in enumerate(self.targets)}
+        self.table.setRowCount(len(self.rows))
+        for uid, row in self.rows.items():
+            self.table.setItem(row, 0, QTableWidgetItem(uid))
+            self.table.setItem(row, 1, QTableWidgetItem(""))
+            self.table.setItem(row, 2, QTableWidgetItem(""))
+
+    def _run(self) -> None:
+        payload = self.input_box.toPlainText().strip()
+        if not payload or not self.targets or self.is_running():
+            return
+        self._reset_rows()
+        for row in self.rows.values():
+            self.table.item(row, 1).setText("⏳ Waiting")
+        self.done = 0
+        action = BroadcastAction(self.mode.currentData(), payload)
+        broadcaster = Broadcaster(self.spin_concurrency.value(), self.spin_timeout.value())
+        self.worker = BroadcastWorker(self.targets, action, broadcaster, self)
+        self.worker.result_signal.connect(self._on_result)
+        self.worker.finished_signal.connect(self._on_finished)
+        self.btn_run.setEnabled(False)
+        self.btn_cancel.setEnabled(True)
+        self.lbl_summary.setText(f"⏳ 0/{len(self.targets)}")
+        self.worker.start()
+
+    def _cancel(self) -> None:
+        if self.worker:
+            self.worker.cancel()
+
+    def _on_result(self, result: BroadcastResult) -> None:
+        row = self.rows.get(result.uid)
+        if row is None:
+            return
+        self.done += 1
+        if result.ok:
+            text, color = (_display(result.value) if result.value is not None else "✅"), COLORS['success']
+        else:
+            text, color = f"❌ {result.error}", COLORS['danger']
+        item = self.table.item(row, 1)
+        item.setText(text)
+        item.setToolTip(text)
+        item.setForeground(QColor(color))
+        self.table.item(row, 2).setText(f"{result.elapsed_ms:.0f} ms")
+        self.lbl_summary.setText(f"⏳ {self.done}/{len(self.rows)}")
+
+    def _on_finished(self, summary: Optional[BroadcastSummary]) -> None:
+        self.btn_run.setEnabled(True)
+        self.btn_cancel.setEnabled(False)
+        self.lbl_summary.setText(f"📊 {summary.summary()}" if summary else "❌ Broadcast failed")
+        self.worker.deleteLater()
+        self.worker = None
+
+    def closeEvent(self, event) -> None:
+        if self.is_running():
+            # Cancelling returns within one poll; late browser answers are dropped
+            self.worker.cancel()
+            self.worker.wait(1000)
+        super().closeEvent(event)
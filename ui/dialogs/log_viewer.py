@@ -0,0 +1,76 @@
+"""Account log viewer - live tail of one account's in-memory log lines"""
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+
+from config import LOG_RING_LINES
+from core.log_setup import AccountLogBuffer
+from ..styles import INPUT_LABEL_STYLE, style_button
+
+REFRESH_MS = 500
+
+
+class LogViewerDialog(QDialog):
+    """Shows the last LOG_RING_LINES lines of an account and appends new ones while open"""
+
+    def __init__(self, uid: str, buffer: AccountLogBuffer, parent=None):
+        super().__init__(parent)
+        self.uid = uid
+        self.buffer = buffer
+        self.seen = 0
+        self.setWindowTitle(f"📜 Log - {uid}")
+        self.resize(900, 420)
+        self._setup_ui()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def _setup_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        header = QHBoxLayout()
+        self.lbl_info = QLabel()
+        self.lbl_info.setStyleSheet(INPUT_LABEL_STYLE)
+        header.addWidget(self.lbl_info)
+        header.addStretch()
+        self.btn_clear = QPushButton("🧹 Clear")
+        style_button(self.btn_clear, 'gray', 80, 11)
+        self.btn_clear.clicked.connect(self._clear)
+        header.addWidget(self.btn_clear)
+        layout.addLayout(header)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(LOG_RING_LINES)
+        self.text.setFont(QFont("monospace", 9))
+        layout.addWidget(self.text)
+
+    def refresh(self) -> None:
+        lines, total = self.buffer.tail(self.uid, self.seen)
+        if total < self.seen:
+            self.text.clear()
+        self.seen = total
+        if lines:
+            scrollbar = self.text.verticalScrollBar()
+            at_bottom = scrollbar.value() == scrollbar.maximum()
+            self.text.appendPlainText("\n".join(lines))
+            if at_bottom:
+                scrollbar.setValue(scrollbar.maximum())
+        self.lbl_info.setText(f"💡 Last {LOG_RING_LINES} lines for {self.uid} ({total} logged)")
+
+    def _clear(self) -> None:
+        self.buffer.clear(self.uid)
+        self.text.clear()
+        self.seen = 0
+        self.refresh()
+
+    def showEvent(self, event) -> None:
+        self.refresh()
+        self.timer.start(REFRESH_MS)
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        self.timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,108 @@
+"""Proxy pool dialog - import proxies and watch their health"""
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QLabel
+)
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QColor
+
+from core.proxy_pool import ProxyPool
+from ..styles import INPUT_LABEL_STYLE, style_button, COLORS
+
+
+class ProxyDialog(QDialog):
+    """Import a proxy list, trigger probes and show scores/assignments"""
+
+    probe_requested = pyqtSignal()
+
+    def __init__(self, pool: ProxyPool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.setWindowTitle("🌍 Proxy Pool")
+        self.resize(760, 520)
+        self._setup_ui()
+        self.refresh()
+
+    def _setup_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        hint = QLabel("💡 One proxy per line: host:port, host:port:user:pass, user:pass@host:port or socks5://host:port")
+        hint.setStyleSheet(INPUT_LABEL_STYLE)
+        layout.addWidget(hint)
+
+        self.input_box = QPlainTextEdit()
+        self.input_box.setMaximumHeight(110)
+        layout.addWidget(self.input_box)
+
+        btn_layout = QHBoxLayout()
+        self.btn_import = QPushButton("📥 Import")
+        style_button(self.btn_import, 'primary', 90, 11)
+        self.btn_import.clicked.connect(self._import)
+        btn_layout.addWidget(self.btn_import)
+
+        self.btn_probe = QPushButton("📡 Probe Now")
+        style_button(self.btn_probe, 'success', 100, 11)
+        self.btn_probe.clicked.connect(self.probe_requested.emit)
+        btn_layout.addWidget(self.btn_probe)
+
+        self.btn_remove = QPushButton("🗑️ Remove")
+        style_button(self.btn_remove, 'danger', 90, 11)
+        self.btn_remove.clicked.connect(self._remove_selected)
+        btn_layout.addWidget(self.btn_remove)
+
+        btn_layout.addStretch()
+        self.lbl_summary = QLabel()
+        btn_layout.addWidget(self.lbl_summary)
+        layout.addLayout(btn_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Proxy", "Health", "Latency", "Error rate", "Accounts"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+    def refresh(self) -> None:
+        rows = self.pool.snapshot()
+        self.table.setRowCount(len(rows))
+        healthy = 0
+        for row, (info, load) in enumerate(rows):
+            healthy += info.healthy
+            if info.probes == 0:
+                health, color = "Unprobed", "#64748B"
+            elif info.healthy and info.needs_auth:
+                health, color = "🔒 Healthy, pinned only (auth)", COLORS['warning']
+            elif info.healthy:
+                health, color = "✅ Healthy", COLORS['success']
+            else:
+                health, color = f"❌ {info.last_error[:30] or 'Degraded'}", COLORS['danger']
+            latency = f"{info.latency_ms:.0f} ms" if info.latency_ms is not None else "-"
+            values = [info.url, health, latency, f"{info.error_rate:.0%}", str(load)]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 1:
+                    item.setForeground(QColor(color))
+                self.table.setItem(row, col, item)
+        self.lbl_summary.setText(f"📊 {healthy}/{len(rows)} healthy")
+
+    def set_probing(self, probing: bool) -> None:
+        self.btn_probe.setEnabled(not probing)
+        self.btn_probe.setText("⏳ Probing..." if probing else "📡 Probe Now")
+
+    def _import(self) -> None:
+        added = self.pool.import_text(self.input_box.toPlainText())
+        self.input_box.clear()
+        self.refresh()
+        if added:
+            self.probe_requested.emit()
+
+    def _remove_selected(self) -> None:
+        rows = {index.row() for index in self.table.selectedIndexes()}
+        for row in rows:
+            item = self.table.item(row, 0)
+            if item:
+                self.pool.remove(item.text())
+        self.refresh()
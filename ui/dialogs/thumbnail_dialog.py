@@ -0,0 +1,93 @@
+"""Thumbnail wall dialog - live low-rate screencasts of the running browsers"""
+from typing import Any, Dict, List
+
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel
+from PyQt6.QtCore import QTimer, pyqtSignal
+
+from config import THUMBNAIL_FPS
+from core.qt_workers import ScreencastDecoder
+from core.screencast import ScreencastHub
+from ..models.thumbnail_model import ThumbnailModel
+from ..widgets.thumbnail_wall import ThumbnailWall
+from ..styles import INPUT_LABEL_STYLE
+
+STATS_INTERVAL_MS = 1000
+
+
+class ThumbnailWallDialog(QDialog):
+    """Streams the browsers in view while shown; clicking a tile asks for its real window"""
+
+    browser_activated = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.drivers: Dict[str, Any] = {}
+        self.model = ThumbnailModel(self)
+        # Created on show, stopped on hide: nothing streams while the wall is closed
+        self.hub = None
+        self.decoder = None
+        self._frames_at = 0
+        self.setWindowTitle("🖼️ Browser Wall")
+        self.resize(1100, 720)
+        self._setup_ui()
+
+    def _setup_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+
+        self.lbl_stats = QLabel()
+        self.lbl_stats.setStyleSheet(INPUT_LABEL_STYLE)
+        layout.addWidget(self.lbl_stats)
+
+        self.wall = ThumbnailWall(self.model, self)
+        self.wall.visible_changed.connect(self._watch)
+        self.wall.tile_clicked.connect(self.browser_activated.emit)
+        layout.addWidget(self.wall)
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(STATS_INTERVAL_MS)
+        self.stats_timer.timeout.connect(self._show_stats)
+
+    def set_drivers(self, drivers: Dict[str, Any]) -> None:
+        """Browsers on the wall; tiles of closed ones go away"""
+        self.drivers = dict(drivers)
+        for uid in self.model.set_uids(self.drivers):
+            if self.decoder:
+                self.decoder.forget(uid)
+        if self.hub:
+            self._watch(self.wall.visible_uids())
+        self._show_stats()
+
+    def _watch(self, uids: List[str]) -> None:
+        if self.hub:
+            self.hub.watch({uid: self.drivers[uid] for uid in uids if uid in self.drivers})
+
+    def _show_stats(self) -> None:
+        streaming = len(self.hub.streams) if self.hub else 0
+        frames = self.hub.frames if self.hub else 0
+        fps = (frames - self._frames_at) * 1000 / STATS_INTERVAL_MS
+        self._frames_at = frames
+        self.lbl_stats.setText(f"🖼️ {len(self.drivers)} running browsers · {streaming} in view streaming "
+                               f"(≤{THUMBNAIL_FPS:g} fps each) · {fps:.0f} frames/s · click a tile to show its window")
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self.hub is None:
+            self.decoder = ScreencastDecoder(parent=self)
+            self.decoder.frame_ready.connect(self.model.update_frame)
+            self.decoder.start()
+            self.hub = ScreencastHub(self.decoder.submit)
+            self._frames_at = 0
+            self._watch(self.wall.visible_uids())
+            self.stats_timer.start()
+
+    def hideEvent(self, event) -> None:
+        self.stats_timer.stop()
+        if self.hub:
+            self.hub.stop()
+            self.hub = None
+        if self.decoder:
+            self.decoder.stop()
+            self.decoder.deleteLater()
+            self.decoder = None
+        super().hideEvent(event)
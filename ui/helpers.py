@@ -1,12 +1,20 @@
 """UI helper functions"""
-from typing import Optional
-from PyQt6.QtWidgets import QTableWidget
+from .styles import COLORS
 
 
-def find_row_by_uid(table: QTableWidget, uid: str) -> Optional[int]:
-    """Find table row index by UID"""
-    for row in range(table.rowCount()):
-        item = table.item(row, 1)
-        if item and item.text() == uid:
-            return row
-    return None
+def status_color(status: str) -> str:
+    """Text color for a status string based on its leading icon"""
+    if "✅" in status:
+        return COLORS['success']
+    if "❌" in status or "⛔" in status:
+        return COLORS['danger']
+    if "⏳" in status:
+        return COLORS['warning']
+    return COLORS['text_secondary']
+
+
+def shorten(text: str, limit: int, from_end: bool = False) -> str:
+    """Truncate text for display, keeping the start (or the end) visible"""
+    if len(text) <= limit:
+        return text
+    return "..." + text[-limit:] if from_end else text[:limit] + "..."
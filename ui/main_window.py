@@ -1,19 +1,26 @@
 """Main Window - Modern shell with beautiful UI"""
 import logging
+from typing import Optional
+
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QSplitter, 
     QStatusBar, QMessageBox, QLabel, QHBoxLayout
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from core.account_loader import AccountLoader, Account
 from core.browser_launcher import BrowserManager
 from core.facebook_login import FacebookLoginManager
 from core.enums import BrowserStatus, LoginStatus
+from core.proxy_pool import ProxyPool
+from core.qt_workers import AccountLoadWorker, ProxyProbeWorker, keep_until_finished
+from core.log_setup import AccountLogBuffer
+from core.journal import JobJournal
+from core.concurrency import ConcurrencyController
+from config import CLEANUP_GRACE_MS, PROXY_PROBE_INTERVAL
 from .styles import MAIN_STYLESHEET, COLORS
 from .widgets import InputSection, AccountTable
-from .dialogs import ValidationDialog
 
 logger = logging.getLogger(__name__)
 
@@ -21,17 +28,45 @@ logger = logging.getLogger(__name__)
 class MainWindow(QMainWindow):
     """Modern main application window"""
     
+    accounts_loaded = pyqtSignal(int, bool)     # accounts loaded, cancelled
+    concurrency_changed = pyqtSignal(object)    # ConcurrencyController snapshot (from its thread)
+    
     def __init__(self, browser_manager: BrowserManager = None, 
-                 login_manager: FacebookLoginManager = None):
+                 login_manager: FacebookLoginManager = None,
+                 account_logs: AccountLogBuffer = None,
+                 journal: JobJournal = None,
+                 concurrency: ConcurrencyController = None):
         super().__init__()
+        self.concurrency = concurrency
         self.account_loader = AccountLoader()
         self.browser_manager = browser_manager or BrowserManager(self)
         self.login_manager = login_manager or FacebookLoginManager()
         self.accounts = []
         self.account_data = {}
+        self.proxy_pool = ProxyPool.load()
+        self.launch_proxies = {}
+        self.proxy_probe_worker = None
+        self.proxy_dialog = None
+        self.broadcast_dialog = None
+        self.thumbnail_dialog = None
+        self.load_worker = None
+        self.account_logs = account_logs
+        self.log_viewers = {}
+        self.journal = journal or JobJournal(None)
+        # Unfinished ops left by the previous session, offered once their accounts are loaded
+        self.resume_candidates = self.journal.pending()
+        self.resume_prompt: Optional[QMessageBox] = None
+        self._prompt_resume = True          # False while an import started over the control API runs
+        self.resume_logins = set()
         
         self._setup_ui()
         self._connect_signals()
+        
+        self.proxy_timer = QTimer(self)
+        self.proxy_timer.timeout.connect(self._start_proxy_probe)
+        self.proxy_timer.start(PROXY_PROBE_INTERVAL * 1000)
+        if len(self.proxy_pool):
+            QTimer.singleShot(0, self._start_proxy_probe)
     
     def _setup_ui(self) -> None:
         self.setWindowTitle("🔵 Facebook Account Manager")
@@ -103,11 +138,19 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("✨ Ready - Enter accounts and click 'Load Accounts' to begin")
         
+        self.concurrency_label = QLabel()
+        self.concurrency_label.setStyleSheet("color: #1E40AF; padding: 0 8px;")
+        self.status_bar.addPermanentWidget(self.concurrency_label)
+        self.concurrency_label.setVisible(self.concurrency is not None)
+        if self.concurrency:
+            self._show_concurrency(self.concurrency.snapshot())
+        
         self.setStyleSheet(MAIN_STYLESHEET)
     
     def _connect_signals(self) -> None:
         # Input section
         self.input_section.load_clicked.connect(self._load_accounts)
+        self.input_section.cancel_load_clicked.connect(self._cancel_load)
         self.input_section.clear_clicked.connect(self._clear_input)
         self.input_section.validate_clicked.connect(self._validate_accounts)
         
@@ -118,40 +161,128 @@ class MainWindow(QMainWindow):
         tb.open_selected_clicked.connect(self._open_selected_browsers)
         tb.close_selected_clicked.connect(self._close_selected_browsers)
         tb.close_all_clicked.connect(self._close_all_browsers)
+        tb.cancel_selected_clicked.connect(self._cancel_selected)
         tb.clear_table_clicked.connect(self._clear_table)
         tb.login_selected_clicked.connect(self._login_selected)
+        tb.proxies_clicked.connect(self._show_proxy_dialog)
+        tb.broadcast_clicked.connect(self._show_broadcast_dialog)
+        tb.wall_clicked.connect(self._show_thumbnail_wall)
         tb.exit_clicked.connect(self.close)
         
         # Table
         self.account_table.open_chrome_clicked.connect(self._open_chrome)
         self.account_table.login_clicked.connect(self._login_single)
+        self.account_table.log_requested.connect(self._show_account_log)
         
         # Browser manager
         self.browser_manager.browser_starting.connect(self._on_browser_starting)
         self.browser_manager.browser_started.connect(self._on_browser_started)
         self.browser_manager.browser_error.connect(self._on_browser_error)
         self.browser_manager.browser_closed.connect(self._on_browser_closed)
+        self.browser_manager.browser_cancelled.connect(self._on_browser_cancelled)
+        
+        # Adaptive limits (emitted on the controller thread, shown on the GUI thread)
+        if self.concurrency:
+            self.concurrency_changed.connect(self._show_concurrency)
+            self.concurrency.subscribe(self._notify_concurrency)
     
     def _load_accounts(self) -> None:
         text = self.input_section.get_text()
         if not text:
             self._show_warning("Please enter account data first!")
             return
+        self.load_account_text(text)
+    
+    def load_account_text(self, text: str, append: bool = False, offer_resume: bool = True) -> bool:
+        """Import accounts in the background; False if an import is already running.
+
+        ``offer_resume`` off (control API imports) skips the resume prompt:
+        nobody may be at the screen to answer it.
+        """
+        if self.load_worker and self.load_worker.isRunning():
+            return False
+        self._prompt_resume = offer_resume
         
-        self.account_table.clear()
-        self.accounts = self.account_loader.load_accounts(text)
-        
-        if not self.accounts:
-            self._show_warning("No valid accounts found!\nCheck format: UID|PASSWORD|TOKEN")
-            return
+        if not append:
+            self.account_table.clear()
+            self.accounts = []
+            self.account_data.clear()
+            self.input_section.set_count(0)
+        self.input_section.set_loading(True)
+        self.status_bar.showMessage("⏳ Loading accounts...")
         
-        self.account_data.clear()
-        for acc in self.accounts:
-            self.account_table.add_account(acc)
+        self.load_worker = AccountLoadWorker(self.account_loader, text)
+        self.load_worker.batch_signal.connect(self._on_accounts_batch)
+        self.load_worker.progress_signal.connect(self.input_section.set_progress)
+        self.load_worker.finished_signal.connect(self._on_accounts_loaded)
+        self.load_worker.start()
+        return True
+    
+    def _on_accounts_batch(self, batch: list) -> None:
+        batch = [acc for acc in batch if acc.uid not in self.account_data]
+        self.accounts.extend(batch)
+        self.account_table.add_accounts(batch)
+        for acc in batch:
             self.account_data[acc.uid] = acc
-        
+        pinned = [(acc.uid, acc.proxy) for acc in batch if acc.proxy]
+        if pinned:
+            self.proxy_pool.pin_many(pinned)
         self.input_section.set_count(len(self.accounts))
-        self.status_bar.showMessage(f"✅ Loaded {len(self.accounts)} accounts successfully")
+    
+    def _on_accounts_loaded(self, count: int, cancelled: bool) -> None:
+        self.input_section.set_loading(False)
+        if cancelled:
+            self.status_bar.showMessage(f"⛔ Loading cancelled - {count} accounts loaded")
+        elif not count:
+            self._show_warning("No valid accounts found!\nCheck format: UID|PASSWORD|TOKEN")
+        else:
+            self.status_bar.showMessage(f"✅ Loaded {count} accounts successfully")
+        self.accounts_loaded.emit(count, cancelled)
+        if count and self._prompt_resume:
+            self._offer_resume()
+    
+    def _offer_resume(self) -> None:
+        """Offer to finish what the last session left open, for the accounts just loaded"""
+        if self.resume_prompt:
+            return
+        pending = {uid: ops for uid, ops in self.resume_candidates.items()
+                   if uid in self.account_data and not self.browser_manager.is_browser_running(uid)
+                   and not self.browser_manager.is_browser_launching(uid)}
+        if not pending:
+            return
+        for uid in pending:
+            del self.resume_candidates[uid]
+        logins = sum('login' in ops for ops in pending.values())
+        # Non-modal: the GUI thread (and control API calls waiting on it) keeps running meanwhile
+        self.resume_prompt = QMessageBox(QMessageBox.Icon.Question, "♻️ Resume",
+                                         f"{len(pending)} accounts have unfinished operations from the last "
+                                         f"session ({len(pending) - logins} opens, {logins} logins).\n\n"
+                                         f"Resume them?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, self)
+        self.resume_prompt.setWindowModality(Qt.WindowModality.NonModal)
+        self.resume_prompt.finished.connect(lambda _result: self._on_resume_answered(pending))
+        self.resume_prompt.show()
+    
+    def _on_resume_answered(self, pending) -> None:
+        prompt, self.resume_prompt = self.resume_prompt, None
+        prompt.deleteLater()
+        clicked = prompt.clickedButton()
+        if clicked is not None and prompt.standardButton(clicked) == QMessageBox.StandardButton.Yes:
+            count = self.resume_jobs(pending)
+            self.status_bar.showMessage(f"♻️ Resuming {count} accounts...")
+        else:
+            self.journal.drop(pending)
+    
+    def resume_jobs(self, pending) -> int:
+        """Re-run unfinished ops: open the browser, then log in where a login was pending"""
+        for uid, ops in pending.items():
+            if 'login' in ops:
+                self.resume_logins.add(uid)
+        return self.open_browsers(list(pending))
+    
+    def _cancel_load(self) -> None:
+        if self.load_worker and self.load_worker.isRunning():
+            self.load_worker.cancel()
     
     def _clear_input(self) -> None:
         self.input_section.clear()
@@ -163,31 +294,66 @@ class MainWindow(QMainWindow):
             self._show_warning("Please enter account data first!")
             return
         valid, invalid, errors = self.account_loader.validate_accounts(text)
+        from .dialogs import ValidationDialog
         ValidationDialog.show(self, valid, invalid, errors)
     
     def _open_chrome(self, uid: str, profile_path: str) -> None:
         if self.browser_manager.is_browser_running(uid):
             self._show_info(f"Browser already running for UID: {uid}")
             return
-        self.browser_manager.launch_browser(uid, profile_path)
+        self._launch_browser(uid, profile_path)
         self.status_bar.showMessage(f"🚀 Launching browser for {uid}...")
     
     def _open_selected_browsers(self) -> None:
+        count = self.open_browsers(self.account_table.get_selected_uids())
+        self.status_bar.showMessage(f"🚀 Launching {count} browsers..." if count else "⚠️ No accounts to launch")
+    
+    def open_browsers(self, uids) -> int:
+        """Launch browsers for loaded accounts that are not running or launching"""
         count = 0
-        for uid in self.account_table.get_selected_uids():
-            info = self.account_table.get_account_info(uid)
-            if info and not self.browser_manager.is_browser_running(uid):
-                self.browser_manager.launch_browser(info[0], info[1])
+        for uid in uids:
+            acc = self.account_data.get(uid)
+            if acc and not self.browser_manager.is_browser_running(uid) \
+                    and not self.browser_manager.is_browser_launching(uid):
+                self._launch_browser(uid, acc.profile_path)
                 count += 1
-        self.status_bar.showMessage(f"🚀 Launching {count} browsers..." if count else "⚠️ No accounts to launch")
+        return count
+    
+    def _launch_browser(self, uid: str, profile_path: str) -> None:
+        proxy = self.proxy_pool.assign(uid) if len(self.proxy_pool) else None
+        if len(self.proxy_pool) and not proxy:
+            logger.warning(f"[{uid}] No healthy proxy available, launching without proxy")
+        self.launch_proxies[uid] = proxy
+        self.journal.record(uid, "open", "requested")
+        if not self.browser_manager.is_browser_launching(uid):
+            # Until a launch slot is free; browser_starting replaces it
+            self.account_table.update_browser_button(uid, "⏳ Queued", False, COLORS['warning'])
+            self.account_table.update_status(uid, BrowserStatus.QUEUED.value)
+        self.browser_manager.launch_browser(uid, profile_path, proxy)
     
     def _close_selected_browsers(self) -> None:
+        count = self.close_browsers(self.account_table.get_selected_uids())
+        self.status_bar.showMessage(f"⏹️ Closed {count} browsers" if count else "⚠️ No running browsers selected")
+    
+    def close_browsers(self, uids) -> int:
         count = 0
-        for uid in self.account_table.get_selected_uids():
+        for uid in uids:
             if self.browser_manager.is_browser_running(uid):
                 self.browser_manager.close_browser(uid)
                 count += 1
-        self.status_bar.showMessage(f"⏹️ Closed {count} browsers" if count else "⚠️ No running browsers selected")
+        return count
+    
+    def _cancel_selected(self) -> None:
+        count = self.cancel_operations(self.account_table.get_selected_uids())
+        self.status_bar.showMessage(f"⛔ Cancelled {count} operations" if count else "⚠️ Nothing in progress for selected accounts")
+    
+    def cancel_operations(self, uids) -> int:
+        """Cancel launches/logins in progress"""
+        count = 0
+        for uid in uids:
+            if self.login_manager.cancel_login(uid) or self.browser_manager.cancel_launch(uid):
+                count += 1
+        return count
     
     def _close_all_browsers(self) -> None:
         self.browser_manager.close_all_browsers()
@@ -198,30 +364,54 @@ class MainWindow(QMainWindow):
         if QMessageBox.question(self, "🗑️ Confirm", "Clear table and close all browsers?",
                                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                                 ) == QMessageBox.StandardButton.Yes:
+            self._cancel_load()
             self._close_all_browsers()
             self.account_table.clear()
             self.accounts.clear()
+            self.account_data.clear()
+            self._clear_logs()
             self.input_section.set_count(0)
             self.status_bar.showMessage("🗑️ Table cleared")
     
     def _on_browser_starting(self, uid: str) -> None:
+        self.journal.record(uid, "open", "starting")
         self.account_table.update_browser_button(uid, "⏳ Opening...", False, COLORS['warning'])
         self.account_table.update_status(uid, BrowserStatus.LAUNCHING.value)
     
     def _on_browser_started(self, uid: str) -> None:
+        self.journal.record(uid, "open", "done")
         self.account_table.update_browser_button(uid, "✅ Running", False, COLORS['success'])
         self.account_table.update_status(uid, BrowserStatus.RUNNING.value)
         self.status_bar.showMessage(f"✅ Browser started for {uid}")
+        if uid in self.resume_logins:
+            self.resume_logins.discard(uid)
+            acc = self.account_data.get(uid)
+            driver = self.browser_manager.drivers.get(uid)
+            if acc and driver and not self.login_manager.is_logging_in(uid):
+                self._start_login(acc, driver)
     
     def _on_browser_closed(self, uid: str) -> None:
+        self.journal.record(uid, "open", "closed")
+        self.resume_logins.discard(uid)
         self.account_table.update_browser_button(uid, "🌐 Open", True, COLORS['success'])
         self.account_table.update_status(uid, BrowserStatus.CLOSED.value)
         self.status_bar.showMessage(f"⏹️ Browser closed for {uid}")
     
+    def _on_browser_cancelled(self, uid: str) -> None:
+        self.journal.record(uid, "open", "cancelled")
+        self.resume_logins.discard(uid)
+        self.account_table.update_browser_button(uid, "🌐 Open", True, COLORS['success'])
+        self.account_table.update_status(uid, BrowserStatus.CANCELLED.value)
+    
     def _on_browser_error(self, uid: str, error: str) -> None:
+        self.journal.record(uid, "open", "error", error=error[:200])
+        self.resume_logins.discard(uid)
         self.account_table.update_browser_button(uid, "🌐 Open", True, COLORS['success'])
         self.account_table.update_status(uid, BrowserStatus.ERROR.value)
         logger.warning(f"Browser error for {uid}: {error}")
+        proxy = self.launch_proxies.get(uid)
+        if proxy:
+            self.proxy_pool.report_failure(proxy, error)
         self._show_error(f"Failed to launch browser for UID: {uid}\n\n{error}")
     
     def _login_single(self, uid: str) -> None:
@@ -234,32 +424,157 @@ class MainWindow(QMainWindow):
             self._start_login(acc, driver)
     
     def _login_selected(self) -> None:
+        count = self.login_accounts(self.account_table.get_selected_uids())
+        self.status_bar.showMessage(f"🔐 Starting login for {count} accounts..." if count else "⚠️ No accounts to login")
+    
+    def login_accounts(self, uids) -> int:
+        """Start logins on running browsers that are not already logging in"""
         count = 0
-        for uid in self.account_table.get_selected_uids():
+        for uid in uids:
             if self.browser_manager.is_browser_running(uid) and not self.login_manager.is_logging_in(uid):
                 acc = self.account_data.get(uid)
                 driver = self.browser_manager.drivers.get(uid)
                 if acc and driver:
                     self._start_login(acc, driver)
                     count += 1
-        self.status_bar.showMessage(f"🔐 Starting login for {count} accounts..." if count else "⚠️ No accounts to login")
+        return count
     
     def _start_login(self, acc: Account, driver) -> None:
-        self.account_table.update_status(acc.uid, LoginStatus.LOGGING_IN.value)
-        self.account_table.update_login_button(acc.uid, "⏳ ...", False, COLORS['warning'])
+        table = self.account_table
+        table.update_status(acc.uid, LoginStatus.QUEUED.value)     # Until the worker reports its first step
+        table.update_progress(acc.uid, 0)
+        table.update_login_button(acc.uid, "⏳ ...", False, COLORS['warning'])
+        journal = self.journal
+        journal.record(acc.uid, "login", "requested")
         self.login_manager.start_login(
             driver=driver, uid=acc.uid, password=acc.password, token_2fa=acc.token,
-            status_callback=lambda u, s: self.account_table.update_status(u, s),
+            status_callback=table.update_status,
+            progress_callback=table.update_progress,
             success_callback=lambda u: (
-                self.account_table.update_status(u, LoginStatus.SUCCESS.value),
-                self.account_table.update_login_button(u, "✅ Done", False, COLORS['success'])
+                journal.record(u, "login", "done"),
+                table.update_status(u, LoginStatus.SUCCESS.value),
+                table.update_login_button(u, "✅ Done", False, COLORS['success'])
             ),
             error_callback=lambda u, e: (
-                self.account_table.update_status(u, f"❌ {e[:25]}..."),
-                self.account_table.update_login_button(u, "🔐 Login", True, COLORS['purple'])
-            )
+                journal.record(u, "login", "error"),
+                table.update_status(u, f"❌ {e[:25]}..."),
+                table.update_progress(u, 0),
+                table.update_login_button(u, "🔐 Login", True, COLORS['purple'])
+            ),
+            finished_callback=self._on_login_finished,
+            cancelled_callback=lambda u: (
+                journal.record(u, "login", "cancelled"),
+                table.update_status(u, LoginStatus.CANCELLED.value),
+                table.update_progress(u, 0),
+                table.update_login_button(u, "🔐 Login", True, COLORS['purple'])
+            ),
+            # Step updates go straight from the worker thread into the update bus
+            update_connection=Qt.ConnectionType.DirectConnection
         )
     
+    def _on_login_finished(self, uid: str) -> None:
+        stats = self.login_manager.get_blocking_stats(uid)
+        if stats:
+            self.status_bar.showMessage(f"🔐 Login finished for {uid} - {stats.summary()}")
+    
+    def _notify_concurrency(self, snapshot: dict) -> None:
+        self.concurrency_changed.emit(snapshot)
+    
+    def _show_concurrency(self, snapshot: dict) -> None:
+        launch, login = snapshot["launch"], snapshot["login"]
+        self.concurrency_label.setText(f"⚙️ Launch {launch['limit']} ({launch['reason']}) · "
+                                       f"Login {login['limit']} ({login['reason']})")
+        host = snapshot["host"]
+        lines = [f"{kind.title()}: {s['active']} running, {s['waiting']} waiting, limit {s['limit']}"
+                 for kind, s in (("launch", launch), ("login", login))]
+        if host["mem_available_mb"] is not None:
+            lines.append(f"Memory available: {host['mem_available_mb']:.0f} MB")
+        if host["load_per_cpu"] is not None:
+            lines.append(f"Load per CPU: {host['load_per_cpu']:.2f}")
+        for resource, value in (host["pressure"] or {}).items():
+            lines.append(f"PSI {resource}: {value:.1f}%")
+        self.concurrency_label.setToolTip("\n".join(lines))
+    
+    def _show_proxy_dialog(self) -> None:
+        if self.proxy_dialog is None:
+            from .dialogs import ProxyDialog
+            self.proxy_dialog = ProxyDialog(self.proxy_pool, self)
+            self.proxy_dialog.probe_requested.connect(self._start_proxy_probe)
+        self.proxy_dialog.refresh()
+        self.proxy_dialog.show()
+        self.proxy_dialog.raise_()
+    
+    def _show_broadcast_dialog(self) -> None:
+        drivers = {}
+        for uid in self.account_table.get_selected_uids():
+            driver = self.browser_manager.get_driver(uid)
+            # Farm drivers live in worker processes and cannot run scripts from here
+            if driver is not None and hasattr(driver, "run_js"):
+                drivers[uid] = driver
+        if not drivers:
+            self._show_warning("Select accounts with running browsers first!")
+            return
+        if self.broadcast_dialog is None:
+            from .dialogs import BroadcastDialog
+            self.broadcast_dialog = BroadcastDialog(self)
+        self.broadcast_dialog.set_targets(drivers)
+        self.broadcast_dialog.show()
+        self.broadcast_dialog.raise_()
+    
+    def _show_thumbnail_wall(self) -> None:
+        # Farm browsers live in worker processes and cannot be screencast from here
+        if not hasattr(self.browser_manager, "show_browser"):
+            self._show_warning("The browser wall only shows browsers run by this process (not --farm)")
+            return
+        if self.thumbnail_dialog is None:
+            from .dialogs import ThumbnailWallDialog
+            self.thumbnail_dialog = ThumbnailWallDialog(self)
+            self.thumbnail_dialog.browser_activated.connect(self.browser_manager.show_browser)
+            self.browser_manager.browser_started.connect(self._refresh_thumbnail_wall)
+            self.browser_manager.browser_closed.connect(self._refresh_thumbnail_wall)
+        self._refresh_thumbnail_wall()
+        self.thumbnail_dialog.show()
+        self.thumbnail_dialog.raise_()
+    
+    def _refresh_thumbnail_wall(self, _uid: str = "") -> None:
+        self.thumbnail_dialog.set_drivers(self.browser_manager.drivers)
+    
+    def _show_account_log(self, uid: str) -> None:
+        if self.account_logs is None:
+            self._show_info("Account logs are not captured in this session")
+            return
+        viewer = self.log_viewers.get(uid)
+        if viewer is None:
+            from .dialogs import LogViewerDialog
+            viewer = self.log_viewers[uid] = LogViewerDialog(uid, self.account_logs, self)
+        viewer.show()
+        viewer.raise_()
+    
+    def _clear_logs(self) -> None:
+        for viewer in self.log_viewers.values():
+            viewer.close()
+            viewer.deleteLater()
+        self.log_viewers.clear()
+        if self.account_logs is not None:
+            self.account_logs.clear()
+    
+    def _start_proxy_probe(self) -> None:
+        if not len(self.proxy_pool) or (self.proxy_probe_worker and self.proxy_probe_worker.isRunning()):
+            return
+        self.proxy_probe_worker = ProxyProbeWorker(self.proxy_pool, self)
+        self.proxy_probe_worker.finished_signal.connect(self._on_proxy_probe_finished)
+        self.proxy_probe_worker.start()
+        if self.proxy_dialog:
+            self.proxy_dialog.set_probing(True)
+    
+    def _on_proxy_probe_finished(self, rotated: list) -> None:
+        if self.proxy_dialog:
+            self.proxy_dialog.set_probing(False)
+            self.proxy_dialog.refresh()
+        if rotated:
+            logger.info(f"Rotated proxies for {len(rotated)} accounts: {rotated}")
+            self.status_bar.showMessage(f"🌍 Rotated degraded proxies for {len(rotated)} accounts (applies on next launch)")
+    
     def _show_warning(self, msg: str) -> None:
         QMessageBox.warning(self, "⚠️ Warning", msg)
     
@@ -270,6 +585,20 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "❌ Error", msg)
     
     def closeEvent(self, event) -> None:
+        self.proxy_timer.stop()
+        if self.concurrency:
+            self.concurrency.unsubscribe(self._notify_concurrency)
+        if self.proxy_probe_worker and self.proxy_probe_worker.isRunning():
+            self.proxy_probe_worker.cancel()
+            if not self.proxy_probe_worker.wait(CLEANUP_GRACE_MS):
+                keep_until_finished(self.proxy_probe_worker)
+        if self.load_worker and self.load_worker.isRunning():
+            self.load_worker.cancel()
+            self.load_worker.wait(2000)
+        if self.broadcast_dialog:
+            self.broadcast_dialog.close()
+        if self.thumbnail_dialog:
+            self.thumbnail_dialog.close()
         self.browser_manager.cleanup()
         self.login_manager.cleanup()
         event.accept()
@@ -0,0 +1,4 @@
+"""UI Models"""
+from .account_model import AccountTableModel, AccountRow, ButtonState
+from .account_index import AccountIndex, STATUS_CATEGORIES, status_category
+from .thumbnail_model import ThumbnailModel
@@ -0,0 +1,98 @@
+"""Account index - sorted uid prefix search and per-status membership sets"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.enums import BrowserStatus, LoginStatus
+
+# Status filter categories, in chip order
+IDLE, BUSY, RUNNING, LOGGED_IN, FAILED, CANCELLED = (
+    'idle', 'busy', 'running', 'logged_in', 'failed', 'cancelled'
+)
+STATUS_CATEGORIES = (IDLE, BUSY, RUNNING, LOGGED_IN, FAILED, CANCELLED)
+
+_IDLE_STATUSES = {BrowserStatus.READY.value, BrowserStatus.CLOSED.value, LoginStatus.IDLE.value}
+
+
+def status_category(status: str) -> str:
+    """Map a free-form status string to its filter category"""
+    if status in _IDLE_STATUSES:
+        return IDLE
+    if status == BrowserStatus.RUNNING.value:
+        return RUNNING
+    if status == LoginStatus.SUCCESS.value:
+        return LOGGED_IN
+    if status.startswith("❌"):
+        return FAILED
+    if status.startswith("⛔"):
+        return CANCELLED
+    return BUSY
+
+
+class AccountIndex:
+    """Incremental indexes kept in step with the model, so filters never scan rows"""
+
+    def __init__(self):
+        self._sorted: List[str] = []
+        self._category: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {c: set() for c in STATUS_CATEGORIES}
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add_many(self, uids: Iterable[str], category: str = IDLE) -> None:
+        uids = list(uids)
+        if len(uids) > 64:
+            self._sorted.extend(uids)
+            self._sorted.sort()
+        else:
+            for uid in uids:
+                insort(self._sorted, uid)
+        for uid in uids:
+            self._category[uid] = category
+        self.members[category].update(uids)
+
+    def clear(self) -> None:
+        self._sorted.clear()
+        self._category.clear()
+        for members in self.members.values():
+            members.clear()
+
+    def reset_status(self, category: str) -> None:
+        """Move every account into one category (e.g. after closing all browsers)"""
+        for members in self.members.values():
+            members.clear()
+        self.members[category].update(self._sorted)
+        self._category = dict.fromkeys(self._sorted, category)
+
+    def set_status(self, uid: str, status: str) -> bool:
+        """Record a status transition, return True if the category changed"""
+        old = self._category.get(uid)
+        if old is None:
+            return False
+        new = status_category(status)
+        if new == old:
+            return False
+        self.members[old].discard(uid)
+        self.members[new].add(uid)
+        self._category[uid] = new
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        return {c: len(m) for c, m in self.members.items()}
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        lo = bisect_left(self._sorted, prefix)
+        hi = bisect_left(self._sorted, prefix + "\U0010ffff", lo)
+        return self._sorted[lo:hi]
+
+    def query(self, prefix: str = "", category: Optional[str] = None) -> Optional[Iterable[str]]:
+        """UIDs matching prefix and category, or None when nothing is filtered"""
+        if not prefix and not category:
+            return None
+        if not prefix:
+            return self.members[category]
+        matches = self.with_prefix(prefix)
+        if category:
+            members = self.members[category]
+            matches = [uid for uid in matches if uid in members]
+        return matches
@@ -0,0 +1,333 @@
+"""Account table model - virtualized rows with an O(1) uid -> row index"""
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from core.account_loader import Account
+from core.enums import BrowserStatus
+from ..helpers import status_color, shorten
+from .account_index import IDLE, AccountIndex, status_category
+from ..styles import COLORS
+
+
+class ButtonState:
+    """Immutable text/enabled/color of a painted cell button"""
+    __slots__ = ('text', 'enabled', 'color')
+
+    def __init__(self, text: str, enabled: bool, color: str):
+        self.text = text
+        self.enabled = enabled
+        self.color = color
+
+
+@lru_cache(maxsize=64)
+def button_state(text: str, enabled: bool, color: str) -> ButtonState:
+    """Interned button states, shared by every row in the same state"""
+    return ButtonState(text, enabled, color)
+
+
+@lru_cache(maxsize=64)
+def qcolor(color: str) -> QColor:
+    return QColor(color)
+
+
+OPEN_BUTTON = button_state("🌐 Open", True, COLORS['success'])
+LOGIN_BUTTON = button_state("🔐 Login", True, COLORS['purple'])
+
+
+class AccountRow:
+    """Per-account view state"""
+    __slots__ = ('account', 'checked', 'browser_button', 'login_button', 'status', 'progress')
+
+    def __init__(self, account: Account):
+        self.account = account
+        self.checked = False
+        self.browser_button = OPEN_BUTTON
+        self.login_button = LOGIN_BUTTON
+        self.status = BrowserStatus.READY.value
+        self.progress = 0
+
+
+class AccountTableModel(QAbstractTableModel):
+    """Table model over AccountRow objects; the view only asks for visible cells.
+
+    An optional filter narrows the view to a subset of source rows. View rows
+    map to source rows through the sorted ``_visible`` list, which is None
+    exactly when no filter is set.
+    """
+
+    # Above this many rows entering/leaving a category filter in one batch, a
+    # model reset is cheaper than per-row insert/remove notifications
+    INCREMENTAL_MOVE_LIMIT = 64
+
+    HEADERS = ["✓", "UID", "Password", "Token", "Profile", "Browser", "Login", "Status"]
+    COL_CHECK, COL_UID, COL_PASSWORD, COL_TOKEN, COL_PROFILE, COL_BROWSER, COL_LOGIN, COL_STATUS = range(8)
+    ButtonRole = Qt.ItemDataRole.UserRole + 1
+    ProgressRole = Qt.ItemDataRole.UserRole + 2
+
+    status_counts_changed = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[AccountRow] = []
+        self.account_index = AccountIndex()
+        self._row_by_uid: Dict[str, int] = {}
+        self._visible: Optional[List[int]] = None
+        self._filter_prefix = ""
+        self._filter_category: Optional[str] = None
+
+    # ----- Qt model interface -----
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self._visible is None else len(self._visible)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.COL_CHECK:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self.row_at(index.row())
+        col = index.column()
+        acc = row.account
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == self.COL_UID:
+                return acc.uid
+            if col == self.COL_PASSWORD:
+                return "••••••••"
+            if col == self.COL_TOKEN:
+                return shorten(acc.token, 16)
+            if col == self.COL_PROFILE:
+                return shorten(acc.profile_path, 30, from_end=True)
+            if col == self.COL_STATUS:
+                return row.status
+        elif role == Qt.ItemDataRole.CheckStateRole and col == self.COL_CHECK:
+            return Qt.CheckState.Checked if row.checked else Qt.CheckState.Unchecked
+        elif role == self.ButtonRole:
+            if col == self.COL_BROWSER:
+                return row.browser_button
+            if col == self.COL_LOGIN:
+                return row.login_button
+        elif role == self.ProgressRole and col == self.COL_STATUS:
+            return row.progress
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if col == self.COL_UID:
+                return qcolor("#1E40AF")
+            if col in (self.COL_PASSWORD, self.COL_TOKEN):
+                return qcolor("#64748B")
+            if col == self.COL_PROFILE:
+                return qcolor("#94A3B8")
+            if col == self.COL_STATUS:
+                return qcolor(status_color(row.status))
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if col == self.COL_PASSWORD:
+                return "Click to reveal"
+            if col == self.COL_TOKEN:
+                return acc.token
+            if col == self.COL_PROFILE:
+                return acc.profile_path
+        elif role == Qt.ItemDataRole.UserRole and col == self.COL_PASSWORD:
+            return acc.password
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if index.isValid() and index.column() == self.COL_CHECK and role == Qt.ItemDataRole.CheckStateRole:
+            self.row_at(index.row()).checked = Qt.CheckState(value) == Qt.CheckState.Checked
+            self.dataChanged.emit(index, index, [role])
+            return True
+        return False
+
+    # ----- Row management -----
+
+    def add_accounts(self, accounts: Iterable[Account]) -> None:
+        """Append accounts in one insert; duplicate UIDs are skipped"""
+        new_rows = []
+        seen = set()
+        for acc in accounts:
+            if acc.uid in self._row_by_uid or acc.uid in seen:
+                continue
+            seen.add(acc.uid)
+            new_rows.append(AccountRow(acc))
+        if not new_rows:
+            return
+        first = len(self.rows)
+        if self._visible is None:
+            shown = range(first, first + len(new_rows))
+        else:
+            # New rows sit after every existing row, so matches append to the view
+            shown = [first + offset for offset, row in enumerate(new_rows)
+                     if self._matches(row.account.uid, IDLE)]
+        if shown:
+            view_first = self.rowCount()
+            self.beginInsertRows(QModelIndex(), view_first, view_first + len(shown) - 1)
+        for offset, row in enumerate(new_rows):
+            self._row_by_uid[row.account.uid] = first + offset
+        self.rows.extend(new_rows)
+        self.account_index.add_many(seen)
+        if shown:
+            if self._visible is not None:
+                self._visible.extend(shown)
+            self.endInsertRows()
+        self.status_counts_changed.emit(self.account_index.counts())
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.rows.clear()
+        self.account_index.clear()
+        self._row_by_uid.clear()
+        if self._visible is not None:
+            self._visible = []
+        self.endResetModel()
+        self.status_counts_changed.emit(self.account_index.counts())
+
+    def row_of(self, uid: str) -> Optional[int]:
+        return self._row_by_uid.get(uid)
+
+    def row_data(self, uid: str) -> Optional[AccountRow]:
+        row = self._row_by_uid.get(uid)
+        return self.rows[row] if row is not None else None
+
+    def row_at(self, view_row: int) -> AccountRow:
+        """AccountRow shown at a view row (honours the filter)"""
+        return self.rows[view_row if self._visible is None else self._visible[view_row]]
+
+    def _to_view_row(self, source_row: int) -> Optional[int]:
+        visible = self._visible
+        if visible is None:
+            return source_row
+        row = bisect_left(visible, source_row)
+        return row if row < len(visible) and visible[row] == source_row else None
+
+    # ----- Filtering -----
+
+    @property
+    def is_filtered(self) -> bool:
+        return bool(self._filter_prefix or self._filter_category)
+
+    def _matches(self, uid: str, category: str) -> bool:
+        """Whether a row passes the current filter"""
+        if self._filter_category and category != self._filter_category:
+            return False
+        return uid.startswith(self._filter_prefix)
+
+    def set_filter(self, prefix: str = "", category: Optional[str] = None) -> None:
+        """Show only rows whose uid starts with prefix and whose status is in category"""
+        self._filter_prefix = prefix.strip()
+        self._filter_category = category or None
+        self._refilter()
+
+    def _refilter(self) -> None:
+        uids = self.account_index.query(self._filter_prefix, self._filter_category)
+        self.beginResetModel()
+        if uids is None:
+            self._visible = None
+        else:
+            row_by_uid = self._row_by_uid
+            self._visible = sorted(row_by_uid[uid] for uid in uids)
+        self.endResetModel()
+
+    def _move_visibility(self, entering: List[int], leaving: List[int]) -> None:
+        """Insert/remove single view rows for rows whose category filter match changed"""
+        if len(entering) + len(leaving) > self.INCREMENTAL_MOVE_LIMIT:
+            self._refilter()
+            return
+        visible = self._visible
+        for source in leaving:
+            row = self._to_view_row(source)
+            if row is None:
+                continue
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del visible[row]
+            self.endRemoveRows()
+        for source in entering:
+            row = bisect_left(visible, source)
+            if row < len(visible) and visible[row] == source:
+                continue
+            self.beginInsertRows(QModelIndex(), row, row)
+            insort(visible, source)
+            self.endInsertRows()
+
+    # ----- Bulk and per-row state -----
+
+    def set_all_checked(self, checked: bool) -> None:
+        """Check/uncheck every shown row; checking also clears rows hidden by the filter"""
+        if not self.rows:
+            return
+        if self._visible is None or not checked:
+            for row in self.rows:
+                row.checked = checked
+        else:
+            shown = set(self._visible)
+            for source, row in enumerate(self.rows):
+                row.checked = source in shown
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, self.COL_CHECK), self.index(self.rowCount() - 1, self.COL_CHECK),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+    def checked_uids(self) -> List[str]:
+        return [row.account.uid for row in self.rows if row.checked]
+
+    def apply_updates(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Apply coalesced uid -> {field: value} changes as one dataChanged range"""
+        changed: List[int] = []
+        entering: List[int] = []
+        leaving: List[int] = []
+        moved = False
+        category_filter = self._filter_category
+        for uid, fields in updates.items():
+            source = self._row_by_uid.get(uid)
+            if source is None:
+                continue
+            state = self.rows[source]
+            for name, value in fields.items():
+                setattr(state, name, value)
+            changed.append(source)
+            if 'status' in fields and self.account_index.set_status(uid, state.status):
+                moved = True
+                if category_filter and uid.startswith(self._filter_prefix):
+                    if status_category(state.status) == category_filter:
+                        entering.append(source)
+                    else:
+                        leaving.append(source)
+        if moved:
+            self.status_counts_changed.emit(self.account_index.counts())
+        if entering or leaving:
+            self._move_visibility(entering, leaving)
+        first, last = len(self.rows), -1
+        for source in changed:
+            row = self._to_view_row(source)
+            if row is not None:
+                first = min(first, row)
+                last = max(last, row)
+        if last >= 0:
+            self.dataChanged.emit(self.index(first, self.COL_BROWSER), self.index(last, self.COL_STATUS))
+
+    def reset_all(self, browser_button: ButtonState, status: str) -> None:
+        if not self.rows:
+            return
+        for row in self.rows:
+            row.browser_button = browser_button
+            row.status = status
+        self.account_index.reset_status(status_category(status))
+        self.status_counts_changed.emit(self.account_index.counts())
+        if self._filter_category:
+            self._refilter()
+        elif self.rowCount():
+            self.dataChanged.emit(self.index(0, self.COL_BROWSER), self.index(self.rowCount() - 1, self.COL_STATUS))
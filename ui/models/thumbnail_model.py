@@ -0,0 +1,59 @@
+"""Thumbnail wall model - one tile per running browser with its latest screencast frame"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QImage
+
+
+class ThumbnailModel(QAbstractListModel):
+    """List model over browser uids; frames are swapped in as they are decoded"""
+
+    FrameRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._uids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._frames: Dict[str, QImage] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._uids)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        uid = self._uids[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return uid
+        if role == self.FrameRole:
+            return self._frames.get(uid)
+        return None
+
+    def uid(self, row: int) -> Optional[str]:
+        return self._uids[row] if 0 <= row < len(self._uids) else None
+
+    def uids(self) -> List[str]:
+        return list(self._uids)
+
+    def set_uids(self, uids: Iterable[str]) -> List[str]:
+        """Show these browsers; returns the uids that were removed"""
+        uids = list(dict.fromkeys(uids))
+        if uids == self._uids:
+            return []
+        removed = [uid for uid in self._uids if uid not in set(uids)]
+        self.beginResetModel()
+        self._uids = uids
+        self._rows = {uid: row for row, uid in enumerate(uids)}
+        for uid in removed:
+            self._frames.pop(uid, None)
+        self.endResetModel()
+        return removed
+
+    def update_frame(self, uid: str, frame: QImage) -> None:
+        row = self._rows.get(uid)
+        if row is None:
+            return
+        # Replacing the previous frame releases it, so the decoder can reuse its buffer
+        self._frames[uid] = frame
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.FrameRole])
@@ -75,7 +75,7 @@ MAIN_STYLESHEET = """
         border-color: #3B82F6;
         background-color: #FFFFFF;
     }
-    QTableWidget {
+    QTableView {
         border: 1px solid #E2E8F0;
         border-radius: 8px;
         gridline-color: #F1F5F9;
@@ -84,11 +84,11 @@ MAIN_STYLESHEET = """
         selection-background-color: #DBEAFE;
         selection-color: #1E293B;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding: 8px 12px;
         border-bottom: 1px solid #F1F5F9;
     }
-    QTableWidget::item:selected {
+    QTableView::item:selected {
         background-color: #DBEAFE;
         color: #1E293B;
     }
@@ -168,8 +168,73 @@ BUTTON_HOVER = {
 }
 
 
+BUTTON_VARIANTS = {color: name for name, color in BUTTON_STYLES.items()}
+BUTTON_SIZES = {10: 'sm', 11: 'md', 12: 'lg'}
+
+
+def _compile_button_stylesheet() -> str:
+    """Every button/chip look as one rule set keyed on the 'variant'/'size'/'chip' properties"""
+    rules = ["""
+    QPushButton[variant] {
+        color: white;
+        font-size: 11px;
+        font-weight: 600;
+        padding: 8px 12px;
+        border: none;
+        border-radius: 6px;
+    }
+    QPushButton[size="sm"] { font-size: 10px; }
+    QPushButton[size="lg"] { font-size: 12px; }
+    QPushButton[variant]:pressed {
+        padding-top: 9px;
+        padding-bottom: 7px;
+    }"""]
+    for name, color in BUTTON_STYLES.items():
+        hover = BUTTON_HOVER.get(color, color)
+        rules.append(f"""
+    QPushButton[variant="{name}"] {{ background-color: {color}; }}
+    QPushButton[variant="{name}"]:hover, QPushButton[variant="{name}"]:pressed {{ background-color: {hover}; }}""")
+    for name, color in BUTTON_STYLES.items():
+        rules.append(f"""
+    QPushButton[chip="{name}"] {{
+        background-color: #F1F5F9; color: {color}; font-size: 11px; font-weight: 600;
+        padding: 4px 10px; border: 1px solid #E2E8F0; border-radius: 12px;
+    }}
+    QPushButton[chip="{name}"]:checked {{ background-color: {color}; color: white; border-color: {color}; }}""")
+    rules.append("""
+    QPushButton[variant]:disabled {
+        background-color: #CBD5E1;
+        color: #94A3B8;
+    }
+""")
+    return "".join(rules)
+
+
+# Compiled once; widgets switch looks by flipping a property instead of re-parsing CSS
+BUTTON_STYLESHEET = _compile_button_stylesheet()
+MAIN_STYLESHEET += BUTTON_STYLESHEET
+
+
+def style_button(btn, variant: str, min_width: int = 70, font_size: int = 11) -> None:
+    """Apply a compiled button look (variant is a BUTTON_STYLES key or a color)"""
+    btn.setProperty('variant', BUTTON_VARIANTS.get(variant, variant))
+    btn.setProperty('size', BUTTON_SIZES.get(font_size, 'md'))
+    btn.setMinimumWidth(min_width + 24)
+
+
+def set_button_variant(btn, variant: str) -> None:
+    """Switch a styled button's look: a property flip plus a re-polish"""
+    variant = BUTTON_VARIANTS.get(variant, variant)
+    if btn.property('variant') == variant:
+        return
+    btn.setProperty('variant', variant)
+    style = btn.style()
+    style.unpolish(btn)
+    style.polish(btn)
+
+
 def get_button_style(color: str, min_width: int = 70, font_size: int = 11) -> str:
-    """Generate modern button stylesheet"""
+    """Generate a standalone button stylesheet (prefer style_button for app widgets)"""
     hover = BUTTON_HOVER.get(color, color)
     return f"""
         QPushButton {{
@@ -0,0 +1,58 @@
+"""Status update bus - coalesces per-account UI state and flushes once per frame"""
+import threading
+from typing import Any, Callable, Dict, List
+
+from PyQt6.QtCore import QObject, QTimer
+
+from config import STATUS_FLUSH_INTERVAL_MS
+from .models.account_model import AccountTableModel
+
+
+class StatusUpdateBus(QObject):
+    """Thread-safe sink for row state; only the latest value per uid/field is painted.
+
+    ``post`` may be called from any thread and only holds a lock for one dict
+    write. A GUI-thread timer swaps the pending dict out and applies it to the
+    model as a single ``dataChanged`` range. Listeners (e.g. the control API)
+    get each applied batch on the GUI thread.
+    """
+
+    def __init__(self, model: AccountTableModel, interval_ms: int = STATUS_FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.flushes = 0
+        self.posted = 0
+        self._listeners: List[Callable[[Dict[str, Dict[str, Any]]], None]] = []
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def post(self, uid: str, **fields: Any) -> None:
+        """Queue status/progress/browser_button/login_button for uid"""
+        with self._lock:
+            pending = self._pending.get(uid)
+            if pending is None:
+                self._pending[uid] = fields
+            else:
+                pending.update(fields)
+            self.posted += 1
+
+    def add_listener(self, callback: Callable[[Dict[str, Dict[str, Any]]], None]) -> None:
+        self._listeners.append(callback)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        self.flushes += 1
+        self.model.apply_updates(batch)
+        for callback in self._listeners:
+            callback(batch)
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self.flush()
@@ -2,3 +2,5 @@
 from .input_section import InputSection
 from .account_table import AccountTable
 from .toolbar import Toolbar
+from .filter_bar import FilterBar
+from .thumbnail_wall import ThumbnailWall
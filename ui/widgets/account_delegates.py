@@ -0,0 +1,133 @@
+"""Painted cell delegates for the account table - no per-row widgets"""
+from typing import Dict, Tuple
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle
+from PyQt6.QtCore import Qt, QRect, QRectF, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QFont
+
+from ..models.account_model import AccountTableModel, qcolor
+from ..helpers import status_color
+from ..styles import BUTTON_HOVER
+
+BUTTON_MAX_WIDTH = 90
+BUTTON_HEIGHT = 28
+DISABLED_BG = "#CBD5E1"
+DISABLED_FG = "#94A3B8"
+
+
+def _button_rect(cell: QRect) -> QRect:
+    width = min(BUTTON_MAX_WIDTH, cell.width() - 8)
+    return QRect(cell.x() + 4, cell.center().y() - BUTTON_HEIGHT // 2 + 1, width, BUTTON_HEIGHT)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a ButtonState as a rounded button and emits clicked(row, column)"""
+
+    clicked = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font = QFont()
+        self._font.setPixelSize(10)
+        self._font.setWeight(QFont.Weight.DemiBold)
+        self._pressed = None
+        self._white = QColor("#FFFFFF")
+        self._disabled = (QColor(DISABLED_BG), QColor(DISABLED_FG))
+        self._palettes: Dict[str, Tuple[QColor, QColor]] = {}
+
+    def _palette(self, color: str) -> Tuple[QColor, QColor]:
+        """(normal, hover) background colors, built once per button color"""
+        palette = self._palettes.get(color)
+        if palette is None:
+            palette = (QColor(color), QColor(BUTTON_HOVER.get(color, color)))
+            self._palettes[color] = palette
+        return palette
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        state = index.data(AccountTableModel.ButtonRole)
+        if state is None:
+            return
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        rect = _button_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        if not state.enabled:
+            bg, fg = self._disabled
+        else:
+            normal, hover = self._palette(state.color)
+            bg = hover if hovered or self._pressed == (index.row(), index.column()) else normal
+            fg = self._white
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(bg)
+        painter.drawRoundedRect(QRectF(rect), 6, 6)
+        painter.setPen(fg)
+        painter.setFont(self._font)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, state.text)
+        painter.restore()
+
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        state = index.data(AccountTableModel.ButtonRole)
+        if state is None or not state.enabled or not _button_rect(option.rect).contains(event.position().toPoint()):
+            self._pressed = None
+            return False
+        cell = (index.row(), index.column())
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self._pressed = cell
+        elif self._pressed == cell:
+            self._pressed = None
+            self.clicked.emit(*cell)
+        return True
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Paints the status text as a tinted badge"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font = QFont()
+        self._font.setPixelSize(11)
+        self._font.setWeight(QFont.Weight.DemiBold)
+        self._tints = {}
+
+    def _tint(self, color: str) -> QColor:
+        tint = self._tints.get(color)
+        if tint is None:
+            tint = QColor(color)
+            tint.setAlpha(28)
+            self._tints[color] = tint
+        return tint
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        text = index.data(Qt.ItemDataRole.DisplayRole)
+        if not text:
+            return
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        color = status_color(text)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self._font)
+        metrics = painter.fontMetrics()
+        text = metrics.elidedText(text, Qt.TextElideMode.ElideRight, option.rect.width() - 24)
+        width = metrics.horizontalAdvance(text) + 16
+        badge = QRect(option.rect.x() + 4, option.rect.center().y() - 11, width, 22)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self._tint(color))
+        painter.drawRoundedRect(QRectF(badge), 11, 11)
+        painter.setPen(qcolor(color))
+        painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, text)
+        progress = index.data(AccountTableModel.ProgressRole)
+        if progress and progress < 100:
+            track = QRect(badge.x() + 8, badge.bottom() + 3, badge.width() - 16, 3)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self._tint(color))
+            painter.drawRect(track)
+            painter.setBrush(qcolor(color))
+            painter.drawRect(QRect(track.x(), track.y(), track.width() * progress // 100, 3))
+        painter.restore()
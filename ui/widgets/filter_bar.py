@@ -0,0 +1,74 @@
+"""Search box and status filter chips for the account table"""
+from typing import Dict, Optional
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QPushButton, QButtonGroup
+from PyQt6.QtCore import pyqtSignal
+
+from ..models.account_index import IDLE, BUSY, RUNNING, LOGGED_IN, FAILED, CANCELLED
+
+# (category, label, chip style from the compiled stylesheet)
+CHIPS = [
+    (None, "All", 'primary'),
+    (IDLE, "Ready", 'gray'),
+    (BUSY, "⏳ Busy", 'warning'),
+    (RUNNING, "✅ Running", 'success'),
+    (LOGGED_IN, "✅ Logged in", 'success'),
+    (FAILED, "❌ Failed", 'danger'),
+    (CANCELLED, "⛔ Cancelled", 'danger'),
+]
+
+
+class FilterBar(QWidget):
+    """Emits filter_changed(prefix, category) as the user types or picks a chip"""
+
+    filter_changed = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._chips: Dict[Optional[str], QPushButton] = {}
+        self._setup_ui()
+
+    def _setup_ui(self) -> None:
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("🔍 Search UID prefix...")
+        self.search.setClearButtonEnabled(True)
+        self.search.setMaximumWidth(260)
+        self.search.setStyleSheet(
+            "QLineEdit { border: 2px solid #E2E8F0; border-radius: 8px; padding: 6px 10px; }"
+            "QLineEdit:focus { border-color: #3B82F6; }"
+        )
+        self.search.textChanged.connect(self._emit)
+        layout.addWidget(self.search)
+
+        self.group = QButtonGroup(self)
+        self.group.setExclusive(True)
+        for category, label, style in CHIPS:
+            chip = QPushButton(label)
+            chip.setCheckable(True)
+            chip.setProperty("chip", style)
+            chip.setProperty("label", label)
+            self.group.addButton(chip)
+            self._chips[category] = chip
+            layout.addWidget(chip)
+        self._chips[None].setChecked(True)
+        self.group.buttonClicked.connect(self._emit)
+        layout.addStretch()
+
+    @property
+    def category(self) -> Optional[str]:
+        for category, chip in self._chips.items():
+            if chip.isChecked():
+                return category
+        return None
+
+    def set_counts(self, counts: Dict[str, int]) -> None:
+        total = sum(counts.values())
+        for category, chip in self._chips.items():
+            count = total if category is None else counts.get(category, 0)
+            chip.setText(f"{chip.property('label')} ({count})")
+
+    def _emit(self, *_args) -> None:
+        self.filter_changed.emit(self.search.text(), self.category)
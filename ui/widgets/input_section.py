@@ -1,10 +1,10 @@
 """Input section widget with modern design"""
 from PyQt6.QtWidgets import (
     QGroupBox, QVBoxLayout, QHBoxLayout, QPlainTextEdit, 
-    QPushButton, QLabel, QFrame
+    QPushButton, QLabel, QFrame, QProgressBar
 )
 from PyQt6.QtCore import pyqtSignal
-from ..styles import INPUT_LABEL_STYLE, COUNT_LABEL_STYLE, get_button_style, COLORS
+from ..styles import INPUT_LABEL_STYLE, COUNT_LABEL_STYLE, style_button
 
 
 class InputSection(QGroupBox):
@@ -13,6 +13,7 @@ class InputSection(QGroupBox):
     load_clicked = pyqtSignal()
     clear_clicked = pyqtSignal()
     validate_clicked = pyqtSignal()
+    cancel_load_clicked = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__("📝 Account Input", parent)
@@ -47,22 +48,36 @@ class InputSection(QGroupBox):
         
         self.btn_load = QPushButton("📥 Load Accounts")
         self.btn_load.setMinimumHeight(40)
-        self.btn_load.setStyleSheet(get_button_style(COLORS['primary'], 130, 12))
+        style_button(self.btn_load, 'primary', 130, 12)
         self.btn_load.clicked.connect(self.load_clicked.emit)
         btn_layout.addWidget(self.btn_load)
         
         self.btn_validate = QPushButton("✅ Validate")
         self.btn_validate.setMinimumHeight(40)
-        self.btn_validate.setStyleSheet(get_button_style(COLORS['success'], 100, 12))
+        style_button(self.btn_validate, 'success', 100, 12)
         self.btn_validate.clicked.connect(self.validate_clicked.emit)
         btn_layout.addWidget(self.btn_validate)
         
         self.btn_clear = QPushButton("🗑️ Clear")
         self.btn_clear.setMinimumHeight(40)
-        self.btn_clear.setStyleSheet(get_button_style(COLORS['gray'], 80, 12))
+        style_button(self.btn_clear, 'gray', 80, 12)
         self.btn_clear.clicked.connect(self.clear_clicked.emit)
         btn_layout.addWidget(self.btn_clear)
         
+        self.btn_cancel_load = QPushButton("⛔ Cancel")
+        self.btn_cancel_load.setMinimumHeight(40)
+        style_button(self.btn_cancel_load, 'danger', 80, 12)
+        self.btn_cancel_load.clicked.connect(self.cancel_load_clicked.emit)
+        self.btn_cancel_load.hide()
+        btn_layout.addWidget(self.btn_cancel_load)
+        
+        # Import progress, only visible while a load is running
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(260)
+        self.progress_bar.setFormat("%v / %m lines")
+        self.progress_bar.hide()
+        btn_layout.addWidget(self.progress_bar)
+        
         btn_layout.addStretch()
         
         # Account count badge
@@ -80,3 +95,15 @@ class InputSection(QGroupBox):
     
     def set_count(self, count: int) -> None:
         self.lbl_count.setText(f"📊 {count} accounts")
+    
+    def set_loading(self, loading: bool) -> None:
+        """Swap Load for Cancel and show the progress bar during an import"""
+        self.btn_load.setEnabled(not loading)
+        self.btn_cancel_load.setVisible(loading)
+        self.progress_bar.setVisible(loading)
+        if loading:
+            self.progress_bar.setRange(0, 0)
+    
+    def set_progress(self, done: int, total: int) -> None:
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
@@ -0,0 +1,113 @@
+"""Thumbnail wall - virtualized grid of live browser tiles"""
+from typing import List
+
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyleOptionViewItem, QStyle, QAbstractItemView
+from PyQt6.QtCore import Qt, QRect, QSize, QModelIndex, QTimer, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QFont, QPen
+
+from config import THUMBNAIL_SIZE
+from ..models.thumbnail_model import ThumbnailModel
+from ..styles import COLORS
+
+CAPTION_HEIGHT = 20
+TILE_MARGIN = 4
+VISIBLE_DEBOUNCE_MS = 150
+TILE_BG = "#0F172A"
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Paints a frame (letterboxed) above the browser's uid"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font = QFont()
+        self._font.setPixelSize(11)
+        self._bg = QColor(TILE_BG)
+        self._muted = QColor(COLORS['text_secondary'])
+        self._text = QColor(COLORS['text'])
+        self._selected = QPen(QColor(COLORS['primary']), 2)
+        self._hover = QPen(QColor(COLORS['border']), 2)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        width, height = THUMBNAIL_SIZE
+        return QSize(width + 2 * TILE_MARGIN, height + CAPTION_HEIGHT + 2 * TILE_MARGIN)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        rect = option.rect.adjusted(TILE_MARGIN, TILE_MARGIN, -TILE_MARGIN, -TILE_MARGIN)
+        screen = rect.adjusted(0, 0, 0, -CAPTION_HEIGHT)
+        painter.save()
+        painter.fillRect(screen, self._bg)
+        frame = index.data(ThumbnailModel.FrameRole)
+        painter.setFont(self._font)
+        if frame is not None and not frame.isNull():
+            size = frame.size().scaled(screen.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(screen.center())
+            painter.drawImage(target, frame)
+        else:
+            painter.setPen(self._muted)
+            painter.drawText(screen, Qt.AlignmentFlag.AlignCenter, "⏳ Waiting for frames")
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(self._selected)
+            painter.drawRect(screen)
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            painter.setPen(self._hover)
+            painter.drawRect(screen)
+        painter.setPen(self._text)
+        caption = QRect(rect.x(), screen.bottom() + 1, rect.width(), CAPTION_HEIGHT)
+        painter.drawText(caption, Qt.AlignmentFlag.AlignCenter,
+                         painter.fontMetrics().elidedText(index.data(), Qt.TextElideMode.ElideMiddle, rect.width()))
+        painter.restore()
+
+
+class ThumbnailWall(QListView):
+    """Tile grid that only paints, and reports, the tiles scrolled into view"""
+
+    visible_changed = pyqtSignal(list)      # uids of the tiles in view
+    tile_clicked = pyqtSignal(str)
+
+    def __init__(self, model: ThumbnailModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(ThumbnailDelegate(self))
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.clicked.connect(self._on_clicked)
+
+        # Scrolling and resizing settle before the set of streaming browsers changes
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(VISIBLE_DEBOUNCE_MS)
+        self._visible_timer.timeout.connect(self._report_visible)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_visible)
+        model.modelReset.connect(self._schedule_visible)
+
+    def visible_uids(self) -> List[str]:
+        model = self.model()
+        viewport = self.viewport().rect()
+        uids = []
+        for row in range(model.rowCount()):
+            index = model.index(row)
+            if self.visualRect(index).intersects(viewport):
+                uids.append(model.uid(row))
+        return uids
+
+    def _schedule_visible(self, *_args) -> None:
+        self._visible_timer.start()
+
+    def _report_visible(self) -> None:
+        self.visible_changed.emit(self.visible_uids())
+
+    def _on_clicked(self, index: QModelIndex) -> None:
+        uid = self.model().uid(index.row())
+        if uid:
+            self.tile_clicked.emit(uid)
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._schedule_visible()
@@ -1,7 +1,7 @@
 """Modern toolbar widget with action buttons"""
 from PyQt6.QtWidgets import QWidget, QHBoxLayout, QFrame, QPushButton, QLabel
 from PyQt6.QtCore import pyqtSignal
-from ..styles import FRAME_STYLES, get_button_style, COLORS
+from ..styles import FRAME_STYLES, style_button, COLORS
 
 
 class Toolbar(QWidget):
@@ -12,8 +12,12 @@ class Toolbar(QWidget):
     open_selected_clicked = pyqtSignal()
     close_selected_clicked = pyqtSignal()
     close_all_clicked = pyqtSignal()
+    cancel_selected_clicked = pyqtSignal()
     clear_table_clicked = pyqtSignal()
     login_selected_clicked = pyqtSignal()
+    proxies_clicked = pyqtSignal()
+    broadcast_clicked = pyqtSignal()
+    wall_clicked = pyqtSignal()
     exit_clicked = pyqtSignal()
     
     def __init__(self, parent=None):
@@ -68,6 +72,11 @@ class Toolbar(QWidget):
         self.btn_close_all.clicked.connect(self.close_all_clicked.emit)
         browser_layout.addWidget(self.btn_close_all)
         
+        self.btn_cancel = self._create_button("⛔ Cancel", COLORS['danger'], 80)
+        self.btn_cancel.setToolTip("Cancel Launch/Login for Selected Accounts")
+        self.btn_cancel.clicked.connect(self.cancel_selected_clicked.emit)
+        browser_layout.addWidget(self.btn_cancel)
+        
         browser_layout.addWidget(self._create_separator())
         
         self.btn_clear = self._create_button("🗑️ Clear", COLORS['gray'], 70)
@@ -75,6 +84,21 @@ class Toolbar(QWidget):
         self.btn_clear.clicked.connect(self.clear_table_clicked.emit)
         browser_layout.addWidget(self.btn_clear)
         
+        self.btn_proxies = self._create_button("🌍 Proxies", COLORS['primary'], 85)
+        self.btn_proxies.setToolTip("Manage Proxy Pool")
+        self.btn_proxies.clicked.connect(self.proxies_clicked.emit)
+        browser_layout.addWidget(self.btn_proxies)
+        
+        self.btn_broadcast = self._create_button("📡 Broadcast", COLORS['primary'], 100)
+        self.btn_broadcast.setToolTip("Run a Script or Navigation on Selected Running Browsers")
+        self.btn_broadcast.clicked.connect(self.broadcast_clicked.emit)
+        browser_layout.addWidget(self.btn_broadcast)
+        
+        self.btn_wall = self._create_button("🖼️ Wall", COLORS['primary'], 75)
+        self.btn_wall.setToolTip("Live Thumbnails of All Running Browsers")
+        self.btn_wall.clicked.connect(self.wall_clicked.emit)
+        browser_layout.addWidget(self.btn_wall)
+        
         layout.addWidget(browser_frame)
         layout.addStretch()
         
@@ -105,7 +129,7 @@ class Toolbar(QWidget):
     def _create_button(self, text: str, color: str, min_width: int) -> QPushButton:
         btn = QPushButton(text)
         btn.setMinimumHeight(36)
-        btn.setStyleSheet(get_button_style(color, min_width, 11))
+        style_button(btn, color, min_width, 11)
         return btn
     
     def _create_separator(self) -> QFrame: